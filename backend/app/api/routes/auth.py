@@ -5,7 +5,7 @@ from sqlalchemy.orm import Session
 from app.services.users import UsersService
 from app.schemas.users import UserCreate
 from app.schemas.auth import TokenSchema, RefreshTokenSchema
-from app.services.auth import create_access_token, create_refresh_token, authenticate_user, validate_refresh_token
+from app.services.auth import create_access_token, create_refresh_token, authenticate_user_async, validate_refresh_token
 from app.config.database import get_db
 
 router = APIRouter(
@@ -21,7 +21,7 @@ router = APIRouter(
     summary="Create a new user",
     response_description="The newly created user",
 )
-def sign_up(user_data: UserCreate, db: Session = Depends(get_db)):
+async def sign_up(user_data: UserCreate, db: Session = Depends(get_db)):
     """
     Create a new user. Requires user information such as `name`, `email`, and `password`.
 
@@ -33,7 +33,7 @@ def sign_up(user_data: UserCreate, db: Session = Depends(get_db)):
     - **access_token**: JWT for accessing protected resources.
     - **refresh_token**: JWT for obtaining new access tokens.
     """
-    user = UsersService.create_user(db, user_data)
+    user = await UsersService.create_user_async(db, user_data)
     access_token = create_access_token(subject=user.user_name)
     refresh_token = create_refresh_token(subject=user.id)
 
@@ -48,7 +48,7 @@ def sign_up(user_data: UserCreate, db: Session = Depends(get_db)):
     response_description="The newly created auth tokens",
     generate_unique_id_function=lambda _: "LoginUser",
 )
-def login(user_data: Annotated[OAuth2PasswordRequestForm, Depends()], db: Session = Depends(get_db)):
+async def login(user_data: Annotated[OAuth2PasswordRequestForm, Depends()], db: Session = Depends(get_db)):
     """
     Authenticate and log in a user, generating and returning access and refresh tokens.
 
@@ -59,7 +59,7 @@ def login(user_data: Annotated[OAuth2PasswordRequestForm, Depends()], db: Sessio
     - **access_token**: JWT for accessing protected resources.
     - **refresh_token**: JWT for obtaining new access tokens.
     """
-    user = authenticate_user(db, user_data.username, user_data.password)
+    user = await authenticate_user_async(db, user_data.username, user_data.password)
     access_token = create_access_token(subject=user.user_name)
     refresh_token = create_refresh_token(subject=user.id)
 
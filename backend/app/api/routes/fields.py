@@ -1,19 +1,38 @@
-from fastapi import APIRouter, Depends, status
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.orm import Session
 from app.config.database import get_db
 from app.schemas.fields import FieldCreate, FieldUpdate, Field
 from app.services.fields import FieldsService
 from app.services.auth import get_current_user, is_admin
+from app.schemas.adapters import field_list_adapter
+from app.utils.pagination import PageParams, page_response
 
 router = APIRouter(prefix="/fields", tags=["Fields"], dependencies=[Depends(get_current_user)])
 
 
 @router.get("/", response_model=list[Field], status_code=status.HTTP_200_OK)
-def get_all_fields(db: Session = Depends(get_db)):
+def get_all_fields(
+    page: PageParams = Depends(),
+    form_id: Optional[int] = Query(None, description="Only return the fields with this form_id"),
+    field_type: Optional[str] = Query(None, description="Only return the fields with this field_type"),
+    db: Session = Depends(get_db),
+):
     """
     Retrieve all fields. Optionally filter by form ID.
+
+    - **after_id**: Return the fields after this ID. Pass the `X-Next-Cursor` header of the previous page.
+    - **limit**: Maximum number of fields to return.
+    - **fields**: Comma separated attributes to return, e.g. `id,name`. `id` is always returned.
+    - **form_id**: Only return the fields with this `form_id`.
+    - **field_type**: Only return the fields with this `field_type`.
+
+    The `X-Next-Cursor` response header is only set when there are more fields.
     """
-    return FieldsService.get_all_fields(db)
+    result = FieldsService.get_all_fields(
+        db, page.after_id, page.limit, page.fields, form_id=form_id, field_type=field_type
+    )
+    return page_response(result, field_list_adapter)
 
 
 @router.get("/{field_id}", response_model=Field, status_code=status.HTTP_200_OK)
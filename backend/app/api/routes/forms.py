@@ -4,17 +4,29 @@ from app.schemas.forms import FormCreate, FormUpdate, Form
 from app.config.database import get_db
 from app.services.forms import FormsService
 from app.services.auth import get_current_user, is_admin
+from app.schemas.adapters import form_list_adapter
+from app.utils.pagination import PageParams, page_response
 
 
 router = APIRouter(prefix="/forms", tags=["Forms"], dependencies=[Depends(get_current_user)])
 
 
 @router.get("/", response_model=list[Form], status_code=status.HTTP_200_OK)
-def get_all_forms(db: Session = Depends(get_db)):
+def get_all_forms(
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db),
+):
     """
     Retrieve all forms.
+
+    - **after_id**: Return the forms after this ID. Pass the `X-Next-Cursor` header of the previous page.
+    - **limit**: Maximum number of forms to return.
+    - **fields**: Comma separated attributes to return, e.g. `id,name`. `id` is always returned.
+
+    The `X-Next-Cursor` response header is only set when there are more forms.
     """
-    return FormsService.get_all_forms(db)
+    result = FormsService.get_all_forms(db, page.after_id, page.limit, page.fields)
+    return page_response(result, form_list_adapter)
 
 
 @router.get("/{form_id}", response_model=Form, status_code=status.HTTP_200_OK)
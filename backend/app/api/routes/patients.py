@@ -1,31 +1,82 @@
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
-from app.config.database import get_db
+import json
+import logging
+from typing import Any, AsyncIterator, Dict
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config.database import get_async_db
 from app.services.auth import get_current_user
 from app.services.patients import PatientService
 from app.services.departments import DepartmentsService
 from app.services.providers import ProvidersService
-from app.core.emr_client import EMRClient
+from app.core.emr_client import AsyncEMRClient
 
-emr_client = EMRClient()
+emr_client = AsyncEMRClient()
 patient_service = PatientService(emr_client)
 
 router = APIRouter(prefix="/patients", tags=["Patients"], dependencies=[Depends(get_current_user)])
 
 
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _sse_stream(events: AsyncIterator) -> AsyncIterator[str]:
+    """
+    Formats `(event, data)` pairs as Server-Sent Events. The response status is already sent once streaming
+    starts, so failures are reported to the client as a final `error` event.
+    """
+    try:
+        async for event, data in events:
+            yield _sse_event(event, data)
+    except HTTPException as e:
+        yield _sse_event("error", {"status_code": e.status_code, "detail": e.detail})
+    except Exception as e:
+        logging.exception("Patient summary stream failed")
+        yield _sse_event("error", {"status_code": status.HTTP_500_INTERNAL_SERVER_ERROR, "detail": str(e)})
+
+
 @router.get("/{patient_id}", response_model=str, status_code=status.HTTP_200_OK)
 async def get_patient_context(
-    patient_id: str, db: Session = Depends(get_db), user_data: dict = Depends(get_current_user)
+    patient_id: str,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    user_data: dict = Depends(get_current_user),
 ):
     """
     Analyzes the patient context using AI models to provide a detailed summary
     based on patient details, observations, conditions, and allergies.
 
     :param patient_id: The patient uuid as in the emr system.
-    :return: A detailed patient summary as a dictionary.
+    :return: A detailed patient summary as a dictionary. The `X-Summary-Cache` header is `HIT` when the
+     summary was served from the summary cache and `MISS` otherwise.
     :raises HTTPException: If the AI response parsing fails.
     """
-    provider = ProvidersService.get_provider_by_id(db, user_data.id)
-    department = DepartmentsService.get_department_by_id(db, provider.department_id)
-    patient_context = patient_service.get_patient_context(patient_id, user_data, department)
+    provider = await ProvidersService.get_provider_by_user_id_async(db, user_data.id)
+    department = await DepartmentsService.get_department_by_id_async(db, provider.department_id)
+    patient_context, cached = await patient_service.get_patient_summary_async(patient_id, user_data, department)
+    response.headers["X-Summary-Cache"] = "HIT" if cached else "MISS"
     return patient_context
+
+
+@router.get("/{patient_id}/stream", status_code=status.HTTP_200_OK)
+async def stream_patient_context(
+    patient_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    user_data: dict = Depends(get_current_user),
+):
+    """
+    Streams the patient summary as Server-Sent Events so the client can render it while it is generated.
+    Emits `progress` events while the EMR is queried, `token` events with the summary text, then a `done`
+    event with `cached` set when the summary came from the summary cache, or an `error` event on failure.
+
+    :param patient_id: The patient uuid as in the emr system.
+    :return: A `text/event-stream` response.
+    """
+    provider = await ProvidersService.get_provider_by_user_id_async(db, user_data.id)
+    department = await DepartmentsService.get_department_by_id_async(db, provider.department_id)
+    return StreamingResponse(
+        _sse_stream(patient_service.stream_patient_summary(patient_id, user_data, department)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, status
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.orm import Session
 from app.services.providers import ProvidersService
 from app.schemas.providers import ProviderCreate, ProviderUpdate, Provider
 from app.config.database import get_db
 from app.services.auth import get_current_user, is_admin
+from app.schemas.adapters import provider_list_adapter
+from app.utils.pagination import PageParams, page_response
 
 
 router = APIRouter(prefix="/providers", tags=["Providers"], dependencies=[Depends(get_current_user)])
@@ -101,8 +104,24 @@ def delete_provider(provider_id: int, db: Session = Depends(get_db)):
     response_description="List of all providers",
     dependencies=[Depends(is_admin)],
 )
-def get_all_providers(db: Session = Depends(get_db)):
+def get_all_providers(
+    page: PageParams = Depends(),
+    department_id: Optional[int] = Query(None, description="Only return the providers with this department_id"),
+    specialty: Optional[str] = Query(None, description="Only return the providers with this specialty"),
+    db: Session = Depends(get_db),
+):
     """
     Retrieve a list of all providers in the system.
+
+    - **after_id**: Return the providers after this ID. Pass the `X-Next-Cursor` header of the previous page.
+    - **limit**: Maximum number of providers to return.
+    - **fields**: Comma separated attributes to return, e.g. `id,name`. `id` is always returned.
+    - **department_id**: Only return the providers with this `department_id`.
+    - **specialty**: Only return the providers with this `specialty`.
+
+    The `X-Next-Cursor` response header is only set when there are more providers.
     """
-    return ProvidersService.get_all_providers(db)
+    result = ProvidersService.get_all_providers(
+        db, page.after_id, page.limit, page.fields, department_id=department_id, specialty=specialty
+    )
+    return page_response(result, provider_list_adapter)
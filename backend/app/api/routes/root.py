@@ -1,5 +1,11 @@
 from fastapi import APIRouter, status
 from fastapi.openapi.docs import get_swagger_ui_html, get_redoc_html
+from app.api.routes.patients import emr_client, patient_service
+from app.config.database import async_pool_metrics, pool_metrics
+from app.core.form_schema_cache import form_schema_cache
+from app.core.principal_cache import principal_cache
+from app.utils.form_extractor import extraction_stats
+from app.utils.s3 import S3Utils
 
 
 router = APIRouter()
@@ -23,6 +29,37 @@ def health_check():
     return {"status": "healthy"}
 
 
+@router.get(
+    "/health/database", tags=["Health"], summary="Database connection pool metrics", status_code=status.HTTP_200_OK
+)
+def database_pool_metrics():
+    """
+    Checkouts, checkins and new connections of the database pool of this worker, the time spent waiting for a
+    connection and the number of checkouts that timed out, along with the current size and usage of the pool.
+    The pool of the async routes, once used, is reported under `async`.
+    """
+    stats = pool_metrics.stats()
+    if async_pool_metrics.pool is not None:
+        stats["async"] = async_pool_metrics.stats()
+    return stats
+
+
+@router.get("/health/caches", tags=["Health"], summary="Cache and pipeline metrics", status_code=status.HTTP_200_OK)
+def cache_metrics():
+    """
+    Hits and misses of the caches used by this worker (`null` for a disabled cache), the totals and throughput
+    of its S3 uploads, and how the form fields of its transcriptions were extracted.
+    """
+    return {
+        "emr": emr_client.cache.stats() if emr_client.cache is not None else None,
+        "summaries": patient_service.summary_cache.stats() if patient_service.summary_cache is not None else None,
+        "form_schemas": form_schema_cache.stats(),
+        "principals": principal_cache.stats(),
+        "s3_uploads": S3Utils.upload_stats(),
+        "extraction": extraction_stats.stats(),
+    }
+
+
 @router.get("/docs", include_in_schema=False)
 def overridden_swagger():
     return get_swagger_ui_html(openapi_url="/openapi.json", title="Bahmni - Copilot", swagger_favicon_url=favicon_path)
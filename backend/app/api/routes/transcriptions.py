@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, UploadFile, File, status
-from sqlalchemy.orm import Session
-from app.config.database import get_db
+import asyncio
+import time
+from fastapi import APIRouter, Depends, UploadFile, File, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config.database import get_async_db
 from app.services.transcriptions import TranscriptionService
 from app.schemas.transcriptions import Transcription
 from app.services.auth import get_current_user
 
+POLL_INTERVAL_SECONDS = 0.5
+MAX_WAIT_SECONDS = 30
+
 
 router = APIRouter(prefix="/transcriptions", tags=["Transcriptions"], dependencies=[Depends(get_current_user)])
 
@@ -18,7 +23,7 @@ router = APIRouter(prefix="/transcriptions", tags=["Transcriptions"], dependenci
 async def create_transcription(
     form_id: int,
     file: UploadFile = File(..., description="The file with the entity to process"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_data: dict = Depends(get_current_user),
 ):
     """
@@ -29,5 +34,55 @@ async def create_transcription(
 
     Returns the created transcription record.
     """
-    transcription = TranscriptionService.create_transcription(db=db, user_id=user_data.id, form_id=form_id, file=file)
+    transcription = await TranscriptionService.create_transcription_async(
+        db=db, user_id=user_data.id, form_id=form_id, file=file
+    )
+    return transcription
+
+
+@router.post(
+    "/jobs/{form_id}",
+    response_model=Transcription,
+    status_code=status.HTTP_202_ACCEPTED,
+    generate_unique_id_function=lambda _: "UploadFileJob",
+)
+async def create_transcription_job(
+    form_id: int,
+    file: UploadFile = File(..., description="The file with the entity to process"),
+    db: AsyncSession = Depends(get_async_db),
+    user_data: dict = Depends(get_current_user),
+):
+    """
+    Accept an uploaded audio file and process it in the background.
+
+    - **form_id**: The form ID associated with the transcription.
+    - **file**: The audio file to upload and process.
+
+    Returns the pending transcription record. Its status moves through `uploaded`, `transcribed`,
+    `validated` and `completed`, or ends as `failed`. Poll `GET /transcriptions/{transcription_id}` for the result.
+    """
+    return await TranscriptionService.create_transcription_job_async(
+        db=db, user_id=user_data.id, form_id=form_id, file=file
+    )
+
+
+@router.get("/{transcription_id}", response_model=Transcription, status_code=status.HTTP_200_OK)
+async def get_transcription(
+    transcription_id: int,
+    wait: int = Query(0, ge=0, le=MAX_WAIT_SECONDS, description="Seconds to wait for the job to finish"),
+    db: AsyncSession = Depends(get_async_db),
+    user_data: dict = Depends(get_current_user),
+):
+    """
+    Retrieve a transcription record by ID.
+
+    - **transcription_id**: The ID of the transcription.
+    - **wait**: Optional long-poll. Holds the request until the job is `completed` or `failed`,
+      or until the given number of seconds has elapsed.
+    """
+    deadline = time.monotonic() + wait
+    transcription = await TranscriptionService.get_transcription_async(db, transcription_id, user_data.id)
+    while transcription.status not in TranscriptionService.TERMINAL_STATUSES and time.monotonic() < deadline:
+        await asyncio.sleep(POLL_INTERVAL_SECONDS)
+        transcription = await TranscriptionService.get_transcription_async(db, transcription_id, user_data.id)
     return transcription
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, status
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.orm import Session
 from app.services.users import UsersService
 from app.schemas.users import UserCreate, UserUpdate, User
 from app.config.database import get_db
 from app.services.auth import get_current_user, is_admin
+from app.schemas.adapters import user_list_adapter
+from app.utils.pagination import PageParams, page_response
 
 
 router = APIRouter(prefix="/users", tags=["Users"], dependencies=[Depends(get_current_user)])
@@ -102,8 +105,20 @@ def delete_user(user_id: int, db: Session = Depends(get_db)):
     response_description="List of all users",
     dependencies=[Depends(is_admin)],
 )
-def get_all_users(db: Session = Depends(get_db)):
+def get_all_users(
+    page: PageParams = Depends(),
+    admin_only: Optional[bool] = Query(None, alias="is_admin", description="Only return the users with this is_admin"),
+    db: Session = Depends(get_db),
+):
     """
     Retrieve a list of all users in the system.
+
+    - **after_id**: Return the users after this ID. Pass the `X-Next-Cursor` header of the previous page.
+    - **limit**: Maximum number of users to return.
+    - **fields**: Comma separated attributes to return, e.g. `id,name`. `id` is always returned.
+    - **is_admin**: Only return the users with this `is_admin`.
+
+    The `X-Next-Cursor` response header is only set when there are more users.
     """
-    return UsersService.get_all_users(db)
+    result = UsersService.get_all_users(db, page.after_id, page.limit, page.fields, is_admin=admin_only)
+    return page_response(result, user_list_adapter)
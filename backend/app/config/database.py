@@ -1,7 +1,16 @@
 import os
+import time
+import logging
+import threading
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Optional
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 load_dotenv()
 
@@ -10,14 +19,250 @@ SQL_ALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
 if not SQL_ALCHEMY_DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set")
 
-db_engine = create_engine(SQL_ALCHEMY_DATABASE_URL)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+ASYNC_DRIVERS = {"postgresql": "postgresql+psycopg", "sqlite": "sqlite+aiosqlite"}
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "0"))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+DB_CREATE_TABLES = os.getenv("DB_CREATE_TABLES", "true").lower() == "true"
+# Every worker has two pools: the one of `db_engine` and the one of the async engine of the async routes.
+ENGINES_PER_WORKER = 2
+
+
+class PoolMetrics:
+    """
+    Counters of the connection pool of an engine, for monitoring. Checkouts and checkins are counted with pool
+    events, the time spent acquiring a connection (waiting for a free one, or opening a new one) is measured by
+    `MeteredQueuePool` and `MeteredAsyncQueuePool`.
+    """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.pool: Optional[QueuePool] = None
+        self._lock = threading.Lock()
+
+    def attach(self, engine: Engine):
+        """Count the checkouts, checkins and new connections of the engine."""
+        self.pool = engine.pool
+        event.listen(engine, "checkout", lambda *args: self._increment("checkouts"))
+        event.listen(engine, "checkin", lambda *args: self._increment("checkins"))
+        event.listen(engine, "connect", lambda *args: self._increment("connects"))
+
+    def _increment(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "timeouts": self.timeouts,
+                "wait_seconds": round(self.wait_seconds, 6),
+                "max_wait_seconds": round(self.max_wait_seconds, 6),
+            }
+        if isinstance(self.pool, QueuePool):
+            stats.update(
+                size=self.pool.size(),
+                checked_out=self.pool.checkedout(),
+                overflow=self.pool.overflow(),
+                checked_in=self.pool.checkedin(),
+            )
+        return stats
+
+
+pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+
+
+class MeteredPool:
+    """Records how long every checkout of a queue pool waited, and whether it timed out, in `metrics`."""
+
+    metrics: PoolMetrics
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+
+class MeteredQueuePool(MeteredPool, QueuePool):
+    """The pool of `db_engine`, metered in `pool_metrics`."""
+
+    metrics = pool_metrics
+
+
+class MeteredAsyncQueuePool(MeteredPool, AsyncAdaptedQueuePool):
+    """The pool of the async engine, metered in `async_pool_metrics`."""
+
+    metrics = async_pool_metrics
+
+
+def engine_options(url: str, asynchronous: bool = False) -> Dict[str, Any]:
+    """
+    Keyword arguments of `create_engine` for the database URL. In-memory SQLite databases keep the default
+    single connection pool.
+
+    :param url: The database URL.
+    :param asynchronous: Whether the options are for `create_async_engine`.
+    :return: The pool and connection options.
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    options = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "poolclass": MeteredAsyncQueuePool if asynchronous else MeteredQueuePool,
+    }
+    if DB_STATEMENT_TIMEOUT_MS > 0:
+        if backend == "postgresql":
+            options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+        elif backend == "mysql":
+            options["connect_args"] = {"init_command": f"SET SESSION max_execution_time={DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+def async_database_url(url: str) -> str:
+    """
+    The URL of the same database with an asyncio driver: psycopg 3 for PostgreSQL and aiosqlite for SQLite.
+    Other databases need `ASYNC_DATABASE_URL`.
+
+    :param url: The synchronous database URL.
+    :return: The asynchronous database URL.
+    :raises ValueError: If no asyncio driver is known for the database.
+    """
+    url = make_url(url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver for '{url.drivername}', set the ASYNC_DATABASE_URL environment variable")
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+db_engine = create_engine(SQL_ALCHEMY_DATABASE_URL, **engine_options(SQL_ALCHEMY_DATABASE_URL))
+pool_metrics.attach(db_engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
 
 Base = declarative_base()
 
 
+@lru_cache(maxsize=None)
+def get_async_engine() -> AsyncEngine:
+    """
+    The engine of the async routes, created on first use so the asyncio driver is only required when an async
+    route is served. It has its own pool, sized by the same settings as `db_engine` and counted by
+    `log_pool_sizing`.
+    """
+    url = ASYNC_DATABASE_URL or async_database_url(SQL_ALCHEMY_DATABASE_URL)
+    engine = create_async_engine(url, **engine_options(url, asynchronous=True))
+    async_pool_metrics.attach(engine.sync_engine)
+    return engine
+
+
+@lru_cache(maxsize=None)
+def get_async_sessionmaker() -> async_sessionmaker:
+    return async_sessionmaker(bind=get_async_engine(), autoflush=False, expire_on_commit=False)
+
+
+def pool_sizing(
+    workers: int, max_connections: int, pool_size: int, max_overflow: int, pools: int = ENGINES_PER_WORKER
+) -> Dict[str, Any]:
+    """
+    Compares the connections every worker process may open with what the server accepts. Each worker has
+    `pools` pools of its own, so at peak `workers * pools * (pool_size + max_overflow)` connections are open.
+
+    :param workers: Number of worker processes, e.g. `WEB_CONCURRENCY`.
+    :param max_connections: Connections the database server accepts.
+    :param pool_size: Connections every pool keeps open.
+    :param max_overflow: Extra connections every pool opens under load.
+    :param pools: Pools in every worker.
+    :return: The peak, whether it fits, and the pool size and overflow that would fit.
+    """
+    per_pool = max(1, max_connections // max(1, workers * pools))
+    suggested_pool_size = max(1, per_pool * 2 // 3)
+    peak_connections = workers * pools * (pool_size + max_overflow)
+    return {
+        "workers": workers,
+        "pools": pools,
+        "max_connections": max_connections,
+        "peak_connections": peak_connections,
+        "fits": peak_connections <= max_connections,
+        "suggested_pool_size": suggested_pool_size,
+        "suggested_max_overflow": max(0, per_pool - suggested_pool_size),
+    }
+
+
+def server_max_connections(engine: Engine) -> Optional[int]:
+    """The `max_connections` setting of a PostgreSQL or MySQL server, or None for other databases."""
+    query = {"postgresql": "SHOW max_connections", "mysql": "SELECT @@max_connections"}.get(engine.dialect.name)
+    if query is None:
+        return None
+    with engine.connect() as connection:
+        return int(connection.execute(text(query)).scalar())
+
+
+def log_pool_sizing():
+    """
+    Logs at startup whether the pools of all the workers, sync and async, fit in the connections the database
+    accepts.
+    """
+    if not isinstance(db_engine.pool, QueuePool):
+        return
+    try:
+        max_connections = DB_MAX_CONNECTIONS or server_max_connections(db_engine)
+    except Exception as e:
+        logging.warning(f"Could not read the max_connections of the database: {e}")
+        return
+    if not max_connections:
+        return
+    sizing = pool_sizing(WEB_CONCURRENCY, max_connections, db_engine.pool.size(), DB_MAX_OVERFLOW)
+    message = (
+        f"{sizing['workers']} workers with {sizing['pools']} pools each may open {sizing['peak_connections']} of "
+        f"the {max_connections} database connections; DB_POOL_SIZE={sizing['suggested_pool_size']} and "
+        f"DB_MAX_OVERFLOW={sizing['suggested_max_overflow']} use each pool's share"
+    )
+    if sizing["fits"]:
+        logging.info(message)
+    else:
+        logging.warning(message)
+
+
 def create_tables(bases: list[declarative_base], db_engine):
+    """
+    Creates the missing tables with `create_all`, unless `DB_CREATE_TABLES` is disabled because the schema is
+    managed with the Alembic migrations. `create_all` never changes existing tables, e.g. to add an index.
+    """
+    if not DB_CREATE_TABLES:
+        return
     for base in bases:
         base.metadata.create_all(bind=db_engine)
 
@@ -28,3 +273,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Session dependency of the async routes, so their queries do not block the event loop."""
+    async with get_async_sessionmaker()() as db:
+        yield db
@@ -0,0 +1,155 @@
+import json
+import math
+import re
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class CacheBackend:
+    """
+    Interface of the key/value caches used by the application. Values must be JSON serializable so that
+    they can be shared across workers by the Redis backend.
+    """
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: float):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def delete_matching(self, fragment: str):
+        """Delete every key containing the given fragment."""
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class InMemoryCache(CacheBackend):
+    """
+    Thread-safe, in-process cache with per-entry TTLs. The least recently used entries are evicted once either
+    `max_entries` or `max_bytes` (measured on the JSON encoded value) is exceeded.
+    """
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 50 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self.size_bytes -= size
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at, _ = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float):
+        size = len(json.dumps(value, default=str))
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, time.monotonic() + ttl, size)
+            self.size_bytes += size
+            while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def delete_matching(self, fragment: str):
+        with self._lock:
+            for key in [key for key in self._entries if fragment in key]:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+
+class RedisCache(CacheBackend):
+    """
+    Cache stored in a Redis compatible server so that entries are shared by every uvicorn worker. Entry and
+    memory bounds are left to the server, e.g. `maxmemory` with `maxmemory-policy allkeys-lru`.
+    """
+
+    def __init__(self, url: str, prefix: str = ""):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("The redis package is required to use the Redis cache backend")
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url)
+
+    @staticmethod
+    def _escape(pattern: str) -> str:
+        """Escape the glob characters of a SCAN MATCH pattern so that it matches literally."""
+        return re.sub(r"([\\*?\[\]^])", r"\\\1", pattern)
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.client.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key: str, value: Any, ttl: float):
+        self.client.set(self.prefix + key, json.dumps(value, default=str), px=max(1, math.ceil(ttl * 1000)))
+
+    def delete(self, key: str):
+        self.client.delete(self.prefix + key)
+
+    def delete_matching(self, fragment: str):
+        keys = list(self.client.scan_iter(match=f"{self._escape(self.prefix)}*{self._escape(fragment)}*"))
+        if keys:
+            self.client.delete(*keys)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=f"{self._escape(self.prefix)}*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+def create_cache(backend: str, prefix: str, redis_url: Optional[str], max_entries: int, max_bytes: int):
+    """
+    Build a cache backend by name.
+
+    :param backend: `memory`, `redis` or `none`.
+    :param prefix: Key prefix used to namespace the Redis keys.
+    :param redis_url: Redis connection URL, required for the `redis` backend.
+    :param max_entries: Entry bound of the in-memory backend.
+    :param max_bytes: Memory bound of the in-memory backend.
+    :return: The cache backend, or None when caching is disabled.
+    """
+    backend = (backend or "none").lower()
+    if backend == "memory":
+        return InMemoryCache(max_entries=max_entries, max_bytes=max_bytes)
+    if backend == "redis":
+        if not redis_url:
+            raise ValueError("REDIS_URL environment variable is not set")
+        return RedisCache(redis_url, prefix=prefix)
+    if backend == "none":
+        return None
+    raise ValueError(f"Unsupported cache backend: '{backend}'")
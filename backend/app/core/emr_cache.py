@@ -0,0 +1,121 @@
+import os
+import time
+import threading
+from typing import Any, Dict, Optional
+from dotenv import load_dotenv
+from app.core.cache import CacheBackend, create_cache
+
+load_dotenv()
+
+EMR_CACHE_BACKEND = os.getenv("EMR_CACHE_BACKEND", "memory")
+EMR_CACHE_MAX_ENTRIES = int(os.getenv("EMR_CACHE_MAX_ENTRIES", "1000"))
+EMR_CACHE_MAX_BYTES = int(os.getenv("EMR_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+EMR_CACHE_DEFAULT_TTL = float(os.getenv("EMR_CACHE_DEFAULT_TTL", "60"))
+EMR_CACHE_TTLS = os.getenv("EMR_CACHE_TTLS", "Patient=300,Condition=300,AllergyIntolerance=300,Observation=60")
+EMR_CACHE_STALE_TTL = float(os.getenv("EMR_CACHE_STALE_TTL", "600"))
+REDIS_URL = os.getenv("REDIS_URL")
+
+
+def parse_ttls(value: str) -> Dict[str, float]:
+    """Parse a `ResourceType=seconds,...` list into a dictionary."""
+    ttls = {}
+    for item in filter(None, (item.strip() for item in value.split(","))):
+        resource_type, ttl = item.split("=")
+        ttls[resource_type.strip()] = float(ttl)
+    return ttls
+
+
+class EMRCache:
+    """
+    Caches FHIR responses per endpoint with a TTL per resource type. Expired entries are kept for a further
+    `stale_ttl` seconds so that they can be revalidated with `If-None-Match` against their ETag instead of being
+    downloaded again.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        ttls: Optional[Dict[str, float]] = None,
+        default_ttl: float = EMR_CACHE_DEFAULT_TTL,
+        stale_ttl: float = EMR_CACHE_STALE_TTL,
+    ):
+        self.backend = backend
+        self.ttls = ttls if ttls is not None else parse_ttls(EMR_CACHE_TTLS)
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(endpoint: str) -> str:
+        return f"emr:{endpoint}"
+
+    @staticmethod
+    def _resource_type(endpoint: str) -> str:
+        return endpoint.split("?")[0].split("/")[0]
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def lookup(self, endpoint: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached entry for an endpoint, fresh or stale, or None when nothing is cached.
+        A fresh entry counts as a hit, anything else as a miss.
+        """
+        entry = self.backend.get(self._key(endpoint))
+        if entry is not None and entry["expires_at"] > time.time():
+            self._count("hits")
+        else:
+            self._count("misses")
+        return entry
+
+    @staticmethod
+    def is_fresh(entry: Optional[Dict[str, Any]]) -> bool:
+        return entry is not None and entry["expires_at"] > time.time()
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        if entry is not None and entry.get("etag"):
+            return {"If-None-Match": entry["etag"]}
+        return {}
+
+    def store(self, endpoint: str, data: Any, etag: Optional[str] = None):
+        ttl = self.ttls.get(self._resource_type(endpoint), self.default_ttl)
+        if ttl <= 0:
+            return
+        entry = {"data": data, "etag": etag, "expires_at": time.time() + ttl}
+        self.backend.set(self._key(endpoint), entry, ttl + (self.stale_ttl if etag else 0))
+
+    def revalidated(self, endpoint: str, entry: Dict[str, Any]) -> Any:
+        """Extend a stale entry after the EMR answered `304 Not Modified` and return its data."""
+        self._count("revalidations")
+        self.store(endpoint, entry["data"], entry.get("etag"))
+        return entry["data"]
+
+    def resolve(self, endpoint: str, entry: Optional[Dict[str, Any]], response) -> Any:
+        """
+        Return the data for a response to a possibly conditional request, storing or revalidating the cache.
+        """
+        if response.status_code == 304 and entry is not None:
+            return self.revalidated(endpoint, entry)
+        data = response.json()
+        self.store(endpoint, data, response.headers.get("ETag"))
+        return data
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "revalidations": self.revalidations}
+
+
+def create_emr_cache() -> Optional[EMRCache]:
+    """Build the EMR cache configured by the `EMR_CACHE_*` environment variables, or None when disabled."""
+    backend = create_cache(
+        EMR_CACHE_BACKEND,
+        prefix="copilot:",
+        redis_url=REDIS_URL,
+        max_entries=EMR_CACHE_MAX_ENTRIES,
+        max_bytes=EMR_CACHE_MAX_BYTES,
+    )
+    return EMRCache(backend) if backend is not None else None
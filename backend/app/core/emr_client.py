@@ -1,39 +1,35 @@
 import os
-import requests
-from requests.auth import HTTPBasicAuth
-from requests.packages.urllib3.exceptions import InsecureRequestWarning
+import httpx
 from dotenv import load_dotenv
-from typing import List
+from typing import Any, AsyncIterator, Dict, List, Optional
+from urllib.parse import quote
 from fastapi import HTTPException
+from app.core.emr_cache import EMRCache, create_emr_cache
 from app.schemas.patients import Patient, ObservationResource, ConditionResource, AllergyIntoleranceResource
 
 load_dotenv()
 
+EMR_POOL_SIZE = int(os.getenv("EMR_POOL_SIZE", "20"))
+EMR_KEEPALIVE_CONNECTIONS = int(os.getenv("EMR_KEEPALIVE_CONNECTIONS", "10"))
+EMR_KEEPALIVE_EXPIRY = float(os.getenv("EMR_KEEPALIVE_EXPIRY", "30"))
+EMR_CONNECT_TIMEOUT = float(os.getenv("EMR_CONNECT_TIMEOUT", "5"))
+EMR_READ_TIMEOUT = float(os.getenv("EMR_READ_TIMEOUT", "30"))
+EMR_HTTP2 = os.getenv("EMR_HTTP2", "false").lower() == "true"
+EMR_OBSERVATION_LIMIT = int(os.getenv("EMR_OBSERVATION_LIMIT", "500"))
+EMR_OBSERVATION_PAGE_SIZE = int(os.getenv("EMR_OBSERVATION_PAGE_SIZE", "100"))
+EMR_OBSERVATION_SORT = os.getenv("EMR_OBSERVATION_SORT", "-date")
 
-class EMRClient:
-    def __init__(self):
-        requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
+
+class BaseEMRClient:
+    """
+    Configuration, caching, error handling and FHIR parsing of the EMR client, independent of the transport.
+    """
+
+    def __init__(self, cache: Optional[EMRCache] = None):
         self.base_url = os.getenv("EMR_BASE_URL")
         self.username = os.getenv("EMR_USERNAME")
         self.password = os.getenv("EMR_PASSWORD")
-        self.session = self._create_session()
-
-    def _create_session(self) -> requests.Session:
-        session = requests.Session()
-        session.auth = HTTPBasicAuth(self.username, self.password)
-        session.verify = False
-        return session
-
-    def _fetch(self, endpoint: str):
-        url = f"{self.base_url}/{endpoint}"
-        try:
-            response = self.session.get(url)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.HTTPError as http_err:
-            self._handle_http_error(response, http_err)
-        except requests.exceptions.RequestException as err:
-            raise HTTPException(status_code=500, detail=f"Error occurred while fetching data: {err}")
+        self.cache = cache if cache is not None else create_emr_cache()
 
     def _handle_http_error(self, response, http_err):
         if response.status_code == 401:
@@ -43,26 +39,194 @@ class EMRClient:
         else:
             raise HTTPException(status_code=response.status_code, detail=f"HTTP error occurred: {http_err}")
 
-    def get_patient_data(self, patient_id: str) -> Patient:
-        data = self._fetch(f"Patient/{patient_id}")
+    @staticmethod
+    def _observation_query(
+        patient_id: str, count: Optional[int] = None, sort: Optional[str] = None, last_updated: Optional[str] = None
+    ) -> str:
+        query = f"Observation?subject:Patient={patient_id}"
+        for name, value in (("_count", count), ("_sort", sort), ("_lastUpdated", last_updated)):
+            if value is not None:
+                query += f"&{name}={quote(str(value))}"
+        return query
+
+    @staticmethod
+    def _observation_limit() -> Optional[int]:
+        return EMR_OBSERVATION_LIMIT if EMR_OBSERVATION_LIMIT > 0 else None
+
+    def _observations_endpoint(self, patient_id: str) -> str:
+        limit = self._observation_limit()
+        count = EMR_OBSERVATION_PAGE_SIZE if limit is None else min(EMR_OBSERVATION_PAGE_SIZE, limit)
+        return self._observation_query(patient_id, count, EMR_OBSERVATION_SORT)
+
+    def _cached_observations(self, endpoint: str) -> Optional[dict]:
+        if self.cache is None:
+            return None
+        entry = self.cache.lookup(endpoint)
+        return entry["data"] if self.cache.is_fresh(entry) else None
+
+    def _cache_observations(self, endpoint: str, entries: List[Dict[str, Any]]) -> dict:
+        """Cache the collected pages as a single bundle, under the endpoint of the first page."""
+        data = {"resourceType": "Bundle", "type": "searchset", "entry": entries}
+        if self.cache is not None:
+            self.cache.store(endpoint, data)
+        return data
+
+    @staticmethod
+    def _next_link(bundle: dict, current_url: str) -> Optional[str]:
+        for link in bundle.get("link", []):
+            if link.get("relation") == "next" and link.get("url") != current_url:
+                return link.get("url")
+        return None
+
+    @staticmethod
+    def _parse_patient(patient_id: str, data: dict) -> Patient:
         if data:
             return Patient(**data)
         raise HTTPException(status_code=404, detail=f"Patient with ID {patient_id} not found")
 
-    def get_observations(self, patient_id: str) -> List[ObservationResource]:
-        data = self._fetch(f"Observation?subject:Patient={patient_id}")
+    @staticmethod
+    def _parse_observations(patient_id: str, data: dict) -> List[ObservationResource]:
         if data:
             return [ObservationResource(**entry.get("resource", {})) for entry in data.get("entry", [])]
         raise HTTPException(status_code=404, detail=f"Observations for patient with ID {patient_id} not found")
 
-    def get_conditions(self, patient_id: str) -> List[ConditionResource]:
-        data = self._fetch(f"Condition?patient={patient_id}")
+    @staticmethod
+    def _parse_conditions(patient_id: str, data: dict) -> List[ConditionResource]:
         if data:
             return [ConditionResource(**entry.get("resource", {})) for entry in data.get("entry", [])]
         raise HTTPException(status_code=404, detail=f"Conditions for patient with ID {patient_id} not found")
 
-    def get_allergy_details(self, patient_id: str) -> List[AllergyIntoleranceResource]:
-        data = self._fetch(f"AllergyIntolerance?patient={patient_id}")
+    @staticmethod
+    def _parse_allergy_details(patient_id: str, data: dict) -> List[AllergyIntoleranceResource]:
         if data:
             return [AllergyIntoleranceResource(**entry.get("resource", {})) for entry in data.get("entry", [])]
         raise HTTPException(status_code=404, detail=f"Allergy details for patient with ID {patient_id} not found")
+
+
+class AsyncEMRClient(BaseEMRClient):
+    """
+    Non-blocking EMR client backed by a pooled `httpx.AsyncClient`.
+    Connections are kept alive between requests and the pool, timeouts and HTTP/2 support are configured through
+    the `EMR_POOL_SIZE`, `EMR_KEEPALIVE_CONNECTIONS`, `EMR_KEEPALIVE_EXPIRY`, `EMR_CONNECT_TIMEOUT`,
+    `EMR_READ_TIMEOUT` and `EMR_HTTP2` environment variables.
+    """
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None, cache: Optional[EMRCache] = None):
+        super().__init__(cache)
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _create_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            auth=httpx.BasicAuth(self.username or "", self.password or ""),
+            verify=False,
+            http2=EMR_HTTP2,
+            limits=httpx.Limits(
+                max_connections=EMR_POOL_SIZE,
+                max_keepalive_connections=EMR_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=EMR_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(EMR_READ_TIMEOUT, connect=EMR_CONNECT_TIMEOUT),
+            transport=self._transport,
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+        return self._client
+
+    async def aclose(self):
+        """Close the pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _fetch(self, endpoint: str):
+        url = f"{self.base_url}/{endpoint}"
+        if self.cache is None:
+            return await self._get(url)
+        entry = self.cache.lookup(endpoint)
+        if self.cache.is_fresh(entry):
+            return entry["data"]
+        response = await self._request(url, headers=self.cache.conditional_headers(entry))
+        return self.cache.resolve(endpoint, entry, response)
+
+    async def _get(self, url: str):
+        return (await self._request(url)).json()
+
+    async def _request(self, url: str, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        try:
+            response = await self.client.get(url, headers=headers)
+            if response.status_code != 304:
+                response.raise_for_status()
+            return response
+        except httpx.HTTPStatusError as http_err:
+            self._handle_http_error(response, http_err)
+        except httpx.TimeoutException as err:
+            raise HTTPException(status_code=504, detail=f"Timed out while fetching data: {err!r}")
+        except httpx.RequestError as err:
+            raise HTTPException(status_code=500, detail=f"Error occurred while fetching data: {err}")
+
+    async def get_patient_data(self, patient_id: str) -> Patient:
+        return self._parse_patient(patient_id, await self._fetch(f"Patient/{patient_id}"))
+
+    async def get_observations(self, patient_id: str) -> List[ObservationResource]:
+        """
+        The most recent observations of a patient, sorted by `EMR_OBSERVATION_SORT` and read page by page until
+        `EMR_OBSERVATION_LIMIT` have been collected, so long-stay patients do not pull their whole history. The
+        collected observations are cached as one entry.
+
+        :param patient_id: The patient uuid as in the emr system.
+        """
+        endpoint = self._observations_endpoint(patient_id)
+        data = self._cached_observations(endpoint)
+        if data is None:
+            limit = self._observation_limit()
+            entries: List[Dict[str, Any]] = []
+            pages = self._observation_pages(endpoint)
+            try:
+                async for bundle in pages:
+                    if not bundle and not entries:
+                        return self._parse_observations(patient_id, bundle)
+                    entries.extend((bundle or {}).get("entry", []))
+                    if limit is not None and len(entries) >= limit:
+                        break
+            finally:
+                await pages.aclose()
+            data = self._cache_observations(endpoint, entries[:limit])
+        return self._parse_observations(patient_id, data)
+
+    async def _observation_pages(self, endpoint: str) -> AsyncIterator[Optional[dict]]:
+        url = f"{self.base_url}/{endpoint}"
+        while url:
+            bundle = await self._get(url)
+            yield bundle
+            url = self._next_link(bundle or {}, url)
+
+    async def iter_observations(
+        self,
+        patient_id: str,
+        count: Optional[int] = None,
+        sort: Optional[str] = None,
+        last_updated: Optional[str] = None,
+    ) -> AsyncIterator[ObservationResource]:
+        """
+        Streams a patient's observations page by page, following the Bundle's `next` link. Only one page is held
+        in memory at a time and the next page is requested only once the current one has been consumed, so
+        callers can stop iterating as soon as they have enough data.
+
+        :param patient_id: The patient uuid as in the emr system.
+        :param count: Page size, sent as `_count`.
+        :param sort: Sort order, sent as `_sort` (e.g. `-date` for the most recent first).
+        :param last_updated: Last updated filter, sent as `_lastUpdated` (e.g. `gt2024-01-01`).
+        """
+        async for bundle in self._observation_pages(self._observation_query(patient_id, count, sort, last_updated)):
+            for entry in (bundle or {}).get("entry", []):
+                yield ObservationResource(**entry.get("resource", {}))
+
+    async def get_conditions(self, patient_id: str) -> List[ConditionResource]:
+        return self._parse_conditions(patient_id, await self._fetch(f"Condition?patient={patient_id}"))
+
+    async def get_allergy_details(self, patient_id: str) -> List[AllergyIntoleranceResource]:
+        return self._parse_allergy_details(patient_id, await self._fetch(f"AllergyIntolerance?patient={patient_id}"))
@@ -0,0 +1,88 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Tuple
+from dotenv import load_dotenv
+from app.schemas.fields import Field
+
+load_dotenv()
+
+FORM_SCHEMA_CACHE_TTL = float(os.getenv("FORM_SCHEMA_CACHE_TTL", "300"))
+FORM_SCHEMA_CACHE_MAX_ENTRIES = int(os.getenv("FORM_SCHEMA_CACHE_MAX_ENTRIES", "256"))
+
+
+class FormSchema:
+    """
+    The validated fields of a form.
+
+    :param form_id: ID of the form.
+    :param fields: The fields of the form.
+    """
+
+    def __init__(self, form_id: int, fields: List[Field]):
+        self.form_id = form_id
+        self.fields: Tuple[Field, ...] = tuple(fields)
+
+
+class FormSchemaCache:
+    """
+    In-process cache of form schemas. Every form has a version that is bumped whenever it is invalidated, and a
+    schema loaded while the version changed is not stored, so a request racing an update can never put the
+    outdated schema back. Entries also expire after `ttl` seconds, which bounds how long other worker processes
+    keep serving a schema changed through another worker.
+    """
+
+    def __init__(self, ttl: float = FORM_SCHEMA_CACHE_TTL, max_entries: int = FORM_SCHEMA_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[int, Tuple[FormSchema, float]]" = OrderedDict()
+        self._versions: Dict[int, int] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, form_id: int, load: Callable[[], FormSchema]) -> FormSchema:
+        """
+        :param form_id: ID of the form.
+        :param load: Loads the schema from the database on a miss.
+        :return: The cached or freshly loaded schema.
+        """
+        with self._lock:
+            entry = self._entries.get(form_id)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(form_id)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            version = (self._generation, self._versions.get(form_id, 0))
+
+        schema = load()
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return schema
+        with self._lock:
+            if (self._generation, self._versions.get(form_id, 0)) == version:
+                self._entries[form_id] = (schema, time.monotonic() + self.ttl)
+                self._entries.move_to_end(form_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return schema
+
+    def invalidate(self, form_id: int):
+        """Drop the schema of a form and bump its version."""
+        with self._lock:
+            self._entries.pop(form_id, None)
+            self._versions[form_id] = self._versions.get(form_id, 0) + 1
+
+    def clear(self):
+        """Drop every schema, e.g. after the forms were changed outside of the services."""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+form_schema_cache = FormSchemaCache()
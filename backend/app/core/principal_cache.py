@@ -0,0 +1,114 @@
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Set, Tuple
+from dotenv import load_dotenv
+from app.schemas.users import User
+
+load_dotenv()
+
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+
+
+class PrincipalCache:
+    """
+    In-process cache of the users authenticated by access tokens, so a request carrying a token seen recently
+    neither decodes it again nor queries the `users` table. Entries are keyed by a digest of the token and expire
+    after `ttl` seconds or when the token itself expires, whichever comes first. Users are cached as detached
+    `User` schemas, never as ORM instances bound to the session of another request.
+
+    Every user name has a version that is bumped whenever it is invalidated, and a user loaded while the version
+    changed is not stored, so a request racing an update can never put the outdated user back. Other worker
+    processes keep serving a changed user for at most `ttl` seconds.
+    """
+
+    def __init__(self, ttl: float = PRINCIPAL_CACHE_TTL, max_entries: int = PRINCIPAL_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[User, float]]" = OrderedDict()
+        self._tokens: Dict[str, Set[str]] = {}
+        self._versions: Dict[str, int] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[User]:
+        """
+        :param token: The access token.
+        :return: The cached user of the token, or None on a miss.
+        """
+        key = self.key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def load(self, token: str, user_name: str, expires_at: Optional[float], load: Callable[[], User]) -> User:
+        """
+        Loads the user of a decoded token and caches it.
+
+        :param token: The access token.
+        :param user_name: The `sub` claim of the token.
+        :param expires_at: The `exp` claim of the token, as a UNIX timestamp.
+        :param load: Loads the user from the database.
+        :return: The freshly loaded user.
+        """
+        with self._lock:
+            version = (self._generation, self._versions.get(user_name, 0))
+
+        user = load()
+        ttl = self.ttl if expires_at is None else min(self.ttl, expires_at - time.time())
+        if ttl <= 0 or self.max_entries <= 0:
+            return user
+        key = self.key(token)
+        with self._lock:
+            if (self._generation, self._versions.get(user_name, 0)) == version:
+                self._entries[key] = (user, time.monotonic() + ttl)
+                self._entries.move_to_end(key)
+                self._tokens.setdefault(user_name, set()).add(key)
+                while len(self._entries) > self.max_entries:
+                    self._remove(next(iter(self._entries)))
+        return user
+
+    def _remove(self, key: str):
+        user, _ = self._entries.pop(key)
+        tokens = self._tokens.get(user.user_name)
+        if tokens is not None:
+            tokens.discard(key)
+            if not tokens:
+                del self._tokens[user.user_name]
+
+    def invalidate(self, *user_names: str):
+        """Drop every cached token of the given users and bump their versions."""
+        with self._lock:
+            for user_name in user_names:
+                for key in self._tokens.pop(user_name, ()):
+                    self._entries.pop(key, None)
+                self._versions[user_name] = self._versions.get(user_name, 0) + 1
+
+    def clear(self):
+        """Drop every user, e.g. after the users were changed outside of the services."""
+        with self._lock:
+            self._entries.clear()
+            self._tokens.clear()
+            self._generation += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+principal_cache = PrincipalCache()
@@ -0,0 +1,76 @@
+import os
+import json
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+from dotenv import load_dotenv
+from app.core.cache import CacheBackend, create_cache
+
+load_dotenv()
+
+SUMMARY_CACHE_BACKEND = os.getenv("SUMMARY_CACHE_BACKEND", "memory")
+SUMMARY_CACHE_TTL = float(os.getenv("SUMMARY_CACHE_TTL", "3600"))
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "500"))
+SUMMARY_CACHE_MAX_BYTES = int(os.getenv("SUMMARY_CACHE_MAX_BYTES", str(20 * 1024 * 1024)))
+REDIS_URL = os.getenv("REDIS_URL")
+
+
+def content_hash(value: Any) -> str:
+    """Stable SHA-256 digest of a JSON serializable value, independent of key order."""
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class SummaryCache:
+    """
+    Memoizes generated patient summaries. Entries are keyed by the patient, a digest of the normalized patient
+    context and a digest of the parameters that shape the summary (department, specialty and model settings).
+    The latest context digest of every patient is tracked, so when the EMR data changes all summaries built from
+    the previous data are dropped.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float = SUMMARY_CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(patient_id: str, context: Dict[str, Any], parameters: Dict[str, Any]) -> str:
+        return f"summary:{patient_id}:{content_hash(context)}:{content_hash(parameters)}"
+
+    def get(self, patient_id: str, context: Dict[str, Any], parameters: Dict[str, Any]) -> Optional[str]:
+        version_key = f"summary:{patient_id}:version"
+        context_digest = content_hash(context)
+        if self.backend.get(version_key) != context_digest:
+            self.invalidate_patient(patient_id)
+            self.backend.set(version_key, context_digest, self.ttl)
+        summary = self.backend.get(self.key(patient_id, context, parameters))
+        with self._lock:
+            if summary is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return summary
+
+    def set(self, patient_id: str, context: Dict[str, Any], parameters: Dict[str, Any], summary: str):
+        self.backend.set(self.key(patient_id, context, parameters), summary, self.ttl)
+
+    def invalidate_patient(self, patient_id: str):
+        """Drop every cached summary of a patient."""
+        self.backend.delete_matching(f"summary:{patient_id}:")
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def create_summary_cache() -> Optional[SummaryCache]:
+    """Build the summary cache configured by the `SUMMARY_CACHE_*` environment variables, or None when disabled."""
+    backend = create_cache(
+        SUMMARY_CACHE_BACKEND,
+        prefix="copilot:",
+        redis_url=REDIS_URL,
+        max_entries=SUMMARY_CACHE_MAX_ENTRIES,
+        max_bytes=SUMMARY_CACHE_MAX_BYTES,
+    )
+    return SummaryCache(backend) if backend is not None else None
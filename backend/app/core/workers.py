@@ -0,0 +1,90 @@
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TRANSCRIPTION_WORKERS = int(os.getenv("TRANSCRIPTION_WORKERS", "4"))
+TRANSCRIPTION_CHUNK_WORKERS = int(os.getenv("TRANSCRIPTION_CHUNK_WORKERS", "4"))
+S3_UPLOAD_WORKERS = int(os.getenv("S3_UPLOAD_WORKERS", "4"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+
+
+class WorkerPool:
+    """
+    A bounded pool of background threads used to run long jobs outside of the request/response cycle.
+    The underlying executor is created lazily on first use and recreated after a shutdown.
+    """
+
+    def __init__(self, max_workers: int, thread_name_prefix: str):
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=self.thread_name_prefix
+                )
+            return self._executor
+
+    @staticmethod
+    def _log_failure(future: Future):
+        if future.cancelled():
+            return
+        exception = future.exception()
+        if exception is not None:
+            logging.error(f"Background job failed: {exception}")
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Schedule a callable on the pool.
+
+        :param fn: The callable to run.
+        :return: A future for the scheduled job.
+        """
+        future = self._get_executor().submit(fn, *args, **kwargs)
+        future.add_done_callback(self._log_failure)
+        return future
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs and optionally wait for the running ones to finish."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+
+class RateLimitGate:
+    """
+    A pause shared by every caller of a rate limited API. Once one caller is throttled, the others hold off
+    until the pause has elapsed instead of adding to the burst.
+    """
+
+    def __init__(self):
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Block until the current pause, if any, has elapsed."""
+        delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def pause(self, seconds: float):
+        """Hold off every caller for at least the given number of seconds."""
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+
+transcription_pool = WorkerPool(max_workers=TRANSCRIPTION_WORKERS, thread_name_prefix="transcription")
+transcription_chunk_pool = WorkerPool(max_workers=TRANSCRIPTION_CHUNK_WORKERS, thread_name_prefix="transcription-chunk")
+s3_upload_pool = WorkerPool(max_workers=S3_UPLOAD_WORKERS, thread_name_prefix="s3-upload")
+password_pool = WorkerPool(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+whisper_rate_limit = RateLimitGate()
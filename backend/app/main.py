@@ -3,7 +3,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from app.api.routes import router as api_router
 from app.api.routes.root import router as root_router
-from app.config.database import create_tables, db_engine
+from app.api.routes.patients import emr_client
+from app.config.database import create_tables, db_engine, log_pool_sizing
+from app.core.workers import transcription_pool, transcription_chunk_pool, s3_upload_pool, password_pool
+from app.utils.transcribers import TRANSCRIPTION_BACKEND, get_transcriber
 import app.models.fields as fields
 import app.models.forms as forms
 import app.models.transcriptions as transcriptions
@@ -30,6 +33,7 @@ def get_application():
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Summary-Cache", "X-Next-Cursor"],
     )
 
     app.include_router(api_router, prefix="/api")
@@ -38,6 +42,15 @@ def get_application():
 
     create_tables([forms.Base, fields.Base, users.Base, transcriptions.Base], db_engine)
 
+    app.add_event_handler("startup", log_pool_sizing)
+    if TRANSCRIPTION_BACKEND == "local":
+        app.add_event_handler("startup", get_transcriber().load)
+    app.add_event_handler("shutdown", transcription_pool.shutdown)
+    app.add_event_handler("shutdown", transcription_chunk_pool.shutdown)
+    app.add_event_handler("shutdown", s3_upload_pool.shutdown)
+    app.add_event_handler("shutdown", password_pool.shutdown)
+    app.add_event_handler("shutdown", emr_client.aclose)
+
     return app
 
 
@@ -1,11 +1,15 @@
 from app.config.database import Base
-from sqlalchemy import Column, Integer, String, TIMESTAMP, ForeignKey
+from sqlalchemy import Column, Integer, String, TIMESTAMP, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
 
 class Providers(Base):
     __tablename__ = "providers"
+    __table_args__ = (
+        Index("ix_providers_user_id", "user_id"),
+        Index("ix_providers_department_id_id", "department_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True, index=True, nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -1,11 +1,15 @@
 from app.config.database import Base
-from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, ForeignKey, Index, JSON
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
 
 class Transcriptions(Base):
     __tablename__ = "transcriptions"
+    __table_args__ = (
+        Index("ix_transcriptions_user_id", "user_id"),
+        Index("ix_transcriptions_form_id", "form_id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True, index=True, nullable=False)
     upload_uuid = Column(String(255), nullable=False)
@@ -0,0 +1,32 @@
+from functools import lru_cache
+from typing import Any, List
+from pydantic import TypeAdapter
+from app.schemas.departments import Department
+from app.schemas.fields import Field
+from app.schemas.forms import Form
+from app.schemas.providers import Provider
+from app.schemas.users import User
+
+
+@lru_cache(maxsize=None)
+def type_adapter(type_: Any) -> TypeAdapter:
+    """
+    Returns the shared `TypeAdapter` of a type, building it on first use only. Building an adapter compiles its
+    pydantic-core validator and serializer, which costs far more than validating a single object with it.
+
+    :param type_: The type to validate, e.g. a schema or `List` of a schema.
+    :return: The adapter, whose `validate_python`, `dump_python` and `dump_json` can be used from any thread.
+    """
+    return TypeAdapter(type_)
+
+
+department_adapter = type_adapter(Department)
+department_list_adapter = type_adapter(List[Department])
+field_adapter = type_adapter(Field)
+field_list_adapter = type_adapter(List[Field])
+form_adapter = type_adapter(Form)
+form_list_adapter = type_adapter(List[Form])
+provider_adapter = type_adapter(Provider)
+provider_list_adapter = type_adapter(List[Provider])
+user_adapter = type_adapter(User)
+user_list_adapter = type_adapter(List[User])
@@ -3,12 +3,15 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from datetime import datetime, timedelta, timezone
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import Union, Any
 from app.models.users import Users
 from app.schemas.users import User
+from app.schemas.adapters import user_adapter
 from app.config.database import get_db
+from app.core.principal_cache import principal_cache
+from app.utils.passwords import password_hasher
 
 
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
@@ -16,19 +19,23 @@ REFRESH_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7
 ALGORITHM = "HS256"
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
 JWT_REFRESH_SECRET_KEY = os.getenv("JWT_REFRESH_SECRET_KEY")
-password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 auth_schema = OAuth2PasswordBearer(tokenUrl="/api/auth/login", scheme_name="JWT")
 
 
 def get_hashed_password(password: str) -> str:
-    """Hash the given password using bcrypt."""
-    return password_context.hash(password)
+    """Hash the given password using bcrypt, on the password hashing pool."""
+    return password_hasher.hash(password)
+
+
+async def get_hashed_password_async(password: str) -> str:
+    """Same as `get_hashed_password`, for async routes."""
+    return await password_hasher.hash_async(password)
 
 
 def verify_password(password: str, hashed_pass: str) -> bool:
-    """Verify the given password against the hashed password."""
-    return password_context.verify(password, hashed_pass)
+    """Verify the given password against the hashed password, on the password hashing pool."""
+    return password_hasher.verify(password, hashed_pass)
 
 
 def create_token(subject: Union[str, Any], secret_key: str, expires_delta: timedelta) -> str:
@@ -65,20 +72,59 @@ def get_user_by_user_id(db: Session, user_id: str) -> Users:
     return user
 
 
+def _invalid_login() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid username or password",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _store_password_hash(db: Session, user: Users, hashed_password: str):
+    """Replace the stored hash of a user, e.g. after the bcrypt cost was changed."""
+    user.password = hashed_password
+    db.commit()
+
+
 def authenticate_user(db: Session, user_name: str, password: str) -> User:
-    """Authenticate a user by username and password."""
+    """
+    Authenticate a user by username and password. A password hashed with another bcrypt cost than the
+    configured one is rehashed.
+    """
     user = get_user_by_user_name(db, user_name)
-    if not user or not verify_password(password, user.password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid username or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    valid, hashed_password = password_hasher.verify_and_update(password, user.password)
+    if not valid:
+        raise _invalid_login()
+    if hashed_password:
+        _store_password_hash(db, user, hashed_password)
+    return user
+
+
+async def authenticate_user_async(db: Session, user_name: str, password: str) -> User:
+    """
+    Same as `authenticate_user`, for async routes. The database is queried on the threadpool and the
+    password verified on the password hashing pool, so no thread is held while a login waits for a free core.
+    """
+    user = await run_in_threadpool(get_user_by_user_name, db, user_name)
+    valid, hashed_password = await password_hasher.verify_and_update_async(password, user.password)
+    if not valid:
+        raise _invalid_login()
+    if hashed_password:
+        await run_in_threadpool(_store_password_hash, db, user, hashed_password)
     return user
 
 
 def get_current_user(db: Session = Depends(get_db), token: str = Depends(auth_schema)) -> User:
-    """Retrieve the current user based on the JWT token."""
+    """
+    Retrieve the current user based on the JWT token.
+
+    The user of a token seen recently is served from the principal cache without decoding the token or querying
+    the database. Within a request, FastAPI resolves this dependency once however many router dependencies and
+    route parameters depend on it, as long as they use `Depends(get_current_user)` with the default `use_cache`.
+    """
+    user = principal_cache.get(token)
+    if user is not None:
+        return user
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid credentials",
@@ -89,13 +135,17 @@ def get_current_user(db: Session = Depends(get_db), token: str = Depends(auth_sc
         user_name: str = payload.get("sub")
         if user_name is None:
             raise credentials_exception
-        user = get_user_by_user_name(db, user_name=user_name)
-        return user
+        return principal_cache.load(
+            token,
+            user_name,
+            payload.get("exp"),
+            lambda: user_adapter.validate_python(get_user_by_user_name(db, user_name=user_name)),
+        )
     except JWTError:
         raise credentials_exception
 
 
-def is_admin(user: Users = Depends(get_current_user)):
+def is_admin(user: User = Depends(get_current_user)):
     """Check if the user is an admin."""
     if not user.is_admin:
         raise HTTPException(
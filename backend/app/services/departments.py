@@ -1,15 +1,17 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
-from pydantic import TypeAdapter
 from typing import List
 from app.models.departments import Departments
 from app.schemas.departments import DepartmentCreate, DepartmentUpdate, Department
+from app.schemas.adapters import department_adapter, department_list_adapter
 
 
 class DepartmentsService:
     @staticmethod
     def get_all_departments(db: Session) -> List[Department]:
-        return TypeAdapter(List[Department]).validate_python(db.query(Departments).all())
+        return department_list_adapter.validate_python(db.query(Departments).all())
 
     @staticmethod
     def get_department_by_id(db: Session, department_id: int) -> Department:
@@ -18,7 +20,16 @@ class DepartmentsService:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail=f"Department with id {department_id} not found"
             )
-        return TypeAdapter(Department).validate_python(department)
+        return department_adapter.validate_python(department)
+
+    @staticmethod
+    async def get_department_by_id_async(db: AsyncSession, department_id: int) -> Department:
+        department = (await db.execute(select(Departments).filter(Departments.id == department_id))).scalars().first()
+        if not department:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail=f"Department with id {department_id} not found"
+            )
+        return department_adapter.validate_python(department)
 
     @staticmethod
     def create_department(db: Session, department_data: DepartmentCreate) -> Department:
@@ -26,7 +37,7 @@ class DepartmentsService:
         db.add(new_department)
         db.commit()
         db.refresh(new_department)
-        return TypeAdapter(Department).validate_python(new_department)
+        return department_adapter.validate_python(new_department)
 
     @staticmethod
     def update_department(db: Session, department_id: int, department_data: DepartmentUpdate) -> Department:
@@ -37,7 +48,7 @@ class DepartmentsService:
             setattr(department, key, value)
         db.commit()
         db.refresh(department)
-        return TypeAdapter(Department).validate_python(department)
+        return department_adapter.validate_python(department)
 
     @staticmethod
     def delete_department(db: Session, department_id: int) -> None:
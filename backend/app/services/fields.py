@@ -1,29 +1,78 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
-from pydantic import TypeAdapter
-from typing import List
+from typing import List, Optional
+from app.core.form_schema_cache import FormSchema, form_schema_cache
 from app.models.fields import Fields
+from app.models.forms import Forms
 from app.schemas.fields import FieldCreate, FieldUpdate, Field
+from app.schemas.adapters import field_adapter, field_list_adapter
+from app.utils.pagination import Page, paginate, filters
 from app.services.forms import FormsService
 
 
 class FieldsService:
     @staticmethod
-    def get_all_fields(db: Session) -> List[Field]:
-        return TypeAdapter(List[Field]).validate_python(db.query(Fields).all())
+    def get_all_fields(
+        db: Session,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+        form_id: Optional[int] = None,
+        field_type: Optional[str] = None,
+    ) -> Page:
+        """
+        Lists the fields ordered by ID, one keyset page at a time.
+
+        :param db: Database session.
+        :param after_id: Only return the fields with a greater ID.
+        :param limit: Maximum number of fields to return, or None for all of them.
+        :param fields: Attributes to return, all of them when None.
+        :param form_id: Only return the fields with this `form_id`.
+        :param field_type: Only return the fields with this `field_type`.
+        :return: The page of fields with the cursor of the next page.
+        """
+        query = db.query(Fields).filter_by(**filters(form_id=form_id, field_type=field_type))
+        return paginate(query, Fields, Field, field_list_adapter, after_id, limit, fields)
 
     @staticmethod
     def get_field_by_id(db: Session, field_id: int) -> Field:
         field = db.query(Fields).filter(Fields.id == field_id).first()
         if not field:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Field with id {field_id} not found")
-        return TypeAdapter(Field).validate_python(field)
+        return field_adapter.validate_python(field)
+
+    @staticmethod
+    def get_form_schema(db: Session, form_id: int) -> FormSchema:
+        """
+        Returns the fields of a form from the form schema cache, loading the form and its fields in a single
+        query on a miss. The cached schema is invalidated whenever the form or one of its fields changes.
+
+        :param db: Database session.
+        :param form_id: ID of the form.
+        :return: The schema of the form.
+        """
+
+        def load() -> FormSchema:
+            form = db.query(Forms).filter(Forms.id == form_id).first()
+            if not form:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Form with id {form_id} not found")
+            fields = sorted(form.fields, key=lambda field: field.id)
+            return FormSchema(form_id, field_list_adapter.validate_python(fields))
+
+        return form_schema_cache.get(form_id, load)
 
     @staticmethod
     def get_fields_by_form_id(db: Session, form_id: int) -> List[Field]:
-        FormsService.get_form_by_id(db, form_id=form_id)
-        fields = db.query(Fields).filter(Fields.form_id == form_id)
-        return TypeAdapter(List[Field]).validate_python(fields)
+        return list(FieldsService.get_form_schema(db, form_id).fields)
+
+    @staticmethod
+    async def get_fields_by_form_id_async(db: AsyncSession, form_id: int) -> List[Field]:
+        """
+        Same as `get_fields_by_form_id` for async routes. The synchronous lookup runs through `run_sync`, so it
+        shares the form schema cache and only awaits the database on a miss.
+        """
+        return await db.run_sync(FieldsService.get_fields_by_form_id, form_id)
 
     @staticmethod
     def create_field(db: Session, field_data: FieldCreate) -> Field:
@@ -32,7 +81,8 @@ class FieldsService:
         db.add(new_field)
         db.commit()
         db.refresh(new_field)
-        return TypeAdapter(Field).validate_python(new_field)
+        form_schema_cache.invalidate(new_field.form_id)
+        return field_adapter.validate_python(new_field)
 
     @staticmethod
     def update_field(db: Session, field_id: int, field_data: FieldUpdate) -> Field:
@@ -43,12 +93,15 @@ class FieldsService:
             setattr(field, key, value)
         db.commit()
         db.refresh(field)
-        return TypeAdapter(Field).validate_python(field)
+        form_schema_cache.invalidate(field.form_id)
+        return field_adapter.validate_python(field)
 
     @staticmethod
     def delete_field(db: Session, field_id: int) -> None:
         field = db.query(Fields).filter(Fields.id == field_id).first()
         if not field:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Field with id {field_id} not found")
+        form_id = field.form_id
         db.delete(field)
         db.commit()
+        form_schema_cache.invalidate(form_id)
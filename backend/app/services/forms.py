@@ -1,22 +1,39 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, lazyload
 from fastapi import HTTPException, status
-from pydantic import TypeAdapter
-from typing import List
+from typing import List, Optional
+from app.core.form_schema_cache import form_schema_cache
 from app.models.forms import Forms
 from app.schemas.forms import FormCreate, FormUpdate, Form
+from app.schemas.adapters import form_adapter, form_list_adapter
+from app.utils.pagination import Page, paginate
 
 
 class FormsService:
     @staticmethod
-    def get_all_forms(db: Session) -> List[Form]:
-        return TypeAdapter(List[Form]).validate_python(db.query(Forms).all())
+    def get_all_forms(
+        db: Session,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+    ) -> Page:
+        """
+        Lists the forms ordered by ID, one keyset page at a time.
+
+        :param db: Database session.
+        :param after_id: Only return the forms with a greater ID.
+        :param limit: Maximum number of forms to return, or None for all of them.
+        :param fields: Attributes to return, all of them when None.
+        :return: The page of forms with the cursor of the next page.
+        """
+        query = db.query(Forms).options(lazyload(Forms.fields))
+        return paginate(query, Forms, Form, form_list_adapter, after_id, limit, fields)
 
     @staticmethod
     def get_form_by_id(db: Session, form_id: int) -> Form:
         form = db.query(Forms).filter(Forms.id == form_id).first()
         if not form:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Form with id {form_id} not found")
-        return TypeAdapter(Form).validate_python(form)
+        return form_adapter.validate_python(form)
 
     @staticmethod
     def create_form(db: Session, form_data: FormCreate) -> Form:
@@ -24,7 +41,7 @@ class FormsService:
         db.add(new_form)
         db.commit()
         db.refresh(new_form)
-        return TypeAdapter(Form).validate_python(new_form)
+        return form_adapter.validate_python(new_form)
 
     @staticmethod
     def update_form(db: Session, form_id: int, form_data: FormUpdate) -> Form:
@@ -35,7 +52,8 @@ class FormsService:
             setattr(form, key, value)
         db.commit()
         db.refresh(form)
-        return TypeAdapter(Form).validate_python(form)
+        form_schema_cache.invalidate(form_id)
+        return form_adapter.validate_python(form)
 
     @staticmethod
     def delete_form(db: Session, form_id: int) -> None:
@@ -44,3 +62,4 @@ class FormsService:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Form with id {form_id} not found")
         db.delete(form)
         db.commit()
+        form_schema_cache.invalidate(form_id)
@@ -1,44 +1,161 @@
-from app.core.emr_client import EMRClient
-from fastapi import HTTPException
-from app.schemas.patients import (
-    PatientContext,
-    Patient,
-    ObservationResource,
-    ConditionResource,
-    AllergyIntoleranceResource,
-)
+import os
+import asyncio
+import logging
+from dotenv import load_dotenv
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+from app.core.emr_client import AsyncEMRClient
+from app.core.summary_cache import SummaryCache, create_summary_cache
+from fastapi import HTTPException, status
+from app.schemas.patients import PatientContext
 from app.schemas.users import User
 from app.schemas.departments import Department
-from typing import List
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from app.utils.openai import OpenAIUtils
 
+load_dotenv()
+
+EMR_FETCH_TIMEOUT = float(os.getenv("EMR_FETCH_TIMEOUT", "30"))
+
 
 class PatientService:
-    def __init__(self, emr_client: EMRClient):
+    def __init__(self, emr_client: AsyncEMRClient, summary_cache: Optional[SummaryCache] = None):
         self.emr_client = emr_client
+        self.summary_cache = summary_cache if summary_cache is not None else create_summary_cache()
+
+    @staticmethod
+    def _summary_key(patient_context: PatientContext, user: User, department: Department) -> Tuple[dict, dict]:
+        context = patient_context.model_dump(by_alias=True, exclude_none=True, mode="json")
+        parameters = {
+            "department": department.name,
+            "specialty": getattr(user, "specialty", None),
+            **OpenAIUtils.SUMMARY_MODEL_PARAMS,
+        }
+        return context, parameters
+
+    def _get_cached_summary(
+        self, patient_id: str, patient_context: PatientContext, user: User, department: Department
+    ) -> Optional[str]:
+        if self.summary_cache is None:
+            return None
+        return self.summary_cache.get(patient_id, *self._summary_key(patient_context, user, department))
+
+    def _cache_summary(
+        self, patient_id: str, patient_context: PatientContext, user: User, department: Department, summary: str
+    ):
+        if self.summary_cache is not None and isinstance(summary, str):
+            self.summary_cache.set(patient_id, *self._summary_key(patient_context, user, department), summary)
+
+    @staticmethod
+    def _empty_if_missing(patient_id: str, resource: str, error: HTTPException) -> list:
+        if error.status_code != status.HTTP_404_NOT_FOUND:
+            raise error
+        logging.info(f"No {resource} found for patient {patient_id}: {error.detail}")
+        return []
 
-    def get_patient_context(self, patient_id: str, user: User, department: Department) -> str:
+    async def _fetch_patient_context_async(self, patient_id: str) -> PatientContext:
+        """
+        Fetches the patient and their observations, conditions and allergies from the EMR concurrently on the
+        event loop, so the wait is bounded by the slowest request rather than the sum of all four.
+
+        A missing (404) observation, condition or allergy bundle is treated as an empty list. Any other failure,
+        or the fetches not finishing within `EMR_FETCH_TIMEOUT` seconds, fails the whole request.
+
+        :param patient_id: The patient uuid as in the emr system.
+        :return: The assembled patient context.
+        """
         try:
-            patient: Patient = self.emr_client.get_patient_data(patient_id)
-            if not patient:
-                raise HTTPException(status_code=404, detail="Patient not found")
-
-            observations: List[ObservationResource] = self.emr_client.get_observations(patient_id)
-            conditions: List[ConditionResource] = self.emr_client.get_conditions(patient_id)
-            allergies: List[AllergyIntoleranceResource] = self.emr_client.get_allergy_details(patient_id)
-
-            patient_context: PatientContext = PatientContext(
-                patient=patient,
-                observations=observations,
-                conditions=conditions,
-                allergies=allergies,
+            outcomes: List[Any] = await asyncio.wait_for(
+                asyncio.gather(
+                    self.emr_client.get_patient_data(patient_id),
+                    self.emr_client.get_observations(patient_id),
+                    self.emr_client.get_conditions(patient_id),
+                    self.emr_client.get_allergy_details(patient_id),
+                    return_exceptions=True,
+                ),
+                timeout=EMR_FETCH_TIMEOUT,
+            )
+        except asyncio.TimeoutError:
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail=f"Timed out fetching patient {patient_id} from the EMR",
             )
-            patient_diagnosis = OpenAIUtils.analyze_patient_context(
+
+        patient, *outcomes = outcomes
+        if isinstance(patient, BaseException):
+            raise patient
+        if not patient:
+            raise HTTPException(status_code=404, detail="Patient not found")
+
+        resources = {}
+        for resource, outcome in zip(("observations", "conditions", "allergies"), outcomes):
+            if isinstance(outcome, HTTPException):
+                outcome = self._empty_if_missing(patient_id, resource, outcome)
+            elif isinstance(outcome, BaseException):
+                raise outcome
+            resources[resource] = outcome
+
+        return PatientContext(patient=patient, **resources)
+
+    async def get_patient_summary_async(self, patient_id: str, user: User, department: Department) -> Tuple[str, bool]:
+        """
+        Builds the patient summary without blocking the event loop, reusing a cached one when the patient's EMR
+        data and the summary parameters are unchanged. The completion itself runs on the threadpool.
+
+        :return: The summary and whether it was served from the summary cache.
+        """
+        try:
+            patient_context: PatientContext = await self._fetch_patient_context_async(patient_id)
+            summary = self._get_cached_summary(patient_id, patient_context, user, department)
+            if summary is not None:
+                return summary, True
+            summary = await run_in_threadpool(
+                OpenAIUtils.analyze_patient_context,
                 patient_context=patient_context,
                 user=user,
                 department=department,
             )
-            return patient_diagnosis
+            self._cache_summary(patient_id, patient_context, user, department, summary)
+            return summary, False
+        except HTTPException as e:
+            raise e
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Internal Server Error: {e}")
+
+    async def stream_patient_summary(
+        self, patient_id: str, user: User, department: Department
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Streams the patient summary as `(event, data)` pairs: `progress` events while the EMR is queried,
+        `token` events carrying the summary text as the model generates it and a final `done` event. A cached
+        summary is sent as a single `token` event. Requires an `AsyncEMRClient`.
+
+        :raises HTTPException: If fetching the patient context or generating the summary fails.
+        """
+        try:
+            yield "progress", {"stage": "fetching_emr"}
+            patient_context: PatientContext = await self._fetch_patient_context_async(patient_id)
+            yield "progress", {
+                "stage": "emr_fetched",
+                "observations": len(patient_context.observations),
+                "conditions": len(patient_context.conditions),
+                "allergies": len(patient_context.allergies),
+            }
+
+            summary = self._get_cached_summary(patient_id, patient_context, user, department)
+            if summary is not None:
+                yield "token", {"text": summary}
+                yield "done", {"cached": True}
+                return
+
+            yield "progress", {"stage": "summarizing"}
+            chunks = []
+            async for chunk in iterate_in_threadpool(
+                OpenAIUtils.stream_patient_context(patient_context=patient_context, user=user, department=department)
+            ):
+                chunks.append(chunk)
+                yield "token", {"text": chunk}
+            self._cache_summary(patient_id, patient_context, user, department, "".join(chunks))
+            yield "done", {"cached": False}
         except HTTPException as e:
             raise e
         except Exception as e:
@@ -1,18 +1,40 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
-from pydantic import TypeAdapter
-from typing import List
+from typing import List, Optional
 from app.models.providers import Providers
 from app.models.users import Users
 from app.models.departments import Departments
 from app.schemas.providers import ProviderCreate, ProviderUpdate, Provider
+from app.schemas.adapters import provider_adapter, provider_list_adapter
+from app.utils.pagination import Page, paginate, filters
 
 
 class ProvidersService:
 
     @staticmethod
-    def get_all_providers(db: Session) -> List[Provider]:
-        return TypeAdapter(List[Provider]).validate_python(db.query(Providers).all())
+    def get_all_providers(
+        db: Session,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+        department_id: Optional[int] = None,
+        specialty: Optional[str] = None,
+    ) -> Page:
+        """
+        Lists the providers ordered by ID, one keyset page at a time.
+
+        :param db: Database session.
+        :param after_id: Only return the providers with a greater ID.
+        :param limit: Maximum number of providers to return, or None for all of them.
+        :param fields: Attributes to return, all of them when None.
+        :param department_id: Only return the providers with this `department_id`.
+        :param specialty: Only return the providers with this `specialty`.
+        :return: The page of providers with the cursor of the next page.
+        """
+        query = db.query(Providers).filter_by(**filters(department_id=department_id, specialty=specialty))
+        return paginate(query, Providers, Provider, provider_list_adapter, after_id, limit, fields)
 
     @staticmethod
     def get_provider_by_id(db: Session, provider_id: int) -> Provider:
@@ -21,7 +43,7 @@ class ProvidersService:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail=f"Provider with id {provider_id} not found"
             )
-        return TypeAdapter(Provider).validate_python(provider)
+        return provider_adapter.validate_python(provider)
 
     @staticmethod
     def get_provider_by_user_id(db: Session, user_id: int) -> Provider:
@@ -30,7 +52,16 @@ class ProvidersService:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail=f"Provider with user id {user_id} not found"
             )
-        return TypeAdapter(Provider).validate_python(provider)
+        return provider_adapter.validate_python(provider)
+
+    @staticmethod
+    async def get_provider_by_user_id_async(db: AsyncSession, user_id: int) -> Provider:
+        provider = (await db.execute(select(Providers).filter(Providers.user_id == user_id))).scalars().first()
+        if not provider:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail=f"Provider with user id {user_id} not found"
+            )
+        return provider_adapter.validate_python(provider)
 
     @staticmethod
     def create_provider(db: Session, provider_data: ProviderCreate) -> Provider:
@@ -49,7 +80,7 @@ class ProvidersService:
         db.add(new_provider)
         db.commit()
         db.refresh(new_provider)
-        return TypeAdapter(Provider).validate_python(new_provider)
+        return provider_adapter.validate_python(new_provider)
 
     @staticmethod
     def update_provider(db: Session, provider_id: int, provider_data: ProviderUpdate) -> Provider:
@@ -62,7 +93,7 @@ class ProvidersService:
             setattr(provider, key, value)
         db.commit()
         db.refresh(provider)
-        return TypeAdapter(Provider).validate_python(provider)
+        return provider_adapter.validate_python(provider)
 
     @staticmethod
     def delete_provider(db: Session, provider_id: int) -> None:
@@ -1,33 +1,90 @@
 import uuid
 import os
-from sqlalchemy.orm import Session
+import shutil
+import time
+import logging
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from fastapi import HTTPException, status, UploadFile
+from app.config.database import SessionLocal
+from app.core.workers import s3_upload_pool, transcription_chunk_pool, transcription_pool, whisper_rate_limit
 from app.models.transcriptions import Transcriptions
+from app.schemas.fields import Field
 from app.schemas.transcriptions import Transcription
 from app.services.fields import FieldsService
+from app.utils.audio import AudioUtils, TimestampMap
+from app.utils.form_extractor import FormExtractor, extraction_stats
 from app.utils.s3 import S3Utils
 from app.utils.openai import OpenAIUtils
+from app.utils.transcribers import get_transcriber
+
+load_dotenv()
+
+CONCURRENT_UPLOAD = os.getenv("TRANSCRIPTION_CONCURRENT_UPLOAD", "true").lower() == "true"
+EXTRACTION_MODE = os.getenv("TRANSCRIPTION_EXTRACTION_MODE", "combined").lower()
+LOCAL_EXTRACTION = os.getenv("TRANSCRIPTION_LOCAL_EXTRACTION", "true").lower() == "true"
+# Lowest confidence score of the form, and of a prefilled value kept without extracting it again.
+MIN_CONFIDENCE = 35
+MAX_UPLOAD_BYTES = int(os.getenv("TRANSCRIPTION_MAX_UPLOAD_BYTES", str(200 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = int(os.getenv("TRANSCRIPTION_UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+CHUNK_SECONDS = float(os.getenv("TRANSCRIPTION_CHUNK_SECONDS", "600"))
+CHUNK_OVERLAP = float(os.getenv("TRANSCRIPTION_CHUNK_OVERLAP", "2"))
+RATE_LIMIT_RETRIES = int(os.getenv("TRANSCRIPTION_RATE_LIMIT_RETRIES", "5"))
+RATE_LIMIT_BACKOFF = float(os.getenv("TRANSCRIPTION_RATE_LIMIT_BACKOFF", "1"))
+
+
+class UploadStream:
+    """
+    Reads an uploaded file in bounded chunks, failing with `413` as soon as more than `max_bytes` have been read,
+    and optionally copies every chunk into `sink` so one pass over the upload can feed two consumers.
+    """
+
+    def __init__(self, source: BinaryIO, sink: Optional[BinaryIO] = None, max_bytes: Optional[int] = None):
+        self.source = source
+        self.sink = sink
+        self.max_bytes = MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            return b"".join(iter(lambda: self.read(UPLOAD_CHUNK_BYTES), b""))
+        data = self.source.read(size)
+        self.bytes_read += len(data)
+        if self.bytes_read > self.max_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Uploaded file exceeds the maximum size of {self.max_bytes} bytes.",
+            )
+        if self.sink is not None:
+            self.sink.write(data)
+        return data
 
 
 class TranscriptionService:
 
     SUPPORTED_FILE_TYPES = {"mp3", "mp4", "mpeg", "mpga", "m4a", "wav", "webm"}
 
-    @staticmethod
-    def create_transcription(db: Session, user_id: int, form_id: int, file: UploadFile) -> Transcription:
-        """
-        Creates a new transcription record and uploads the associated audio file to S3.
+    STATUS_PENDING = "pending"
+    STATUS_UPLOADED = "uploaded"
+    STATUS_TRANSCRIBED = "transcribed"
+    STATUS_VALIDATED = "validated"
+    STATUS_COMPLETED = "completed"
+    STATUS_FAILED = "failed"
+    TERMINAL_STATUSES = {STATUS_COMPLETED, STATUS_FAILED}
 
-        :param db: Database session.
-        :param user_id: ID of the user creating the transcription.
-        :param form_id: ID of the form associated with the transcription.
-        :param file: Uploaded audio file.
-        :return: The created Transcriptions record.
-        """
+    @staticmethod
+    async def _get_form_fields_async(db: AsyncSession, form_id: int) -> List[Field]:
+        return await FieldsService.get_fields_by_form_id_async(db, form_id)
 
-        field_list = FieldsService.get_fields_by_form_id(db, form_id)
-        form_fields = [{field.name: field.description} for field in field_list]
+    @staticmethod
+    def _form_structure(form_fields: List[Field]) -> List[Dict[str, str]]:
+        return [{field.name: field.description} for field in form_fields]
 
+    @staticmethod
+    def _get_file_extension(file: UploadFile) -> str:
         file_extension = os.path.splitext(file.filename)[-1].lower().strip(".")
         if file_extension not in TranscriptionService.SUPPORTED_FILE_TYPES:
             raise HTTPException(
@@ -35,54 +92,551 @@ class TranscriptionService:
                 detail=f"Unsupported file type: '{file_extension}'. "
                 f"Allowed types are: {', '.join(TranscriptionService.SUPPORTED_FILE_TYPES)}.",
             )
+        return file_extension
+
+    @staticmethod
+    def _check_upload_size(file: UploadFile):
+        if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Uploaded file exceeds the maximum size of {MAX_UPLOAD_BYTES} bytes.",
+            )
+
+    @staticmethod
+    def _save_upload(file: UploadFile, file_extension: str) -> str:
+        """
+        Copies the upload to a temporary file in `TRANSCRIPTION_UPLOAD_CHUNK_BYTES` chunks, enforcing
+        `TRANSCRIPTION_MAX_UPLOAD_BYTES`. Used when the archive upload runs alongside the transcription: the file
+        is archived from disk so the copy, and the transcription waiting for it, is not held to the pace of S3 as
+        with `_stream_upload`.
 
+        :return: Path to the temporary file.
+        """
+        TranscriptionService._check_upload_size(file)
         temp_file_path = f"/tmp/{uuid.uuid4()}.{file_extension}"
         try:
             with open(temp_file_path, "wb") as temp_file:
-                temp_file.write(file.file.read())
+                shutil.copyfileobj(UploadStream(file.file), temp_file, UPLOAD_CHUNK_BYTES)
+        except Exception:
+            if os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
+            raise
+        return temp_file_path
 
-            file_uuid = str(uuid.uuid4())
-            s3_key = f"{file_uuid}.{file_extension}"
+    @staticmethod
+    def _stream_upload(file: UploadFile, file_extension: str, s3_key: str) -> str:
+        """
+        Streams the upload to S3 as a multipart upload while copying it to a temporary file for the
+        transcription, reading it only once and in bounded chunks. `TRANSCRIPTION_MAX_UPLOAD_BYTES` is
+        enforced while streaming.
+
+        :return: Path to the temporary file.
+        """
+        TranscriptionService._check_upload_size(file)
+        temp_file_path = f"/tmp/{uuid.uuid4()}.{file_extension}"
+        try:
+            with open(temp_file_path, "wb") as temp_file:
+                try:
+                    S3Utils.upload_fileobj(UploadStream(file.file, sink=temp_file), s3_key)
+                except ValueError as e:
+                    raise HTTPException(
+                        status_code=status.HTTP_424_FAILED_DEPENDENCY, detail=f"Failed to upload audio file: {str(e)}"
+                    )
+        except Exception:
+            if os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
+            raise
+        return temp_file_path
+
+    @staticmethod
+    def _upload_audio(temp_file_path: str, s3_key: str):
+        try:
+            S3Utils.upload_file(file_path=temp_file_path, object_name=s3_key)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_424_FAILED_DEPENDENCY, detail=f"Failed to upload audio file: {str(e)}"
+            )
+
+    @staticmethod
+    def _transcribe(temp_file_path: str) -> str:
+        """
+        Transcribes a normalized (mono, 16kHz, compressed) copy of the audio file when one can be made, and the
+        file as uploaded otherwise. Silence found by voice activity detection is cut from the copy. The uploaded
+        file itself is never modified, so the archived copy stays byte-identical.
+
+        :param temp_file_path: Path to the audio file.
+        :return: Transcription text.
+        """
+        speech = AudioUtils.detect_speech(temp_file_path)
+        if speech is not None and speech.kept_seconds >= speech.duration:
+            speech = None
+        normalized_path = AudioUtils.normalize(temp_file_path, speech=speech)
+        if normalized_path is None:
+            speech = None
+        elif speech is not None:
+            logging.info(f"Transcribing the speech segments of '{temp_file_path}': {speech.to_list()}")
+        try:
+            return TranscriptionService._transcribe_in_chunks(normalized_path or temp_file_path, speech)
+        finally:
+            if normalized_path and os.path.exists(normalized_path):
+                os.remove(normalized_path)
+
+    @staticmethod
+    def _transcribe_with_retry(file_path: str) -> str:
+        """
+        Transcribes a file with the `TRANSCRIPTION_BACKEND` transcriber, retrying when the transcription API is
+        rate limited. The wait honours the `Retry-After` header, or backs off exponentially from
+        `TRANSCRIPTION_RATE_LIMIT_BACKOFF` seconds, and is shared with every other transcription in the process.
+
+        :param file_path: Path to the audio file.
+        :return: Transcription text.
+        """
+        transcriber = get_transcriber()
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            whisper_rate_limit.wait()
             try:
-                S3Utils.upload_file(file_path=temp_file_path, object_name=s3_key)
-            except ValueError as e:
-                raise HTTPException(
-                    status_code=status.HTTP_424_FAILED_DEPENDENCY, detail=f"Failed to upload audio file: {str(e)}"
+                return transcriber.transcribe(file_path)
+            except HTTPException as e:
+                if e.status_code != status.HTTP_429_TOO_MANY_REQUESTS or attempt == RATE_LIMIT_RETRIES:
+                    raise
+                retry_after = (e.headers or {}).get("Retry-After")
+                delay = float(retry_after) if retry_after else RATE_LIMIT_BACKOFF * 2**attempt
+                logging.warning(f"Transcription of '{file_path}' was rate limited, retrying in {delay:.1f}s")
+                whisper_rate_limit.pause(delay)
+
+    @staticmethod
+    def _transcribe_in_chunks(file_path: str, speech: Optional[TimestampMap] = None) -> str:
+        """
+        Transcribes recordings longer than `TRANSCRIPTION_CHUNK_SECONDS` as overlapping chunks on the
+        `TRANSCRIPTION_CHUNK_WORKERS` pool and stitches the results back together. Chunks are cut between speech
+        segments where possible. Transcribers that batch, such as the local Whisper model, get all the chunks in
+        one call instead. Shorter recordings, or any recording when ffmpeg is unavailable, are sent in one request.
+
+        :param file_path: Path to the audio file.
+        :param speech: Speech segments the file was trimmed to, whose boundaries are preferred as cut points.
+        :return: Transcription text.
+        """
+        duration = speech.kept_seconds if speech is not None else None
+        if CHUNK_SECONDS > 0 and duration is None:
+            duration = AudioUtils.duration(file_path)
+        if CHUNK_SECONDS <= 0 or duration is None or duration <= CHUNK_SECONDS:
+            return TranscriptionService._transcribe_with_retry(file_path)
+
+        cut_points = speech.offsets[1:] if speech is not None else []
+        boundaries = AudioUtils.chunk_boundaries(duration, cut_points, CHUNK_SECONDS, CHUNK_OVERLAP)
+        chunk_paths = []
+        try:
+            for index, (start, end) in enumerate(boundaries):
+                chunk_path = AudioUtils.extract_chunk(file_path, start, end, index)
+                if chunk_path is None:
+                    return TranscriptionService._transcribe_with_retry(file_path)
+                chunk_paths.append(chunk_path)
+
+            start_time = time.perf_counter()
+            transcriber = get_transcriber()
+            if transcriber.batched:
+                texts = transcriber.transcribe_batch(chunk_paths)
+                logging.info(
+                    f"Transcribed '{file_path}' ({duration:.1f}s) in a batch of {len(chunk_paths)} chunks "
+                    f"in {time.perf_counter() - start_time:.3f}s"
                 )
-            transcription_text = None
+                return TranscriptionService.stitch_transcripts(texts)
+            futures = [
+                transcription_chunk_pool.submit(TranscriptionService._transcribe_with_retry, chunk_path)
+                for chunk_path in chunk_paths
+            ]
+            try:
+                texts = [future.result() for future in futures]
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
+            logging.info(
+                f"Transcribed '{file_path}' ({duration:.1f}s) in {len(chunk_paths)} chunks "
+                f"in {time.perf_counter() - start_time:.3f}s"
+            )
+            return TranscriptionService.stitch_transcripts(texts)
+        finally:
+            for chunk_path in chunk_paths:
+                if os.path.exists(chunk_path):
+                    os.remove(chunk_path)
+
+    @staticmethod
+    def stitch_transcripts(texts: List[str], max_overlap_words: int = 40) -> str:
+        """
+        Joins the transcripts of consecutive overlapping chunks, dropping the words at the start of each chunk
+        that repeat the end of the previous one. Words are compared ignoring case and punctuation.
+
+        :param texts: The chunk transcripts, in order.
+        :param max_overlap_words: The longest repetition looked for.
+        :return: The joined transcript.
+        """
+
+        def normalize(word: str) -> str:
+            return "".join(character for character in word.lower() if character.isalnum())
+
+        words: List[str] = []
+        for text in texts:
+            chunk_words = text.split()
+            keys = [normalize(word) for word in words[-max_overlap_words:]]
+            chunk_keys = [normalize(word) for word in chunk_words[:max_overlap_words]]
+            overlap = 0
+            for size in range(min(len(keys), len(chunk_keys)), 0, -1):
+                if keys[-size:] == chunk_keys[:size]:
+                    overlap = size
+                    break
+            words.extend(chunk_words[overlap:])
+        return " ".join(words)
+
+    @staticmethod
+    def _upload_and_transcribe(
+        temp_file_path: str, s3_key: str, on_uploaded: Optional[Callable[[], None]] = None
+    ) -> str:
+        """
+        Archives the audio file to S3 and transcribes it. When `TRANSCRIPTION_CONCURRENT_UPLOAD` is enabled both
+        calls run at the same time, the upload on the shared `s3_upload_pool`, so the request waits for the slower
+        of the two instead of their sum.
+        Both calls always finish before this returns, and an upload failure is reported ahead of a
+        transcription failure.
+
+        :param temp_file_path: Path to the audio file.
+        :param s3_key: S3 object name for the archived copy.
+        :param on_uploaded: Optional callback invoked once the upload has finished, before this returns. It runs on
+         the upload thread when the calls are concurrent.
+        :return: Transcription text.
+        """
+
+        def upload_audio():
+            TranscriptionService._upload_audio(temp_file_path, s3_key)
+            if on_uploaded:
+                on_uploaded()
+
+        if not CONCURRENT_UPLOAD:
+            upload_audio()
+            return TranscriptionService._transcribe(temp_file_path)
+
+        timings = {}
+
+        def timed(name, fn, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                timings[name] = time.perf_counter() - start
 
-            transcription_text = OpenAIUtils.transcribe_audio(file_path=temp_file_path)
+        start = time.perf_counter()
+        transcription_error = None
+        upload = s3_upload_pool.submit(timed, "upload", upload_audio)
+        try:
+            transcription_text = timed("transcribe", TranscriptionService._transcribe, temp_file_path)
+        except Exception as e:
+            transcription_error = e
+        upload.result()
+        if transcription_error is not None:
+            raise transcription_error
+
+        wall = time.perf_counter() - start
+        logging.info(
+            f"Uploaded and transcribed '{s3_key}' ({os.path.getsize(temp_file_path)} bytes): "
+            f"upload {timings['upload']:.3f}s, transcribe {timings['transcribe']:.3f}s, wall {wall:.3f}s, "
+            f"saved {timings['upload'] + timings['transcribe'] - wall:.3f}s"
+        )
+        return transcription_text
 
-            confidence_score = OpenAIUtils.validate_transcription(
-                transcription_text=transcription_text, form_structure=form_fields
+    @staticmethod
+    def _check_confidence(confidence_score: Dict[str, int]):
+        if confidence_score.get("total") < MIN_CONFIDENCE:
+            fields_with_low_confidence = [
+                field for field, score in confidence_score.items() if score < MIN_CONFIDENCE and field != "total"
+            ]
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Transcription confidence score is too low. "
+                f"Kindly review the following fields: {fields_with_low_confidence}.",
             )
 
-            if confidence_score.get("total") < 35:
-                fields_with_low_confidence = [
-                    field for field, score in confidence_score.items() if score < 35 and field != "total"
-                ]
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Transcription confidence score is too low. "
-                    f"Kindly review the following fields: {fields_with_low_confidence}.",
-                )
+    @staticmethod
+    def _extract_with_llm(
+        transcription_text: str,
+        form_fields: List[Field],
+        on_validated: Optional[Callable[[], None]] = None,
+        prefilled: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Dict, int]:
+        """
+        Scores the transcription against the whole form and extracts the field values. With
+        `TRANSCRIPTION_EXTRACTION_MODE=combined` both come from a single completion, which is also given the
+        `prefilled` values and returns them corrected where the transcription says otherwise. With `separate` they
+        come from `validate_transcription`, which also scores the prefilled values, followed by `prepare_context`
+        for the fields without a value and the prefilled ones scored below `MIN_CONFIDENCE`. The second completion
+        is skipped when every prefilled value is confirmed.
+
+        :param transcription_text: Transcription text from audio input.
+        :param form_fields: The fields of the form to fill.
+        :param on_validated: Optional callback invoked once the confidence check has passed.
+        :param prefilled: Values extracted locally, which the completions check and may override.
+        :return: Dictionary with form field names and their extracted values, and the number of completions made.
+        """
+        prefilled = prefilled or {}
+        form_structure = TranscriptionService._form_structure(form_fields)
+        if EXTRACTION_MODE == "combined":
+            values, confidence = OpenAIUtils.extract_form_data(
+                transcription_text=transcription_text, form_structure=form_structure, prefilled=prefilled
+            )
+            TranscriptionService._check_confidence(confidence)
+            if on_validated:
+                on_validated()
+            values = dict(values)
+            for name, value in prefilled.items():
+                if name not in values or str(values[name]) == str(value):
+                    values[name] = value
+            return values, 1
+
+        confidence_score = OpenAIUtils.validate_transcription(
+            transcription_text=transcription_text, form_structure=form_structure, prefilled=prefilled
+        )
+        TranscriptionService._check_confidence(confidence_score)
+        if on_validated:
+            on_validated()
+        values = {name: value for name, value in prefilled.items() if confidence_score.get(name, 0) >= MIN_CONFIDENCE}
+        pending = [field for field in form_fields if field.name not in values]
+        if prefilled and not pending:
+            return values, 1
+        values.update(
+            OpenAIUtils.prepare_context(
+                transcription_text=transcription_text, form_structure=TranscriptionService._form_structure(pending)
+            )
+        )
+        return values, 2
+
+    @staticmethod
+    def _extract_context(
+        transcription_text: str, form_fields: List[Field], on_validated: Optional[Callable[[], None]] = None
+    ) -> Dict:
+        """
+        Fills the form from the transcription. With `TRANSCRIPTION_LOCAL_EXTRACTION` enabled, numeric, date,
+        boolean and enumerated fields are first resolved locally by `FormExtractor` and handed to the completions
+        as prefilled values they check and may override. The source of every field is logged, and the completions
+        made and saved compared to extracting without local values are counted in `extraction_stats`.
+
+        :param transcription_text: Transcription text from audio input.
+        :param form_fields: The fields of the form to fill.
+        :param on_validated: Optional callback invoked once the confidence check has passed.
+        :return: Dictionary with form field names and their extracted values.
+        """
+        if not LOCAL_EXTRACTION:
+            values, _ = TranscriptionService._extract_with_llm(transcription_text, form_fields, on_validated)
+            return values
+
+        extraction = FormExtractor.extract(transcription_text, form_fields)
+        values, llm_calls = TranscriptionService._extract_with_llm(
+            transcription_text, form_fields, on_validated, prefilled=extraction.values
+        )
+        for name, source in extraction.provenance.items():
+            if name not in values:
+                extraction.provenance[name] = "missing"
+            elif source != "local" or values[name] != extraction.values[name]:
+                extraction.provenance[name] = "llm"
+        baseline_calls = 1 if EXTRACTION_MODE == "combined" else 2
+        extraction_stats.record(extraction.provenance, llm_calls, max(0, baseline_calls - llm_calls))
+        logging.info(f"Extracted form fields by source: {extraction.provenance}")
+        return values
+
+    @staticmethod
+    def _transcribe_upload(user_id: int, form_id: int, file: UploadFile, form_fields: List[Field]) -> Transcriptions:
+        """
+        Uploads the audio file to S3, transcribes it and extracts the form fields from the transcription.
 
-            context = OpenAIUtils.prepare_context(transcription_text=transcription_text, form_structure=form_fields)
+        :param user_id: ID of the user creating the transcription.
+        :param form_id: ID of the form associated with the transcription.
+        :param file: Uploaded audio file.
+        :param form_fields: The fields of the form.
+        :return: The completed Transcriptions record, not yet added to a session.
+        """
+        file_extension = TranscriptionService._get_file_extension(file)
 
-            new_transcription = Transcriptions(
+        temp_file_path = None
+        try:
+            file_uuid = str(uuid.uuid4())
+            s3_key = f"{file_uuid}.{file_extension}"
+            if CONCURRENT_UPLOAD:
+                temp_file_path = TranscriptionService._save_upload(file, file_extension)
+                transcription_text = TranscriptionService._upload_and_transcribe(temp_file_path, s3_key)
+            else:
+                temp_file_path = TranscriptionService._stream_upload(file, file_extension, s3_key)
+                transcription_text = TranscriptionService._transcribe(temp_file_path)
+
+            context = TranscriptionService._extract_context(transcription_text, form_fields)
+
+            return Transcriptions(
                 upload_uuid=file_uuid,
                 user_id=user_id,
                 form_id=form_id,
                 transcription_text=transcription_text,
-                status="completed",
+                status=TranscriptionService.STATUS_COMPLETED,
                 context=context,
             )
+        finally:
+            if temp_file_path and os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
+
+    @staticmethod
+    def _pending_transcription(user_id: int, form_id: int) -> Transcriptions:
+        return Transcriptions(
+            upload_uuid=str(uuid.uuid4()),
+            user_id=user_id,
+            form_id=form_id,
+            status=TranscriptionService.STATUS_PENDING,
+            context={},
+        )
+
+    @staticmethod
+    def _submit_job(new_transcription: Transcriptions, temp_file_path: str, form_fields: List[Field]):
+        transcription_pool.submit(
+            TranscriptionService.process_transcription_job,
+            transcription_id=new_transcription.id,
+            temp_file_path=temp_file_path,
+            form_fields=form_fields,
+        )
+
+    @staticmethod
+    async def create_transcription_async(
+        db: AsyncSession, user_id: int, form_id: int, file: UploadFile
+    ) -> Transcription:
+        """
+        Creates a new transcription record and uploads the associated audio file to S3. The upload, transcription
+        and extraction run on the threadpool and the record is saved through the async session, so the event loop
+        is never blocked.
+
+        :param db: Async database session.
+        :param user_id: ID of the user creating the transcription.
+        :param form_id: ID of the form associated with the transcription.
+        :param file: Uploaded audio file.
+        :return: The created Transcriptions record.
+        """
+        form_fields = await TranscriptionService._get_form_fields_async(db, form_id)
+        new_transcription = await run_in_threadpool(
+            TranscriptionService._transcribe_upload, user_id, form_id, file, form_fields
+        )
+
+        db.add(new_transcription)
+        await db.commit()
+        await db.refresh(new_transcription)
+
+        return new_transcription
 
+    @staticmethod
+    async def create_transcription_job_async(
+        db: AsyncSession, user_id: int, form_id: int, file: UploadFile
+    ) -> Transcription:
+        """
+        Saves a pending transcription record and schedules the upload, transcription and form extraction on the
+        background worker pool. The upload is saved on the threadpool and the pending record through the async
+        session.
+
+        :param db: Async database session.
+        :param user_id: ID of the user creating the transcription.
+        :param form_id: ID of the form associated with the transcription.
+        :param file: Uploaded audio file.
+        :return: The pending Transcriptions record.
+        """
+        form_fields = await TranscriptionService._get_form_fields_async(db, form_id)
+        file_extension = TranscriptionService._get_file_extension(file)
+        temp_file_path = await run_in_threadpool(TranscriptionService._save_upload, file, file_extension)
+
+        try:
+            new_transcription = TranscriptionService._pending_transcription(user_id, form_id)
             db.add(new_transcription)
+            await db.commit()
+            await db.refresh(new_transcription)
+            TranscriptionService._submit_job(new_transcription, temp_file_path, form_fields)
+        except Exception:
+            if os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
+            raise
+
+        return new_transcription
+
+    @staticmethod
+    def _mark_uploaded(transcription_id: int):
+        """
+        Moves a pending record to `uploaded` in a session of its own, since the upload may finish on another thread
+        than the job. The job session sees the change once it is rolled back or commits the next stage.
+        """
+        db = SessionLocal()
+        try:
+            db.query(Transcriptions).filter(
+                Transcriptions.id == transcription_id, Transcriptions.status == TranscriptionService.STATUS_PENDING
+            ).update({Transcriptions.status: TranscriptionService.STATUS_UPLOADED}, synchronize_session=False)
             db.commit()
-            db.refresh(new_transcription)
+        finally:
+            db.close()
+
+    @staticmethod
+    def process_transcription_job(transcription_id: int, temp_file_path: str, form_fields: List[Field]):
+        """
+        Runs the transcription pipeline for a pending record, persisting the status after every stage.
+        Any failure moves the record to `failed` with the error recorded in its context.
 
-            return new_transcription
+        :param transcription_id: ID of the pending transcription record.
+        :param temp_file_path: Path to the uploaded audio file. It is removed once the job finishes.
+        :param form_fields: The fields of the form used to validate and extract the transcription.
+        """
+        db = SessionLocal()
+        try:
+            transcription = db.query(Transcriptions).filter(Transcriptions.id == transcription_id).first()
+            if not transcription:
+                logging.error(f"Transcription job {transcription_id} not found")
+                return
+
+            def advance(new_status: str, **values):
+                for key, value in values.items():
+                    setattr(transcription, key, value)
+                transcription.status = new_status
+                db.commit()
+
+            try:
+                file_extension = os.path.splitext(temp_file_path)[-1].strip(".")
+                transcription_text = TranscriptionService._upload_and_transcribe(
+                    temp_file_path,
+                    f"{transcription.upload_uuid}.{file_extension}",
+                    on_uploaded=lambda: TranscriptionService._mark_uploaded(transcription_id),
+                )
+                advance(TranscriptionService.STATUS_TRANSCRIBED, transcription_text=transcription_text)
+
+                context = TranscriptionService._extract_context(
+                    transcription_text,
+                    form_fields,
+                    on_validated=lambda: advance(TranscriptionService.STATUS_VALIDATED),
+                )
+                advance(TranscriptionService.STATUS_COMPLETED, context=context)
+            except Exception as e:
+                db.rollback()
+                detail = e.detail if isinstance(e, HTTPException) else str(e)
+                advance(TranscriptionService.STATUS_FAILED, context={"error": detail, "stage": transcription.status})
         finally:
+            db.close()
             if os.path.exists(temp_file_path):
                 os.remove(temp_file_path)
+
+    @staticmethod
+    async def get_transcription_async(db: AsyncSession, transcription_id: int, user_id: int) -> Transcription:
+        """
+        Retrieves a transcription record owned by the given user. The record is always reloaded from the database,
+        so polling it in one session sees the progress of the background job.
+
+        :param db: Async database session.
+        :param transcription_id: ID of the transcription record.
+        :param user_id: ID of the user requesting the record.
+        :return: The Transcriptions record.
+        """
+        query = (
+            select(Transcriptions)
+            .filter(Transcriptions.id == transcription_id, Transcriptions.user_id == user_id)
+            .execution_options(populate_existing=True)
+        )
+        transcription = (await db.execute(query)).scalars().first()
+        if not transcription:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail=f"Transcription with id {transcription_id} not found"
+            )
+        return transcription
@@ -1,34 +1,54 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
-from pydantic import TypeAdapter
-from typing import List
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
 from app.models.users import Users
 from app.schemas.users import UserCreate, UserUpdate, User
-from app.services.auth import get_hashed_password
+from app.schemas.adapters import user_adapter, user_list_adapter
+from app.utils.pagination import Page, paginate, filters
+from app.services.auth import get_hashed_password, get_hashed_password_async
+from app.core.principal_cache import principal_cache
 
 
 class UsersService:
 
     @staticmethod
-    def get_all_users(db: Session) -> List[User]:
-        return TypeAdapter(List[User]).validate_python(db.query(Users).all())
+    def get_all_users(
+        db: Session,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+        is_admin: Optional[bool] = None,
+    ) -> Page:
+        """
+        Lists the users ordered by ID, one keyset page at a time.
+
+        :param db: Database session.
+        :param after_id: Only return the users with a greater ID.
+        :param limit: Maximum number of users to return, or None for all of them.
+        :param fields: Attributes to return, all of them when None.
+        :param is_admin: Only return the users with this `is_admin`.
+        :return: The page of users with the cursor of the next page.
+        """
+        query = db.query(Users).filter_by(**filters(is_admin=is_admin))
+        return paginate(query, Users, User, user_list_adapter, after_id, limit, fields)
 
     @staticmethod
     def get_user_by_id(db: Session, user_id: int) -> User:
         user = db.query(Users).filter(Users.id == user_id).first()
         if not user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"User with id {user_id} not found")
-        return TypeAdapter(User).validate_python(user)
+        return user_adapter.validate_python(user)
 
     @staticmethod
     def get_user_by_email(db: Session, email: str) -> User:
         user = db.query(Users).filter(Users.email == email).first()
         if not user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"User with email {email} not found")
-        return TypeAdapter(User).validate_python(user)
+        return user_adapter.validate_python(user)
 
     @staticmethod
-    def create_user(db: Session, user_data: UserCreate) -> User:
+    def _check_unique(db: Session, user_data: UserCreate):
         existing_email = db.query(Users).filter(Users.email == user_data.email).first()
         existing_user_name = db.query(Users).filter(Users.user_name == user_data.user_name).first()
         if existing_email:
@@ -39,30 +59,52 @@ class UsersService:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT, detail=f"User with username {user_data.user_name} already exist."
             )
-        hashed_password = get_hashed_password(user_data.password)
+
+    @staticmethod
+    def _add_user(db: Session, user_data: UserCreate, hashed_password: str) -> User:
         user_data_dict = user_data.model_dump()
         user_data_dict["password"] = hashed_password
         new_user = Users(**user_data_dict)
         db.add(new_user)
         db.commit()
         db.refresh(new_user)
-        return TypeAdapter(User).validate_python(new_user)
+        return user_adapter.validate_python(new_user)
+
+    @staticmethod
+    def create_user(db: Session, user_data: UserCreate) -> User:
+        UsersService._check_unique(db, user_data)
+        hashed_password = get_hashed_password(user_data.password)
+        return UsersService._add_user(db, user_data, hashed_password)
+
+    @staticmethod
+    async def create_user_async(db: Session, user_data: UserCreate) -> User:
+        """
+        Same as `create_user`, for async routes. The database is queried on the threadpool and the password
+        hashed on the password hashing pool, so no thread is held while a sign up waits for a free core.
+        """
+        await run_in_threadpool(UsersService._check_unique, db, user_data)
+        hashed_password = await get_hashed_password_async(user_data.password)
+        return await run_in_threadpool(UsersService._add_user, db, user_data, hashed_password)
 
     @staticmethod
     def update_user(db: Session, user_id: int, user_data: UserUpdate) -> User:
         new_user = db.query(Users).filter(Users.id == user_id).first()
         if not new_user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"User with user_id {user_id} not found")
+        user_name = new_user.user_name
         for key, value in user_data.model_dump(exclude_unset=True).items():
             setattr(new_user, key, value)
         db.commit()
         db.refresh(new_user)
-        return TypeAdapter(User).validate_python(new_user)
+        principal_cache.invalidate(user_name, new_user.user_name)
+        return user_adapter.validate_python(new_user)
 
     @staticmethod
     def delete_user(db: Session, user_id: int) -> None:
         user = db.query(Users).filter(Users.id == user_id).first()
         if not user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"User with user_id {user_id} not found")
+        user_name = user.user_name
         db.delete(user)
         db.commit()
+        principal_cache.invalidate(user_name)
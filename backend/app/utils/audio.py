@@ -0,0 +1,293 @@
+import os
+import re
+import logging
+import subprocess
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TRANSCRIPTION_AUDIO_CODEC = os.getenv("TRANSCRIPTION_AUDIO_CODEC", "opus").lower()
+TRANSCRIPTION_AUDIO_SAMPLE_RATE = int(os.getenv("TRANSCRIPTION_AUDIO_SAMPLE_RATE", "16000"))
+TRANSCRIPTION_AUDIO_BITRATE = os.getenv("TRANSCRIPTION_AUDIO_BITRATE", "24k")
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+FFMPEG_TIMEOUT = float(os.getenv("FFMPEG_TIMEOUT", "300"))
+TRANSCRIPTION_VAD = os.getenv("TRANSCRIPTION_VAD", "true").lower() == "true"
+TRANSCRIPTION_VAD_NOISE_DB = float(os.getenv("TRANSCRIPTION_VAD_NOISE_DB", "-35"))
+TRANSCRIPTION_VAD_MIN_SILENCE = float(os.getenv("TRANSCRIPTION_VAD_MIN_SILENCE", "0.5"))
+TRANSCRIPTION_VAD_PADDING = float(os.getenv("TRANSCRIPTION_VAD_PADDING", "0.25"))
+
+
+class TimestampMap:
+    """
+    Maps offsets in audio trimmed down to its speech segments back to offsets in the original recording.
+
+    :param segments: The `(start, end)` seconds of the original recording that were kept, in order.
+    :param duration: Duration of the original recording in seconds.
+    """
+
+    def __init__(self, segments: List[Tuple[float, float]], duration: float):
+        self.segments = segments
+        self.duration = duration
+        self.offsets = []
+        offset = 0.0
+        for start, end in segments:
+            self.offsets.append(offset)
+            offset += end - start
+        self.kept_seconds = offset
+
+    def to_original(self, seconds: float) -> float:
+        """Translate an offset in the trimmed audio into the matching offset in the original recording."""
+        for (start, end), offset in zip(self.segments, self.offsets):
+            if seconds < offset + (end - start):
+                return start + max(0.0, seconds - offset)
+        return self.segments[-1][1] if self.segments else seconds
+
+    def to_list(self) -> List[Dict[str, float]]:
+        return [
+            {"start": round(offset, 3), "original_start": start, "duration": round(end - start, 3)}
+            for (start, end), offset in zip(self.segments, self.offsets)
+        ]
+
+
+class AudioUtils:
+    """
+    Prepares audio files for transcription with ffmpeg.
+    """
+
+    CODECS = {
+        "opus": ("ogg", ["-c:a", "libopus", "-b:a", TRANSCRIPTION_AUDIO_BITRATE, "-application", "voip"]),
+        "flac": ("flac", ["-c:a", "flac"]),
+    }
+    # With `TRANSCRIPTION_AUDIO_CODEC=none` a copy is only written to cut silence, as uncompressed PCM.
+    TRIM_CODEC = ("wav", ["-c:a", "pcm_s16le"])
+
+    @staticmethod
+    def normalize(file_path: str, codec: Optional[str] = None, speech: Optional[TimestampMap] = None) -> Optional[str]:
+        """
+        Writes a copy of the audio file downmixed to mono, resampled to `TRANSCRIPTION_AUDIO_SAMPLE_RATE` and
+        encoded with `TRANSCRIPTION_AUDIO_CODEC` (`opus`, `flac` or `none`) next to the original, which is left
+        untouched. The size reduction is logged. A copy trimmed to the speech segments is always kept, even when
+        the codec is `none` or the copy is not smaller, since it holds less audio to transcribe.
+
+        :param file_path: Path to the audio file.
+        :param codec: Overrides `TRANSCRIPTION_AUDIO_CODEC`.
+        :param speech: When given, only these segments of the recording are kept.
+        :return: Path to the normalized copy, or None when there is nothing to trim and normalization is disabled,
+         ffmpeg is unavailable or fails, or the copy would not be smaller than the original.
+        """
+        codec = (codec or TRANSCRIPTION_AUDIO_CODEC).lower()
+        trim = speech is not None and bool(speech.segments)
+        if codec == "none" and not trim:
+            return None
+        if codec != "none" and codec not in AudioUtils.CODECS:
+            raise ValueError(f"Unsupported audio codec: '{codec}'")
+
+        extension, codec_args = AudioUtils.CODECS.get(codec, AudioUtils.TRIM_CODEC)
+        output_path = f"{os.path.splitext(file_path)[0]}.normalized.{extension}"
+        command = [
+            FFMPEG_BINARY,
+            "-nostdin",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-y",
+            "-i",
+            file_path,
+            "-vn",
+            *(["-af", AudioUtils._select_filter(speech.segments)] if trim else []),
+            "-ac",
+            "1",
+            "-ar",
+            str(TRANSCRIPTION_AUDIO_SAMPLE_RATE),
+            *codec_args,
+            output_path,
+        ]
+        try:
+            subprocess.run(command, check=True, capture_output=True, timeout=FFMPEG_TIMEOUT)
+        except FileNotFoundError:
+            logging.warning(f"'{FFMPEG_BINARY}' is not installed, transcribing '{file_path}' as uploaded.")
+            return None
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            stderr = getattr(e, "stderr", None) or b""
+            logging.warning(f"Failed to normalize '{file_path}', transcribing it as uploaded: {e} {stderr.decode()}")
+            AudioUtils._remove(output_path)
+            return None
+
+        original_size = os.path.getsize(file_path)
+        normalized_size = os.path.getsize(output_path)
+        if normalized_size >= original_size and not trim:
+            logging.info(f"Normalized copy of '{file_path}' is not smaller than the original, keeping the original.")
+            AudioUtils._remove(output_path)
+            return None
+
+        logging.info(
+            f"Normalized '{file_path}' to {codec}: {original_size} -> {normalized_size} bytes "
+            f"({100 * (1 - normalized_size / original_size):.1f}% smaller)."
+        )
+        return output_path
+
+    @staticmethod
+    def _select_filter(segments: List[Tuple[float, float]]) -> str:
+        selection = "+".join(f"between(t,{start:.3f},{end:.3f})" for start, end in segments)
+        return f"aselect='{selection}',asetpts=N/SR/TB"
+
+    @staticmethod
+    def speech_segments(
+        silences: List[Tuple[float, float]], duration: float, padding: float = TRANSCRIPTION_VAD_PADDING
+    ) -> List[Tuple[float, float]]:
+        """
+        The complement of the silences within `[0, duration]`, each segment widened by `padding` seconds on
+        both sides and overlapping segments merged.
+        """
+        segments = []
+        position = 0.0
+        for silence_start, silence_end in sorted(silences) + [(duration, duration)]:
+            if silence_start > position:
+                start, end = max(0.0, position - padding), min(duration, silence_start + padding)
+                if segments and start <= segments[-1][1]:
+                    segments[-1] = (segments[-1][0], end)
+                else:
+                    segments.append((start, end))
+            position = max(position, silence_end)
+        return [(round(start, 3), round(end, 3)) for start, end in segments]
+
+    @staticmethod
+    def detect_speech(file_path: str) -> Optional[TimestampMap]:
+        """
+        Finds the speech in a recording with ffmpeg's `silencedetect` filter. Stretches quieter than
+        `TRANSCRIPTION_VAD_NOISE_DB` for at least `TRANSCRIPTION_VAD_MIN_SILENCE` seconds are treated as silence
+        and the remaining segments are padded by `TRANSCRIPTION_VAD_PADDING` seconds.
+
+        :param file_path: Path to the audio file.
+        :return: The speech segments, or None when `TRANSCRIPTION_VAD` is disabled, ffmpeg is unavailable or
+         fails, or no speech is found.
+        """
+        if not TRANSCRIPTION_VAD:
+            return None
+        command = [
+            FFMPEG_BINARY,
+            "-nostdin",
+            "-hide_banner",
+            "-i",
+            file_path,
+            "-vn",
+            "-af",
+            f"silencedetect=noise={TRANSCRIPTION_VAD_NOISE_DB}dB:d={TRANSCRIPTION_VAD_MIN_SILENCE}",
+            "-f",
+            "null",
+            "-",
+        ]
+        try:
+            result = subprocess.run(command, check=True, capture_output=True, timeout=FFMPEG_TIMEOUT)
+        except FileNotFoundError:
+            logging.warning(f"'{FFMPEG_BINARY}' is not installed, skipping voice activity detection.")
+            return None
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            logging.warning(f"Voice activity detection failed for '{file_path}': {e}")
+            return None
+
+        output = result.stderr.decode(errors="replace")
+        duration = AudioUtils._parse_duration(output)
+        if duration is None:
+            return None
+
+        starts = [float(value) for value in re.findall(r"silence_start: (-?\d+(?:\.\d+)?)", output)]
+        ends = [float(value) for value in re.findall(r"silence_end: (\d+(?:\.\d+)?)", output)]
+        silences = [
+            (max(0.0, start), ends[index] if index < len(ends) else duration) for index, start in enumerate(starts)
+        ]
+        segments = AudioUtils.speech_segments(silences, duration)
+        if not segments:
+            logging.info(f"No speech detected in '{file_path}', keeping the whole recording.")
+            return None
+
+        speech = TimestampMap(segments, duration)
+        logging.info(
+            f"Voice activity detection kept {speech.kept_seconds:.1f}s of {duration:.1f}s of '{file_path}' "
+            f"in {len(segments)} segments."
+        )
+        return speech
+
+    @staticmethod
+    def _parse_duration(output: str) -> Optional[float]:
+        duration = re.search(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)", output)
+        if not duration:
+            return None
+        hours, minutes, seconds = duration.groups()
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+    @staticmethod
+    def duration(file_path: str) -> Optional[float]:
+        """
+        :return: The duration of the recording in seconds, or None when ffmpeg is unavailable or cannot read it.
+        """
+        command = [FFMPEG_BINARY, "-nostdin", "-hide_banner", "-i", file_path, "-t", "0", "-f", "null", "-"]
+        try:
+            result = subprocess.run(command, check=True, capture_output=True, timeout=FFMPEG_TIMEOUT)
+        except (FileNotFoundError, subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            logging.warning(f"Failed to read the duration of '{file_path}': {e}")
+            return None
+        return AudioUtils._parse_duration(result.stderr.decode(errors="replace"))
+
+    @staticmethod
+    def chunk_boundaries(
+        duration: float, cut_points: List[float], chunk_seconds: float, overlap: float
+    ) -> List[Tuple[float, float]]:
+        """
+        Splits a recording into chunks of at most `chunk_seconds`, cutting at the latest of `cut_points` (e.g. the
+        silences between speech segments) past the middle of each chunk, or at the chunk length when there is
+        none. Every chunk after the first starts `overlap` seconds before the previous cut so no word is lost.
+
+        :return: The `(start, end)` seconds of every chunk.
+        """
+        chunks = []
+        start = 0.0
+        while duration - start > chunk_seconds:
+            candidates = [point for point in cut_points if start + chunk_seconds / 2 < point <= start + chunk_seconds]
+            cut = max(candidates) if candidates else start + chunk_seconds
+            chunks.append((max(0.0, start - overlap) if chunks else start, cut))
+            start = cut
+        chunks.append((max(0.0, start - overlap) if chunks else start, duration))
+        return [(round(start, 3), round(end, 3)) for start, end in chunks]
+
+    @staticmethod
+    def extract_chunk(file_path: str, start: float, end: float, index: int) -> Optional[str]:
+        """
+        Writes the `[start, end)` seconds of a recording to a new file with the same format. Normalized
+        recordings are re-encoded so the cut is exact; anything else is copied as is.
+
+        :return: Path to the chunk, or None when ffmpeg is unavailable or fails.
+        """
+        base, extension = os.path.splitext(file_path)
+        output_path = f"{base}.chunk{index}{extension}"
+        codec_args = dict(AudioUtils.CODECS.values()).get(extension.strip("."), ["-c", "copy"])
+        command = [
+            FFMPEG_BINARY,
+            "-nostdin",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-y",
+            "-ss",
+            f"{start:.3f}",
+            "-i",
+            file_path,
+            "-t",
+            f"{end - start:.3f}",
+            "-vn",
+            *codec_args,
+            output_path,
+        ]
+        try:
+            subprocess.run(command, check=True, capture_output=True, timeout=FFMPEG_TIMEOUT)
+        except (FileNotFoundError, subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            logging.warning(f"Failed to extract chunk {index} of '{file_path}': {e}")
+            AudioUtils._remove(output_path)
+            return None
+        return output_path
+
+    @staticmethod
+    def _remove(file_path: str):
+        if os.path.exists(file_path):
+            os.remove(file_path)
@@ -0,0 +1,417 @@
+import os
+import re
+import threading
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+from dotenv import load_dotenv
+from app.schemas.fields import Field
+
+load_dotenv()
+
+EXTRACTION_DAY_FIRST = os.getenv("TRANSCRIPTION_EXTRACTION_DAY_FIRST", "true").lower() == "true"
+
+NUMERIC_TYPES = {"number", "numeric", "integer", "int", "float", "decimal", "double"}
+INTEGER_TYPES = {"integer", "int"}
+DATE_TYPES = {"date", "datetime"}
+BOOLEAN_TYPES = {"boolean", "bool", "checkbox"}
+ENUM_TYPES = {"enum", "select", "radio", "dropdown", "coded"}
+
+# Other ways clinicians refer to common form fields, keyed by a term found in the field name or description.
+SYNONYMS = {
+    "temperature": ["temp"],
+    "pulse": ["heart rate", "pulse rate"],
+    "heart rate": ["pulse", "pulse rate"],
+    "respiratory rate": ["respiration rate", "respirations", "breathing rate", "resp rate"],
+    "oxygen saturation": ["spo2", "o2 sat", "o2 saturation", "saturation", "sats"],
+    "spo2": ["oxygen saturation", "o2 sat", "o2 saturation", "saturation", "sats"],
+    "blood pressure": ["bp"],
+    "systolic": ["blood pressure", "bp"],
+    "diastolic": ["blood pressure", "bp"],
+    "weight": ["weighs", "weighing"],
+    "height": ["length"],
+    "blood sugar": ["blood glucose", "glucose", "sugar"],
+    "glucose": ["blood sugar", "sugar"],
+}
+
+# Abbreviations that also mean something else ("hr" is an hour), only taken as a mention when a number follows.
+NUMERIC_ABBREVIATIONS = {
+    "pulse": ["hr"],
+    "heart rate": ["hr"],
+    "respiratory rate": ["rr"],
+}
+
+# Spoken unit -> (dimension, canonical unit).
+UNITS = {
+    "°c": ("temperature", "c"),
+    "c": ("temperature", "c"),
+    "celsius": ("temperature", "c"),
+    "centigrade": ("temperature", "c"),
+    "°f": ("temperature", "f"),
+    "f": ("temperature", "f"),
+    "fahrenheit": ("temperature", "f"),
+    "kg": ("mass", "kg"),
+    "kgs": ("mass", "kg"),
+    "kilos": ("mass", "kg"),
+    "kilograms": ("mass", "kg"),
+    "g": ("mass", "g"),
+    "grams": ("mass", "g"),
+    "lb": ("mass", "lb"),
+    "lbs": ("mass", "lb"),
+    "pounds": ("mass", "lb"),
+    "cm": ("length", "cm"),
+    "centimeters": ("length", "cm"),
+    "centimetres": ("length", "cm"),
+    "m": ("length", "m"),
+    "meters": ("length", "m"),
+    "metres": ("length", "m"),
+    "inches": ("length", "in"),
+    "ft": ("length", "ft"),
+    "feet": ("length", "ft"),
+    "mg/dl": ("glucose", "mg/dl"),
+    "mmol/l": ("glucose", "mmol/l"),
+    "%": ("fraction", "%"),
+    "percent": ("fraction", "%"),
+}
+
+# Multiply by the factor, then add the offset, to convert from the first unit to the second.
+CONVERSIONS = {
+    ("f", "c"): (5 / 9, -32 * 5 / 9),
+    ("c", "f"): (9 / 5, 32),
+    ("lb", "kg"): (0.45359237, 0),
+    ("kg", "lb"): (1 / 0.45359237, 0),
+    ("g", "kg"): (0.001, 0),
+    ("kg", "g"): (1000, 0),
+    ("m", "cm"): (100, 0),
+    ("cm", "m"): (0.01, 0),
+    ("in", "cm"): (2.54, 0),
+    ("ft", "cm"): (30.48, 0),
+    ("in", "m"): (0.0254, 0),
+    ("ft", "m"): (0.3048, 0),
+    ("mmol/l", "mg/dl"): (18.0, 0),
+    ("mg/dl", "mmol/l"): (1 / 18.0, 0),
+}
+
+# Words after a bare number that make it a duration, a count or a time rather than a measurement.
+NON_UNIT_WORDS = set(
+    """
+    second seconds sec secs minute minutes min mins hour hours hr hrs day days week weeks month months year years
+    yr yrs time times ago later earlier before after am pm o'clock oclock x
+    """.split()
+)
+
+BOOLEAN_WORDS = {
+    "yes": True,
+    "positive": True,
+    "present": True,
+    "true": True,
+    "no": False,
+    "negative": False,
+    "absent": False,
+    "false": False,
+    "nil": False,
+}
+
+MONTHS = {
+    name: index
+    for index, names in enumerate(
+        [
+            ("january", "jan"),
+            ("february", "feb"),
+            ("march", "mar"),
+            ("april", "apr"),
+            ("may",),
+            ("june", "jun"),
+            ("july", "jul"),
+            ("august", "aug"),
+            ("september", "sep", "sept"),
+            ("october", "oct"),
+            ("november", "nov"),
+            ("december", "dec"),
+        ],
+        start=1,
+    )
+    for name in names
+}
+
+_UNIT_PATTERN = "|".join(re.escape(unit) for unit in sorted(UNITS, key=len, reverse=True))
+_NUMBER = re.compile(rf"(?<![\d/])(\d+(?:\.\d+)?)(?:\s*(?:degrees?\s*)?({_UNIT_PATTERN})(?![a-z]))?", re.IGNORECASE)
+_FOLLOWING = re.compile(r"\s*(?:(\d)|([a-z']+))", re.IGNORECASE)
+_PRESSURE = re.compile(r"(\d{2,3})\s*(?:/|over)\s*(\d{2,3})", re.IGNORECASE)
+_CLAUSE_END = re.compile(r"[;\n]|\.(?!\d)|,(?!\d|\s?\d{4}\b)")
+_NEGATION = re.compile(r"\b(?:no|denies|denied|without|not|negative for)\s+(?:\w+\s+){0,2}$", re.IGNORECASE)
+_MONTH = "|".join(sorted(MONTHS, key=len, reverse=True))
+_ISO_DATE = re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b")
+_NUMERIC_DATE = re.compile(r"\b(\d{1,2})[/.-](\d{1,2})[/.-](\d{4})\b")
+_DAY_MONTH_DATE = re.compile(rf"\b(\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?({_MONTH})\.?,?\s+(\d{{4}})\b", re.IGNORECASE)
+_MONTH_DAY_DATE = re.compile(rf"\b({_MONTH})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?,?\s+(\d{{4}})\b", re.IGNORECASE)
+_RELATIVE_DATE = re.compile(r"\b(today|yesterday|tomorrow)\b", re.IGNORECASE)
+
+WINDOW_CHARACTERS = 60
+
+
+class Extraction:
+    """
+    The outcome of a local extraction: the resolved values and, for every field of the form, where its value
+    came from (`local`, or `unresolved` until the completions fill it in or override a local value).
+    """
+
+    def __init__(self, fields: List[Field]):
+        self.values: Dict[str, Any] = {}
+        self.provenance: Dict[str, str] = {field.name: "unresolved" for field in fields}
+
+    @property
+    def unresolved(self) -> List[str]:
+        return [name for name, source in self.provenance.items() if source == "unresolved"]
+
+    def resolve(self, name: str, value: Any, source: str = "local"):
+        self.values[name] = value
+        self.provenance[name] = source
+
+
+class ExtractionStats:
+    """
+    Counts how the fields of every extracted form were filled, the completions made, and the completions saved
+    compared to extracting the same form without local values.
+    """
+
+    def __init__(self):
+        self.fields: Dict[str, int] = {}
+        self.llm_calls = 0
+        self.llm_calls_avoided = 0
+        self._lock = threading.Lock()
+
+    def record(self, provenance: Dict[str, str], llm_calls: int, llm_calls_avoided: int):
+        with self._lock:
+            for source in provenance.values():
+                self.fields[source] = self.fields.get(source, 0) + 1
+            self.llm_calls += llm_calls
+            self.llm_calls_avoided += llm_calls_avoided
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "fields": dict(self.fields),
+            "llm_calls": self.llm_calls,
+            "llm_calls_avoided": self.llm_calls_avoided,
+        }
+
+
+extraction_stats = ExtractionStats()
+
+
+def _normalize_label(text: Optional[str]) -> str:
+    text = re.sub(r"\([^)]*\)|\[[^\]]*\]", " ", text or "")
+    text = re.sub(r"([a-z])([A-Z][a-z])", r"\1 \2", text)
+    return " ".join(re.sub(r"[_\-:]+", " ", text).lower().split())
+
+
+@lru_cache(maxsize=1024)
+def _mention_pattern(name: str, description: Optional[str]) -> Pattern:
+    label = _normalize_label(name)
+    context = f"{label} {_normalize_label(description)}"
+    terms = {label: re.escape(label).replace(r"\ ", r"[\s_-]+")}
+    if label.endswith(" date"):
+        terms[label[: -len(" date")]] = re.escape(label[: -len(" date")]).replace(r"\ ", r"[\s_-]+")
+    for key, synonyms in SYNONYMS.items():
+        if re.search(rf"\b{re.escape(key)}\b", context):
+            for term in [key, *synonyms]:
+                terms.setdefault(term, re.escape(term).replace(r"\ ", r"[\s_-]+"))
+            for abbreviation in NUMERIC_ABBREVIATIONS.get(key, []):
+                terms.setdefault(abbreviation, rf"{re.escape(abbreviation)}(?=[\s:=]*\d)")
+    alternatives = "|".join(terms[term] for term in sorted(terms, key=len, reverse=True))
+    return re.compile(rf"\b(?:{alternatives})\b", re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def _target_unit(name: str, description: Optional[str]) -> Optional[str]:
+    for text in (name, description or ""):
+        hints = re.findall(r"\(([^)]+)\)|\bin\s+(\S+)", text)
+        for hint in (value.strip().lower() for pair in hints for value in pair if value):
+            if hint in UNITS:
+                return UNITS[hint][1]
+    return None
+
+
+def _convert(value: float, source: str, target: str) -> Optional[float]:
+    if source == target:
+        return value
+    conversion = CONVERSIONS.get((source, target))
+    if conversion is None:
+        return None
+    factor, offset = conversion
+    return value * factor + offset
+
+
+def _in_range(value: float, field: Field) -> bool:
+    return (field.minimum is None or value >= field.minimum) and (field.maximum is None or value <= field.maximum)
+
+
+def _enum_options(field: Field) -> List[str]:
+    return [option.strip() for option in re.split(r"[,;|]", field.enum_options or "") if option.strip()]
+
+
+def _field_kind(field: Field) -> Optional[str]:
+    field_type = (field.field_type or "string").lower()
+    if field_type in NUMERIC_TYPES:
+        return "number"
+    if field_type in DATE_TYPES:
+        return "date"
+    if field_type in BOOLEAN_TYPES:
+        return "boolean"
+    if field_type in ENUM_TYPES or field.enum_options:
+        return "enum"
+    return None
+
+
+class FormExtractor:
+    """
+    Fills numeric, date, boolean and enumerated form fields from a transcription with deterministic rules,
+    so the completion API is only needed for the free-text fields. A value is only taken when it follows a
+    mention of the field (its name or a known synonym) within the same clause, and numbers must convert to the
+    field's unit and fall within its `minimum`/`maximum`; anything ambiguous, such as a number without a unit
+    that is out of range or on a field without a range, a number followed by a word such as "hours", or a
+    negated option, is left unresolved rather than guessed.
+    """
+
+    @staticmethod
+    def _windows(text: str, field: Field) -> List[Tuple[str, str]]:
+        """The text before and after every mention of the field, the latter cut at the end of its clause."""
+        windows = []
+        for mention in _mention_pattern(field.name, field.description).finditer(text):
+            start, end = mention.span()
+            after = text[end:][:WINDOW_CHARACTERS]
+            clause_end = _CLAUSE_END.search(after)
+            if clause_end:
+                after = after[: clause_end.start()]
+            windows.append((text[:start][-WINDOW_CHARACTERS:], after))
+        return windows
+
+    @staticmethod
+    def _number(field: Field, windows: List[Tuple[str, str]]) -> Optional[float]:
+        label = _normalize_label(field.name)
+        target = _target_unit(field.name, field.description)
+        for _, after in windows:
+            pressure = _PRESSURE.search(after)
+            if pressure and ("systolic" in label or "diastolic" in label):
+                value = float(pressure.group(2 if "diastolic" in label else 1))
+                if _in_range(value, field):
+                    return value
+                continue
+            number = _NUMBER.search(after)
+            if not number:
+                continue
+            value = float(number.group(1))
+            spoken = UNITS.get(number.group(2).lower())[1] if number.group(2) else None
+            if spoken and target:
+                value = _convert(value, spoken, target)
+                if value is not None and _in_range(value, field):
+                    return value
+                continue
+            if not spoken:
+                following = _FOLLOWING.match(after, number.end())
+                if following and (following.group(1) or following.group(2).lower() in NON_UNIT_WORDS):
+                    continue
+                if field.minimum is None and field.maximum is None:
+                    continue
+            if _in_range(value, field):
+                return value
+        return None
+
+    @staticmethod
+    def _date(text: str) -> Optional[str]:
+        candidates = []
+        match = _ISO_DATE.search(text)
+        if match:
+            candidates.append((match.start(), int(match.group(1)), int(match.group(2)), int(match.group(3))))
+        match = _NUMERIC_DATE.search(text)
+        if match:
+            first, second, year = (int(group) for group in match.groups())
+            day, month = (first, second) if EXTRACTION_DAY_FIRST else (second, first)
+            candidates.append((match.start(), year, month, day))
+        match = _DAY_MONTH_DATE.search(text)
+        if match:
+            candidates.append((match.start(), int(match.group(3)), MONTHS[match.group(2).lower()], int(match.group(1))))
+        match = _MONTH_DAY_DATE.search(text)
+        if match:
+            candidates.append((match.start(), int(match.group(3)), MONTHS[match.group(1).lower()], int(match.group(2))))
+        match = _RELATIVE_DATE.search(text)
+        if match:
+            offset = {"today": 0, "yesterday": -1, "tomorrow": 1}[match.group(1).lower()]
+            relative = date.today() + timedelta(days=offset)
+            candidates.append((match.start(), relative.year, relative.month, relative.day))
+        for _, year, month, day in sorted(candidates):
+            try:
+                return date(year, month, day).isoformat()
+            except ValueError:
+                continue
+        return None
+
+    @staticmethod
+    def _boolean(windows: List[Tuple[str, str]]) -> Optional[bool]:
+        for before, after in windows:
+            word = re.match(r"\W*(?:is\s+|was\s+)?(\w+)", after)
+            if word and word.group(1).lower() in BOOLEAN_WORDS:
+                return BOOLEAN_WORDS[word.group(1).lower()]
+            if _NEGATION.search(before):
+                return False
+        return None
+
+    @staticmethod
+    def _enum(field: Field, windows: List[Tuple[str, str]]) -> Optional[str]:
+        options = _enum_options(field)
+        for _, after in windows:
+            found = [
+                (match.start(), option)
+                for option in options
+                for match in re.finditer(rf"\b{re.escape(option)}\b", after, re.IGNORECASE)
+                if not _NEGATION.search(after[: match.start()])
+            ]
+            if found:
+                return min(found)[1]
+        return None
+
+    @staticmethod
+    def extract_field(text: str, field: Field) -> Optional[Any]:
+        """
+        :param text: Transcription text.
+        :param field: The form field to fill.
+        :return: The value of the field, or None when it cannot be resolved deterministically.
+        """
+        kind = _field_kind(field)
+        if kind is None:
+            return None
+        windows = FormExtractor._windows(text, field)
+        if not windows:
+            return None
+        if kind == "number":
+            value = FormExtractor._number(field, windows)
+            if value is None:
+                return None
+            if (field.field_type or "").lower() in INTEGER_TYPES:
+                return int(value) if float(value).is_integer() else None
+            return round(value, 2)
+        if kind == "date":
+            for _, after in windows:
+                value = FormExtractor._date(after)
+                if value is not None:
+                    return value
+            return None
+        if kind == "boolean":
+            return FormExtractor._boolean(windows)
+        return FormExtractor._enum(field, windows)
+
+    @staticmethod
+    def extract(transcription_text: str, form_fields: List[Field]) -> Extraction:
+        """
+        Resolves the form fields that can be filled deterministically.
+
+        :param transcription_text: Transcription text from audio input.
+        :param form_fields: The fields of the form.
+        :return: The resolved values with the provenance of every field.
+        """
+        extraction = Extraction(form_fields)
+        for field in form_fields:
+            value = FormExtractor.extract_field(transcription_text, field)
+            if value is not None:
+                extraction.resolve(field.name, value)
+        return extraction
@@ -1,10 +1,15 @@
 import os
+import json
+import math
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from fastapi import HTTPException, status
-from typing import Dict
-from openai import OpenAI
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from openai import OpenAI, RateLimitError
 from app.schemas.departments import Department
 from app.schemas.patients import PatientContext
 from app.schemas.users import User
+from app.utils.patient_context import compact_patient_context
 
 
 class OpenAIUtils:
@@ -15,6 +20,8 @@ class OpenAIUtils:
 
     _client = None
 
+    SUMMARY_MODEL_PARAMS = {"model": "gpt-3.5-turbo-1106", "temperature": 0.2, "top_p": 1}
+
     @classmethod
     def initialize_client(cls):
         """Initializes the OpenAI client if not already initialized."""
@@ -46,6 +53,15 @@ class OpenAIUtils:
                     response_format="text",
                 )
                 return transcription
+            except RateLimitError as e:
+                retry_after = cls._retry_after(
+                    e.response.headers.get("retry-after") if e.response is not None else None
+                )
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail=f"Transcription rate limit reached for the file: {file_path}. Error: {e}",
+                    headers={"Retry-After": retry_after} if retry_after else None,
+                )
             except Exception as e:
                 raise HTTPException(
                     status_code=status.HTTP_424_FAILED_DEPENDENCY,
@@ -53,16 +69,23 @@ class OpenAIUtils:
                 )
 
     @classmethod
-    def validate_transcription(cls, transcription_text: str, form_structure: Dict[str, str]) -> Dict[str, str]:
+    def validate_transcription(
+        cls, transcription_text: str, form_structure: Dict[str, str], prefilled: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, str]:
         """
         Prepares the context for the AI to fill out a form based on the transcription text.
 
         :param transcription_text: Transcription text from audio input.
         :param form_structure: Dictionary containing form field names as keys and their descriptions as values.
+        :param prefilled: Values already read from the transcription, scored by how well the transcription
+         supports them.
         :return: Dictionary with form field names and their corresponding values populated from the transcription.
         :raises HTTPException: If the response parsing fails.
         """
         cls.initialize_client()
+        prefilled_section = cls._prefilled_section(
+            prefilled, "score each of these fields by how well the transcription supports the given value"
+        )
 
         prompt = f"""
             Given a text transcription and a form structure dictionary, evaluate how confidently the
@@ -71,7 +94,7 @@ class OpenAIUtils:
 
             Form Structure:
             {form_structure}
-
+            {prefilled_section}
             Transcription:
             {transcription_text}
 
@@ -101,6 +124,8 @@ class OpenAIUtils:
                     detail="Failed to parse the AI's response: The AI response is not a valid dictionary.",
                 )
             return confidence_scores
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_424_FAILED_DEPENDENCY,
@@ -157,6 +182,8 @@ class OpenAIUtils:
                     detail="Failed to parse the AI's response: The AI response is not a valid dictionary.",
                 )
             return result
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_424_FAILED_DEPENDENCY,
@@ -164,19 +191,125 @@ class OpenAIUtils:
             )
 
     @classmethod
-    def analyze_patient_context(cls, patient_context: PatientContext, user: User, department: Department) -> str:
+    def extract_form_data(
+        cls, transcription_text: str, form_structure: Dict[str, str], prefilled: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, float]]:
         """
-        Analyzes the patient context using AI models to provide a detailed summary
-        based on patient details, observations, conditions, and allergies.
+        Extracts the form values and scores the confidence of each field in a single JSON-mode completion,
+        combining the work of `validate_transcription` and `prepare_context`.
 
-        :param patient_context: The complete patient context
-        containing personal details, observations, conditions, and allergies.
-        :return: A detailed patient summary as a dictionary.
-        :raises HTTPException: If the AI response parsing fails.
+        :param transcription_text: Transcription text from audio input.
+        :param form_structure: Dictionary containing form field names as keys and their descriptions as values.
+        :param prefilled: Values already read from the transcription, returned as they are unless the
+         transcription says otherwise.
+        :return: The extracted field values, and the per-field confidence scores along with the `total` score
+         for the form.
+        :raises HTTPException: If the response parsing fails.
         """
         cls.initialize_client()
+        prefilled_section = cls._prefilled_section(
+            prefilled, "return these values unless the transcription says otherwise"
+        )
+
+        prompt = f"""
+        You are an AI assistant filling the form for a user. Make sure that you do not populate
+         the form with any data that the user did not provide. Ensure all data shared by users
+         are correctly split into function arguments.
 
-        patient_data = patient_context.dict(by_alias=True, exclude_none=True)
+        Form Structure:
+        {form_structure}
+        {prefilled_section}
+        Transcription:
+        {transcription_text}
+
+        Task:
+        Extract the relevant details from the transcription to populate the form fields, using only
+         the data explicitly mentioned in the transcription. Then evaluate how confidently each form
+         field can be filled based on the transcription's content as a percentage (0-100).
+        Return the response as a JSON object with two keys:
+         "values": an object where the keys are the form field names and the values are the extracted data.
+         "confidence": an object where the keys are the form field names and the values are the confidence
+          scores as numbers. The final key should be "total" with the overall confidence score for the form.
+        """
+
+        try:
+            response = cls._client.chat.completions.create(
+                model="gpt-3.5-turbo-1106",
+                temperature=0.2,
+                top_p=1,
+                response_format={"type": "json_object"},
+                messages=[
+                    {
+                        "role": "user",
+                        "content": prompt,
+                    }
+                ],
+            )
+
+            result = json.loads(response.choices[0].message.content)
+            values = result.get("values") if isinstance(result, dict) else None
+            confidence = result.get("confidence") if isinstance(result, dict) else None
+            if not isinstance(values, dict) or not isinstance(confidence, dict) or "total" not in confidence:
+                raise HTTPException(
+                    status_code=status.HTTP_424_FAILED_DEPENDENCY,
+                    detail="Failed to parse the AI's response: The AI response is missing the values or confidence.",
+                )
+            confidence = {field: cls._parse_score(score) for field, score in confidence.items()}
+            return values, confidence
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_424_FAILED_DEPENDENCY,
+                detail=f"Failed to parse the AI's response: {e}",
+            )
+
+    @staticmethod
+    def _prefilled_section(prefilled: Optional[Dict[str, Any]], instruction: str) -> str:
+        """The prompt section listing the values read from the transcription by rules, which may be wrong."""
+        if not prefilled:
+            return ""
+        return f"""
+        Prefilled (read from the transcription by rules and possibly wrong; {instruction}):
+        {prefilled}
+        """
+
+    @staticmethod
+    def _retry_after(value: Optional[str]) -> Optional[str]:
+        """
+        :param value: The `Retry-After` header of a rate limited response, in seconds or as an HTTP-date.
+        :return: The wait in whole seconds, or None when the header is missing or cannot be read.
+        """
+        if not value:
+            return None
+        try:
+            return str(max(math.ceil(float(value)), 0))
+        except (ValueError, OverflowError):
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return str(max(math.ceil((retry_at - datetime.now(timezone.utc)).total_seconds()), 0))
+
+    @staticmethod
+    def _parse_score(score: Any) -> float:
+        """
+        :param score: A confidence score of the completion, e.g. `95`, `"95%"` or null.
+        :return: The score as a number, or 0 when it cannot be read so one bad score does not fail the form.
+        """
+        try:
+            return float(str(score).strip().rstrip("%"))
+        except ValueError:
+            return 0.0
+
+    @classmethod
+    def _patient_context_messages(
+        cls, patient_context: PatientContext, user: User, department: Department
+    ) -> List[Dict[str, str]]:
+        patient_data = json.dumps(compact_patient_context(patient_context))
 
         prompt = f"""
         Generate a structured report tailored to the user’s clinical specialty and department, including:
@@ -190,27 +323,43 @@ class OpenAIUtils:
         Ensure the report is concise, medically accurate, and decision-oriented, supporting specialists
          in making informed clinical decisions.
 
+        The patient context is JSON. Observations are summarized per test as trends (latest value, min, max and
+         slope per day) and codes are listed once under "codings"; "omitted" counts the items left out.
+
         **Patient Context:**
         {patient_data}
         """
 
+        return [
+            {
+                "role": "system",
+                "content": f"You are an {department.name} expert specializing in {user.specialty}. "
+                f"Your task is to analyze a patient's comprehensive medical profile based on patient "
+                f"demographics, medical history, observations, conditions, and allergies.",
+            },
+            {
+                "role": "user",
+                "content": prompt,
+            },
+        ]
+
+    @classmethod
+    def analyze_patient_context(cls, patient_context: PatientContext, user: User, department: Department) -> str:
+        """
+        Analyzes the patient context using AI models to provide a detailed summary
+        based on patient details, observations, conditions, and allergies.
+
+        :param patient_context: The complete patient context
+        containing personal details, observations, conditions, and allergies.
+        :return: A detailed patient summary as a dictionary.
+        :raises HTTPException: If the AI response parsing fails.
+        """
+        cls.initialize_client()
+
         try:
             response = cls._client.chat.completions.create(
-                model="gpt-3.5-turbo-1106",
-                temperature=0.2,
-                top_p=1,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": f"You are an {department.name} expert specializing in {user.specialty}. "
-                        f"Your task is to analyze a patient's comprehensive medical profile based on patient "
-                        f"demographics, medical history, observations, conditions, and allergies.",
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt,
-                    },
-                ],
+                **cls.SUMMARY_MODEL_PARAMS,
+                messages=cls._patient_context_messages(patient_context, user, department),
             )
             result = response.choices[0].message.content
             print(result)
@@ -221,3 +370,33 @@ class OpenAIUtils:
                 status_code=status.HTTP_424_FAILED_DEPENDENCY,
                 detail=f"Failed to parse the AI's response: {e}",
             )
+
+    @classmethod
+    def stream_patient_context(
+        cls, patient_context: PatientContext, user: User, department: Department
+    ) -> Iterator[str]:
+        """
+        Streams the patient summary produced by `analyze_patient_context` as it is generated.
+
+        :param patient_context: The complete patient context
+        containing personal details, observations, conditions, and allergies.
+        :return: An iterator over the text chunks of the summary.
+        :raises HTTPException: If the AI request fails.
+        """
+        cls.initialize_client()
+
+        try:
+            stream = cls._client.chat.completions.create(
+                **cls.SUMMARY_MODEL_PARAMS,
+                messages=cls._patient_context_messages(patient_context, user, department),
+                stream=True,
+            )
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_424_FAILED_DEPENDENCY,
+                detail=f"Failed to stream the AI's response: {e}",
+            )
@@ -0,0 +1,114 @@
+import os
+import json
+from typing import Any, Dict, List, Optional, Type
+from dotenv import load_dotenv
+from fastapi import HTTPException, Query, Response, status
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy.orm import Query as SQLQuery
+
+load_dotenv()
+
+LIST_DEFAULT_LIMIT = int(os.getenv("LIST_DEFAULT_LIMIT", "100"))
+LIST_MAX_LIMIT = int(os.getenv("LIST_MAX_LIMIT", "1000"))
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams:
+    """
+    Query parameters shared by the paginated list routes.
+
+    :param after_id: Only return rows with a greater ID, i.e. the `X-Next-Cursor` of the previous page.
+    :param limit: Maximum number of rows to return. Without a limit or a cursor every row is returned, as before
+     the lists were paginated; following a cursor without a limit returns `LIST_DEFAULT_LIMIT` rows.
+    :param fields: Comma separated list of the attributes to return. `id` is always returned.
+    """
+
+    def __init__(
+        self,
+        after_id: Optional[int] = Query(None, ge=0, description="Return the rows after this ID (the next cursor)"),
+        limit: Optional[int] = Query(None, ge=1, le=LIST_MAX_LIMIT, description="Maximum number of rows"),
+        fields: Optional[str] = Query(None, description="Comma separated attributes to return, e.g. `id,name`"),
+    ):
+        self.after_id = after_id
+        self.limit = LIST_DEFAULT_LIMIT if limit is None and after_id is not None else limit
+        self.fields = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+
+
+class Page:
+    """
+    One page of a keyset paginated list.
+
+    :param items: The validated schemas, or dictionaries of the requested attributes when `projected`.
+    :param next_cursor: The `after_id` of the next page, or None on the last page.
+    :param projected: Whether the items were projected to a subset of their attributes.
+    """
+
+    def __init__(self, items: List[Any], next_cursor: Optional[int], projected: bool = False):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.projected = projected
+
+
+def paginate(
+    query: SQLQuery,
+    model: Type,
+    schema: Type[BaseModel],
+    adapter: TypeAdapter,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None,
+) -> Page:
+    """
+    Fetches one page of `query` ordered by ID, seeking past `after_id` instead of counting or skipping rows, so
+    every page costs the same however deep it is. One extra row is fetched to tell whether a next page exists.
+
+    :param query: The filtered query of the model.
+    :param model: The mapped class, which must have an `id` primary key.
+    :param schema: The response schema, which limits the attributes that can be projected.
+    :param adapter: The list adapter of the schema.
+    :param after_id: Cursor returned by the previous page.
+    :param limit: Maximum number of rows, or None for all of them.
+    :param fields: Attributes to select. When given, only these columns are queried and the items are dictionaries.
+    :return: The page.
+    :raises HTTPException: If an unknown attribute is requested.
+    """
+    if fields:
+        unknown = [field for field in fields if field not in schema.model_fields or not hasattr(model, field)]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {unknown}. Allowed fields are: {', '.join(schema.model_fields)}.",
+            )
+        fields = ["id"] + [field for field in dict.fromkeys(fields) if field != "id"]
+        query = query.with_entities(*(getattr(model, field) for field in fields))
+    if after_id is not None:
+        query = query.filter(model.id > after_id)
+    query = query.order_by(model.id)
+    if limit is None:
+        rows, next_cursor = query.all(), None
+    else:
+        rows = query.limit(limit + 1).all()
+        next_cursor = rows[limit - 1].id if len(rows) > limit else None
+        rows = rows[:limit]
+    if fields:
+        return Page([dict(row._mapping) for row in rows], next_cursor, projected=True)
+    return Page(adapter.validate_python(rows), next_cursor)
+
+
+def page_response(page: Page, adapter: TypeAdapter) -> Response:
+    """
+    Serializes a page with the prebuilt adapter of its schema, skipping the re-validation FastAPI applies to
+    returned models. The cursor of the next page, if any, is sent in the `X-Next-Cursor` header.
+    """
+    headers = {NEXT_CURSOR_HEADER: str(page.next_cursor)} if page.next_cursor is not None else {}
+    if page.projected:
+        content = json.dumps(jsonable_encoder(page.items)).encode()
+    else:
+        content = adapter.dump_json(page.items)
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+def filters(**values: Any) -> Dict[str, Any]:
+    """The given filters that were set."""
+    return {key: value for key, value in values.items() if value is not None}
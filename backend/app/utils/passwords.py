@@ -0,0 +1,101 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Optional, Tuple
+from dotenv import load_dotenv
+from passlib.context import CryptContext
+from app.core.workers import WorkerPool, password_pool
+
+load_dotenv()
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+BCRYPT_MIN_ROUNDS = 10
+BCRYPT_MAX_ROUNDS = 16
+
+
+class PasswordHasher:
+    """
+    Hashes and verifies passwords with bcrypt on a dedicated, bounded pool, so a burst of logins can only keep
+    `PASSWORD_HASH_WORKERS` cores busy and queues behind them instead of starving every other request.
+
+    Hashes made with a cost other than `rounds` are reported by `verify_and_update` together with a new hash
+    at the configured cost, so passwords are upgraded (or downgraded) transparently on login.
+
+    :param rounds: The bcrypt cost factor of new hashes.
+    :param pool: The pool the hashing runs on.
+    """
+
+    def __init__(self, rounds: int = BCRYPT_ROUNDS, pool: WorkerPool = password_pool):
+        self.pool = pool
+        self.configure(rounds)
+
+    def configure(self, rounds: int):
+        """Use the given cost factor for new hashes and rehash every password with another cost on login."""
+        self.rounds = rounds
+        self.context = CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto",
+            bcrypt__default_rounds=rounds,
+            bcrypt__min_rounds=rounds,
+            bcrypt__max_rounds=rounds,
+        )
+
+    def hash(self, password: str) -> str:
+        return self.pool.submit(self.context.hash, password).result()
+
+    async def hash_async(self, password: str) -> str:
+        """Same as `hash`, awaiting the pool instead of holding a threadpool thread."""
+        return await asyncio.wrap_future(self.pool.submit(self.context.hash, password))
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        return self.pool.submit(self.context.verify, password, hashed_password).result()
+
+    def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        :param password: The password to verify.
+        :param hashed_password: The stored hash.
+        :return: Whether the password matches, and a hash at the configured cost when the stored one needs an update.
+        """
+        return self.pool.submit(self.context.verify_and_update, password, hashed_password).result()
+
+    async def verify_and_update_async(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Same as `verify_and_update`, awaiting the pool instead of holding a threadpool thread."""
+        future = self.pool.submit(self.context.verify_and_update, password, hashed_password)
+        return await asyncio.wrap_future(future)
+
+    @staticmethod
+    def calibrate(
+        target_ms: float,
+        min_rounds: int = BCRYPT_MIN_ROUNDS,
+        max_rounds: int = BCRYPT_MAX_ROUNDS,
+        sample_rounds: int = 8,
+        repeat: int = 3,
+    ) -> int:
+        """
+        Picks the highest bcrypt cost whose verification takes at most `target_ms` on this machine. Every extra
+        round doubles the work, so the cost is extrapolated from the fastest of a few hashes at `sample_rounds`.
+
+        :param target_ms: The verification time to aim for, in milliseconds.
+        :param min_rounds: The lowest cost returned, however slow the machine.
+        :param max_rounds: The highest cost returned, however fast the machine.
+        :param sample_rounds: The cost the timing is measured at.
+        :param repeat: Number of timed hashes.
+        :return: The cost factor to use, e.g. as `BCRYPT_ROUNDS`.
+        """
+        context = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=sample_rounds)
+        hashed_password = context.hash("calibration")
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            context.verify("calibration", hashed_password)
+            timings.append(time.perf_counter() - start)
+        unit_ms = min(timings) * 1000 / 2**sample_rounds
+        rounds = min_rounds
+        while rounds < max_rounds and unit_ms * 2 ** (rounds + 1) <= target_ms:
+            rounds += 1
+        logging.info(f"bcrypt cost {rounds} takes about {unit_ms * 2 ** rounds:.0f} ms (target {target_ms:.0f} ms)")
+        return rounds
+
+
+password_hasher = PasswordHasher()
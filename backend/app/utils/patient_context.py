@@ -0,0 +1,276 @@
+import os
+import json
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from dotenv import load_dotenv
+from app.schemas.patients import (
+    AllergyIntoleranceResource,
+    CodeableConcept,
+    ConditionResource,
+    ObservationResource,
+    PatientContext,
+)
+
+load_dotenv()
+
+PATIENT_CONTEXT_TOKEN_BUDGET = int(os.getenv("PATIENT_CONTEXT_TOKEN_BUDGET", "6000"))
+PATIENT_CONTEXT_TOKENIZER = os.getenv("PATIENT_CONTEXT_TOKENIZER", "cl100k_base")
+
+ACTIVE_CONDITION_STATUSES = {"active", "recurrence", "relapse"}
+ALLERGY_CRITICALITY_RANK = {"high": 0, "unable-to-assess": 1, "low": 2}
+
+_encoding = None
+
+
+def _tokenizer() -> Optional[Any]:
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+
+            _encoding = tiktoken.get_encoding(PATIENT_CONTEXT_TOKENIZER)
+        except Exception as e:
+            logging.warning(f"tiktoken is unavailable, estimating tokens from the text length: {e}")
+            _encoding = False
+    return _encoding or None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Counts the tokens of a text with tiktoken, or estimates them at four characters per token when
+    tiktoken is not installed.
+    """
+    encoding = _tokenizer()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), default=str)
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+class _Codings:
+    """
+    Collects the codings of the context so each one is listed once, keyed by the label it is referred to by.
+    """
+
+    def __init__(self):
+        self.table: Dict[str, List[str]] = {}
+
+    def label(self, concept: Optional[CodeableConcept]) -> Optional[str]:
+        if concept is None:
+            return None
+        codings = concept.coding or []
+        label = concept.text or next((coding.display for coding in codings if coding.display), None)
+        label = label or next((coding.code for coding in codings if coding.code), None)
+        if label is None:
+            return None
+        known = self.table.setdefault(label, [])
+        for coding in codings:
+            code = "|".join(filter(None, (coding.system, coding.code)))
+            if coding.code and code not in known:
+                known.append(code)
+        return label
+
+
+def _strings(value: Any) -> Iterator[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+def _slope_per_day(points: List[Tuple[datetime, float]]) -> Optional[float]:
+    if len(points) < 2:
+        return None
+    origin = points[0][0]
+    xs = [(taken - origin).total_seconds() / 86400 for taken, _ in points]
+    ys = [value for _, value in points]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    if variance == 0:
+        return None
+    return round(sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance, 4)
+
+
+def _observation_trends(observations: List[ObservationResource], codings: _Codings) -> List[Dict[str, Any]]:
+    series: Dict[Tuple[str, Optional[str]], List[ObservationResource]] = {}
+    for observation in observations:
+        label = codings.label(observation.code) or "Unknown observation"
+        unit = observation.valueQuantity.unit if observation.valueQuantity else None
+        series.setdefault((label, unit), []).append(observation)
+
+    trends = []
+    for (label, unit), items in series.items():
+        items.sort(key=lambda item: item.effectiveDateTime or item.issued or "")
+        values = [
+            item.valueQuantity.value for item in items if item.valueQuantity and item.valueQuantity.value is not None
+        ]
+        latest = items[-1]
+        trend: Dict[str, Any] = {"name": label, "unit": unit, "count": len(items)}
+        trend["latest"] = latest.valueQuantity.value if latest.valueQuantity else None
+        trend["latest_date"] = latest.effectiveDateTime or latest.issued
+        if len(values) > 1:
+            trend["min"] = min(values)
+            trend["max"] = max(values)
+            points = [
+                (_parse_date(item.effectiveDateTime or item.issued), item.valueQuantity.value)
+                for item in items
+                if item.valueQuantity and item.valueQuantity.value is not None
+            ]
+            trend["slope_per_day"] = _slope_per_day([point for point in points if point[0] is not None])
+        reference_range = (latest.referenceRange or [None])[0]
+        if reference_range is not None:
+            low = reference_range.low.value if reference_range.low else None
+            high = reference_range.high.value if reference_range.high else None
+            trend["reference_range"] = f"{'' if low is None else low}-{'' if high is None else high}"
+        trends.append({key: value for key, value in trend.items() if value is not None})
+
+    trends.sort(key=lambda trend: trend.get("latest_date", ""), reverse=True)
+    return trends
+
+
+def _condition_status(condition: ConditionResource) -> Optional[str]:
+    return condition.status.code if condition.status else None
+
+
+def _conditions(conditions: List[ConditionResource], codings: _Codings) -> List[Dict[str, Any]]:
+    compacted = {}
+    for condition in conditions:
+        item = {
+            "name": codings.label(condition.code),
+            "status": _condition_status(condition),
+            "onset": condition.onsetDateTime,
+            "recorded": condition.recordedDate,
+        }
+        compacted.setdefault((item["name"], item["status"]), {key: value for key, value in item.items() if value})
+    by_recency = sorted(compacted.values(), key=lambda item: item.get("recorded", ""), reverse=True)
+    return sorted(by_recency, key=lambda item: item.get("status") not in ACTIVE_CONDITION_STATUSES)
+
+
+def _allergies(allergies: List[AllergyIntoleranceResource], codings: _Codings) -> List[Dict[str, Any]]:
+    compacted = []
+    for allergy in allergies:
+        reactions = []
+        for reaction in allergy.reaction or []:
+            manifestations = [codings.label(manifestation) for manifestation in reaction.manifestation or []]
+            reactions.append(
+                {
+                    key: value
+                    for key, value in {
+                        "substance": codings.label(reaction.substance),
+                        "manifestations": [manifestation for manifestation in manifestations if manifestation],
+                        "severity": reaction.severity,
+                    }.items()
+                    if value
+                }
+            )
+        item = {
+            "substance": codings.label(allergy.code),
+            "criticality": allergy.criticality,
+            "status": codings.label(allergy.clinicalStatus),
+            "verification": codings.label(allergy.verificationStatus),
+            "type": allergy.type,
+            "category": allergy.category,
+            "recorded": allergy.recordedDate,
+            "reactions": reactions,
+        }
+        compacted.append({key: value for key, value in item.items() if value})
+    return sorted(compacted, key=lambda item: ALLERGY_CRITICALITY_RANK.get(item.get("criticality"), 1))
+
+
+def compact_patient_context(
+    patient_context: PatientContext,
+    token_budget: int = PATIENT_CONTEXT_TOKEN_BUDGET,
+    token_counter: Callable[[str], int] = count_tokens,
+) -> Dict[str, Any]:
+    """
+    Compacts the patient context into the document sent to the model. Codings are listed once in a `codings`
+    table and referred to by their label, observation series are collapsed into trends (latest value, min,
+    max and slope per day), references to the patient, encounters and recorders are dropped, and active
+    conditions and high-criticality allergies are listed first.
+
+    When the document still exceeds `token_budget` tokens, the oldest observation trends, then the inactive
+    conditions, then the low-criticality allergies and finally the codings table are dropped until it fits.
+    The number of dropped items of each section is reported under `omitted`. The patient, active conditions
+    and high-criticality allergies are always kept.
+
+    :param patient_context: The complete patient context.
+    :param token_budget: The maximum number of tokens of the compacted document.
+    :param token_counter: Counts the tokens of a text.
+    :return: The compacted document.
+    """
+    codings = _Codings()
+    patient = patient_context.patient.model_dump(by_alias=True, exclude_none=True) if patient_context.patient else None
+    sections = {
+        "conditions": _conditions(patient_context.conditions or [], codings),
+        "allergies": _allergies(patient_context.allergies or [], codings),
+        "observations": _observation_trends(patient_context.observations or [], codings),
+    }
+    dropped: Dict[str, set] = {section: set() for section in sections}
+
+    def assemble(with_codings: bool = True) -> Dict[str, Any]:
+        document: Dict[str, Any] = {"patient": patient}
+        for section, items in sections.items():
+            document[section] = [item for index, item in enumerate(items) if index not in dropped[section]]
+        omitted = {section: len(indexes) for section, indexes in dropped.items() if indexes}
+        referenced = set(_strings([document[section] for section in sections]))
+        table = {label: codes for label, codes in codings.table.items() if codes and label in referenced}
+        if with_codings and table:
+            document["codings"] = table
+        elif table:
+            omitted["codings"] = len(table)
+        if omitted:
+            document["omitted"] = omitted
+        return document
+
+    document = assemble()
+    tokens = original_tokens = token_counter(_dumps(document))
+    droppable = iter(
+        [("observations", index) for index in reversed(range(len(sections["observations"])))]
+        + [
+            ("conditions", index)
+            for index in reversed(range(len(sections["conditions"])))
+            if sections["conditions"][index].get("status") not in ACTIVE_CONDITION_STATUSES
+        ]
+        + [
+            ("allergies", index)
+            for index in reversed(range(len(sections["allergies"])))
+            if sections["allergies"][index].get("criticality") != "high"
+        ]
+    )
+    exhausted = False
+    while tokens > token_budget and not exhausted:
+        # Drop items against an estimate of the remaining size, then re-measure the assembled document.
+        estimate = tokens
+        exhausted = True
+        for section, index in droppable:
+            dropped[section].add(index)
+            estimate -= token_counter(_dumps(sections[section][index])) + 1
+            if estimate <= token_budget:
+                exhausted = False
+                break
+        document = assemble()
+        tokens = token_counter(_dumps(document))
+    if tokens > token_budget:
+        document = assemble(with_codings=False)
+        tokens = token_counter(_dumps(document))
+
+    logging.info(f"Compacted patient context from {original_tokens} to {tokens} tokens (budget {token_budget})")
+    return document
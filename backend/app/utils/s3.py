@@ -1,49 +1,144 @@
 import boto3
 import os
+import time
+import queue
 import logging
+import threading
+from contextlib import contextmanager
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import NoCredentialsError, PartialCredentialsError, ClientError, EndpointConnectionError
 from fastapi import HTTPException, status
 from dotenv import load_dotenv
-from typing import Optional
+from typing import BinaryIO, Callable, Dict, Optional
 from boto3.exceptions import S3UploadFailedError
 
 
 load_dotenv()
 
+S3_MULTIPART_THRESHOLD = int(os.getenv("S3_MULTIPART_THRESHOLD", str(8 * 1024 * 1024)))
+S3_MULTIPART_CHUNKSIZE = int(os.getenv("S3_MULTIPART_CHUNKSIZE", str(8 * 1024 * 1024)))
+S3_MAX_CONCURRENCY = int(os.getenv("S3_MAX_CONCURRENCY", "10"))
+S3_USE_THREADS = os.getenv("S3_USE_THREADS", "true").lower() == "true"
+S3_CLIENT_POOL_SIZE = int(os.getenv("S3_CLIENT_POOL_SIZE", "4"))
+
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=S3_MULTIPART_THRESHOLD,
+    multipart_chunksize=S3_MULTIPART_CHUNKSIZE,
+    max_concurrency=S3_MAX_CONCURRENCY,
+    use_threads=S3_USE_THREADS,
+)
+
 
 class S3Utils:
     s3 = None
+    _pool: Optional[queue.LifoQueue] = None
+    _pool_size = 0
+    _lock = threading.Lock()
+    _stats = {"uploads": 0, "bytes": 0, "seconds": 0.0}
+
+    @staticmethod
+    def _create_client():
+        return boto3.client(
+            "s3",
+            endpoint_url=os.getenv("S3_ENDPOINT_URL"),
+            aws_access_key_id=os.getenv("S3_ACCESS_KEY_ID"),
+            aws_secret_access_key=os.getenv("S3_SECRET_ACCESS_KEY"),
+            config=Config(max_pool_connections=max(10, S3_MAX_CONCURRENCY)),
+        )
 
     @staticmethod
     def initialize_s3():
         """
         Initialize the S3 client. This method must be called once before using any other methods.
+        The client becomes the first member of the client pool.
         """
         if S3Utils.s3 is None:
-            endpoint_url = os.getenv("S3_ENDPOINT_URL")
-            access_key_id = os.getenv("S3_ACCESS_KEY_ID")
-            secret_access_key = os.getenv("S3_SECRET_ACCESS_KEY")
-            S3Utils.s3 = boto3.client(
-                "s3",
-                endpoint_url=endpoint_url,
-                aws_access_key_id=access_key_id,
-                aws_secret_access_key=secret_access_key,
-            )
+            S3Utils.s3 = S3Utils._create_client()
+            S3Utils._pool = queue.LifoQueue()
+            S3Utils._pool.put(S3Utils.s3)
+            S3Utils._pool_size = 1
+
+    @staticmethod
+    @contextmanager
+    def _client():
+        """
+        Borrow a client from the pool. Up to `S3_CLIENT_POOL_SIZE` clients are created on demand, each with its
+        own connection pool, so concurrent uploads do not contend for connections; once they are all in use
+        callers wait for one to be returned.
+        """
+        if S3Utils.s3 is None:
+            S3Utils.initialize_s3()
+        pool = S3Utils._pool
+        try:
+            client = pool.get_nowait()
+        except queue.Empty:
+            with S3Utils._lock:
+                create = S3Utils._pool_size < S3_CLIENT_POOL_SIZE
+                if create:
+                    S3Utils._pool_size += 1
+            client = S3Utils._create_client() if create else pool.get()
+        try:
+            yield client
+        finally:
+            pool.put(client)
+
+    @staticmethod
+    def _transfer(upload: Callable, description: str, object_name: str) -> Dict[str, float]:
+        """
+        Run an upload with the configured transfer settings and record its throughput.
+
+        :return: The number of bytes sent, the elapsed seconds and the throughput in MB/s.
+        """
+        sent = [0]
+        sent_lock = threading.Lock()
+
+        def progress(bytes_transferred: int):
+            with sent_lock:
+                sent[0] += bytes_transferred
+
+        bucket_name = os.getenv("S3_BUCKET_NAME")
+        start = time.perf_counter()
+        with S3Utils._upload_errors(), S3Utils._client() as client:
+            upload(client, bucket_name, Config=TRANSFER_CONFIG, Callback=progress)
+        seconds = time.perf_counter() - start
+
+        metrics = {
+            "bytes": sent[0],
+            "seconds": seconds,
+            "mb_per_second": sent[0] / (1024 * 1024) / seconds if seconds > 0 else 0.0,
+        }
+        with S3Utils._lock:
+            S3Utils._stats["uploads"] += 1
+            S3Utils._stats["bytes"] += sent[0]
+            S3Utils._stats["seconds"] += seconds
+        logging.info(
+            f"{description} uploaded to bucket '{bucket_name}' as '{object_name}': "
+            f"{metrics['bytes']} bytes in {seconds:.3f}s ({metrics['mb_per_second']:.2f} MB/s)."
+        )
+        return metrics
 
     @staticmethod
-    def upload_file(file_path: str, object_name: Optional[str] = None):
+    def upload_stats() -> Dict[str, float]:
+        """Totals of the uploads made by this process, with the average throughput in MB/s."""
+        with S3Utils._lock:
+            stats = dict(S3Utils._stats)
+        stats["mb_per_second"] = stats["bytes"] / (1024 * 1024) / stats["seconds"] if stats["seconds"] > 0 else 0.0
+        return stats
+
+    @staticmethod
+    def upload_file(file_path: str, object_name: Optional[str] = None) -> Dict[str, float]:
         """
-        Upload a file to an S3 bucket.
+        Upload a file to an S3 bucket. Files above `S3_MULTIPART_THRESHOLD` are sent as a multipart upload in
+        `S3_MULTIPART_CHUNKSIZE` parts, up to `S3_MAX_CONCURRENCY` at a time.
 
         :param file_path: Path to the local file to be uploaded.
         :param object_name: S3 object name. Defaults to the file's name.
+        :return: The throughput metrics of the upload.
 
         :raises ValueError: If the file does not exist.
         :raises ClientError: If an error occurs with S3.
         """
-        if S3Utils.s3 is None:
-            S3Utils.initialize_s3()
-
         if not os.path.exists(file_path):
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"File '{file_path}' does not exist."
@@ -52,10 +147,35 @@ class S3Utils:
         if object_name is None:
             object_name = os.path.basename(file_path)
 
+        return S3Utils._transfer(
+            lambda client, bucket_name, **kwargs: client.upload_file(file_path, bucket_name, object_name, **kwargs),
+            f"File '{file_path}'",
+            object_name,
+        )
+
+    @staticmethod
+    def upload_fileobj(fileobj: BinaryIO, object_name: str) -> Dict[str, float]:
+        """
+        Upload a readable binary stream to an S3 bucket. The stream is read sequentially in parts and sent as a
+        multipart upload, so it is never held in memory as a whole.
+
+        :param fileobj: File-like object opened for binary reading.
+        :param object_name: S3 object name.
+        :return: The throughput metrics of the upload.
+
+        :raises HTTPException: If an error occurs with S3.
+        """
+        return S3Utils._transfer(
+            lambda client, bucket_name, **kwargs: client.upload_fileobj(fileobj, bucket_name, object_name, **kwargs),
+            "Stream",
+            object_name,
+        )
+
+    @staticmethod
+    @contextmanager
+    def _upload_errors():
         try:
-            bucket_name = os.getenv("S3_BUCKET_NAME")
-            S3Utils.s3.upload_file(file_path, bucket_name, object_name)
-            logging.info(f"File '{file_path}' uploaded to bucket '{bucket_name}' as '{object_name}'.")
+            yield
         except EndpointConnectionError:
             raise HTTPException(
                 status_code=status.HTTP_424_FAILED_DEPENDENCY, detail="Failed to connect to S3 endpoint."
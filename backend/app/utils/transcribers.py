@@ -0,0 +1,182 @@
+import os
+import time
+import logging
+import threading
+from typing import Any, List, Optional
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+from app.utils.openai import OpenAIUtils
+
+load_dotenv()
+
+TRANSCRIPTION_BACKEND = os.getenv("TRANSCRIPTION_BACKEND", "openai").lower()
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "openai/whisper-small")
+WHISPER_LANGUAGE = os.getenv("WHISPER_LANGUAGE") or None
+WHISPER_BATCH_SIZE = int(os.getenv("WHISPER_BATCH_SIZE", "4"))
+WHISPER_QUANTIZE = os.getenv("WHISPER_QUANTIZE", "true").lower() == "true"
+WHISPER_THREADS = int(os.getenv("WHISPER_THREADS", "0"))
+WHISPER_CHUNK_LENGTH = float(os.getenv("WHISPER_CHUNK_LENGTH", "30"))
+
+
+class Transcriber:
+    """
+    Interface of the speech-to-text backends. Backends that set `batched` transcribe several files in one
+    call more efficiently than one at a time, so the chunks of a long recording are handed to them together
+    instead of being spread over the chunk pool.
+    """
+
+    name = "base"
+    batched = False
+
+    def transcribe(self, file_path: str) -> str:
+        """
+        :param file_path: Path to the audio file.
+        :return: Transcription text.
+        """
+        raise NotImplementedError
+
+    def transcribe_batch(self, file_paths: List[str]) -> List[str]:
+        """
+        :param file_paths: Paths to the audio files.
+        :return: The transcription text of every file, in order.
+        """
+        return [self.transcribe(file_path) for file_path in file_paths]
+
+
+class OpenAITranscriber(Transcriber):
+    """Transcribes with the hosted `whisper-1` model."""
+
+    name = "openai"
+
+    def transcribe(self, file_path: str) -> str:
+        return OpenAIUtils.transcribe_audio(file_path=file_path)
+
+
+class LocalWhisperTranscriber(Transcriber):
+    """
+    Transcribes on the CPU with a Whisper checkpoint run by `transformers`. The model is loaded once per process,
+    on first use, and its linear layers are quantized to int8 with dynamic quantization unless `quantize` is
+    disabled. Audio longer than `chunk_length` seconds is split into windows which are decoded `batch_size` at a
+    time, together with the windows of every other file of the batch.
+
+    :param model_name: Hugging Face model id or local path of the Whisper checkpoint.
+    :param language: Language of the recordings, detected per file when None.
+    :param batch_size: Number of windows decoded together.
+    :param quantize: Whether to apply int8 dynamic quantization.
+    :param threads: Number of threads torch uses, or 0 for its default.
+    :param chunk_length: Length in seconds of the windows long audio is split into.
+    """
+
+    name = "local"
+    batched = True
+
+    def __init__(
+        self,
+        model_name: str = WHISPER_MODEL,
+        language: Optional[str] = WHISPER_LANGUAGE,
+        batch_size: int = WHISPER_BATCH_SIZE,
+        quantize: bool = WHISPER_QUANTIZE,
+        threads: int = WHISPER_THREADS,
+        chunk_length: float = WHISPER_CHUNK_LENGTH,
+    ):
+        self.model_name = model_name
+        self.language = language
+        self.batch_size = batch_size
+        self.quantize = quantize
+        self.threads = threads
+        self.chunk_length = chunk_length
+        self.load_seconds: Optional[float] = None
+        self._pipeline = None
+        self._load_lock = threading.Lock()
+        self._inference_lock = threading.Lock()
+
+    def load(self) -> Any:
+        """
+        Loads the model and builds the speech recognition pipeline, once.
+
+        :return: The `transformers` pipeline.
+        :raises HTTPException: If `transformers` or `torch` is not installed or the checkpoint cannot be loaded.
+        """
+        with self._load_lock:
+            if self._pipeline is not None:
+                return self._pipeline
+            start = time.perf_counter()
+            try:
+                import torch
+                from transformers import WhisperForConditionalGeneration, WhisperProcessor, pipeline
+
+                if self.threads > 0:
+                    torch.set_num_threads(self.threads)
+                model = WhisperForConditionalGeneration.from_pretrained(self.model_name)
+                model.eval()
+                if self.quantize:
+                    model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+                processor = WhisperProcessor.from_pretrained(self.model_name)
+                self._pipeline = pipeline(
+                    "automatic-speech-recognition",
+                    model=model,
+                    tokenizer=processor.tokenizer,
+                    feature_extractor=processor.feature_extractor,
+                    chunk_length_s=self.chunk_length,
+                    device="cpu",
+                )
+            except Exception as e:
+                raise HTTPException(
+                    status_code=status.HTTP_424_FAILED_DEPENDENCY,
+                    detail=f"Failed to load the local Whisper model '{self.model_name}'. Error: {e}",
+                )
+            self.load_seconds = time.perf_counter() - start
+            logging.info(
+                f"Loaded Whisper model '{self.model_name}' in {self.load_seconds:.1f}s "
+                f"({'int8 dynamic quantization' if self.quantize else 'float32'})"
+            )
+            return self._pipeline
+
+    def transcribe(self, file_path: str) -> str:
+        return self.transcribe_batch([file_path])[0]
+
+    def transcribe_batch(self, file_paths: List[str]) -> List[str]:
+        asr = self.load()
+        generate_kwargs = {"task": "transcribe"}
+        if self.language:
+            generate_kwargs["language"] = self.language
+        start = time.perf_counter()
+        try:
+            # The model already uses every core, so concurrent calls would only contend for them.
+            with self._inference_lock:
+                outputs = asr(list(file_paths), batch_size=self.batch_size, generate_kwargs=generate_kwargs)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_424_FAILED_DEPENDENCY,
+                detail=f"Failed to transcribe audio from the files: {file_paths}. Error: {e}",
+            )
+        logging.info(f"Transcribed {len(file_paths)} files locally in {time.perf_counter() - start:.3f}s")
+        return [output["text"].strip() for output in outputs]
+
+
+def create_transcriber(backend: str) -> Transcriber:
+    """
+    Build a transcriber by name.
+
+    :param backend: `openai` or `local`.
+    :return: The transcriber.
+    """
+    backend = (backend or "openai").lower()
+    if backend == "openai":
+        return OpenAITranscriber()
+    if backend == "local":
+        return LocalWhisperTranscriber()
+    raise ValueError(f"Unsupported transcription backend: '{backend}'")
+
+
+_transcriber: Optional[Transcriber] = None
+_transcriber_lock = threading.Lock()
+
+
+def get_transcriber() -> Transcriber:
+    """The transcriber configured by `TRANSCRIPTION_BACKEND`, shared by the whole process."""
+    global _transcriber
+    with _transcriber_lock:
+        if _transcriber is None:
+            _transcriber = create_transcriber(TRANSCRIPTION_BACKEND)
+        return _transcriber
@@ -0,0 +1,43 @@
+"""
+Picks the bcrypt cost factor for a target password verification time on this machine, and shows how long a burst
+of logins takes to verify on the password hashing pool. Run it on the production hardware and set the printed
+cost as `BCRYPT_ROUNDS` on every worker: workers configured with different costs would keep rehashing the same
+passwords back and forth.
+
+    python -m benchmarks.bcrypt_rounds [--target-ms 250] [--logins 16]
+"""
+
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from app.core.workers import PASSWORD_HASH_WORKERS
+from app.utils.passwords import PasswordHasher
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target-ms", type=float, default=250)
+    parser.add_argument("--logins", type=int, default=16)
+    args = parser.parse_args()
+
+    rounds = PasswordHasher.calibrate(args.target_ms)
+    hasher = PasswordHasher(rounds=rounds)
+    hashed_password = hasher.hash("benchmark")
+
+    start = time.perf_counter()
+    hasher.verify("benchmark", hashed_password)
+    print(f"one verification at cost {rounds}: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.logins) as executor:
+        list(executor.map(lambda _: hasher.verify("benchmark", hashed_password), range(args.logins)))
+    print(
+        f"{args.logins} concurrent logins on {PASSWORD_HASH_WORKERS} hashing workers: "
+        f"{(time.perf_counter() - start) * 1000:.0f} ms"
+    )
+    print(f"BCRYPT_ROUNDS={rounds}")
+    hasher.pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Measures the event-loop lag of the application while it serves concurrent transcription uploads, through the async
+routes backed by `get_async_db` and through the previous implementation: the same `async def` routes running the
+synchronous services on a `Session` from `get_db`, which blocks the event loop on every database call and for the
+whole transcription.
+
+The lag is how late a probe task sleeping `--probe-ms` at a time wakes up; with a free event loop it stays close
+to zero. S3, the transcription API and the form extraction are simulated with `--latency` seconds of blocking I/O
+so no external service is needed.
+
+    DATABASE_URL=sqlite:///./benchmark.db python -m benchmarks.event_loop_lag [--uploads 16] [--latency 0.5]
+"""
+
+import time
+import asyncio
+import argparse
+import statistics
+from typing import List
+from unittest.mock import patch
+import httpx
+from fastapi import Depends, File, UploadFile
+from sqlalchemy.orm import Session
+from app.main import app
+from app.config.database import SessionLocal, get_db
+from app.models.forms import Forms
+from app.models.fields import Fields
+from app.models.users import Users
+from app.services.auth import create_access_token
+from app.services.fields import FieldsService
+from app.services.transcriptions import TranscriptionService
+
+
+@app.post("/benchmark/sync-session/{form_id}", include_in_schema=False)
+async def create_transcription_with_sync_session(
+    form_id: int, file: UploadFile = File(...), db: Session = Depends(get_db)
+):
+    user = db.query(Users).filter(Users.user_name == "benchmark").first()
+    form_fields = FieldsService.get_fields_by_form_id(db, form_id)
+    transcription = TranscriptionService._transcribe_upload(user.id, form_id, file, form_fields)
+    db.add(transcription)
+    db.commit()
+    db.refresh(transcription)
+    return transcription
+
+
+def seed() -> int:
+    db = SessionLocal()
+    try:
+        if not db.query(Users).filter(Users.user_name == "benchmark").first():
+            db.add(Users(user_name="benchmark", email="benchmark@example.com", password="benchmark"))
+        form = Forms(name="Benchmark vitals")
+        form.fields = [Fields(name="Pulse", field_type="integer", minimum=20, maximum=250)]
+        db.add(form)
+        db.commit()
+        return form.id
+    finally:
+        db.close()
+
+
+async def probe(lags: List[float], interval: float, stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def run(path: str, uploads: int, interval: float) -> dict:
+    headers = {"Authorization": f"Bearer {create_access_token(subject='benchmark')}"}
+    lags: List[float] = []
+    stop = asyncio.Event()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        probe_task = asyncio.create_task(probe(lags, interval, stop))
+        start = time.perf_counter()
+        responses = await asyncio.gather(
+            *(
+                client.post(path, headers=headers, files={"file": ("visit.mp3", b"\0" * 64 * 1024, "audio/mpeg")})
+                for _ in range(uploads)
+            )
+        )
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await probe_task
+    failed = [response.status_code for response in responses if response.status_code >= 400]
+    if failed:
+        raise RuntimeError(f"{len(failed)} uploads to {path} failed: {failed[:5]}")
+    lags_ms = sorted(lag * 1000 for lag in lags) or [0.0]
+    return {
+        "elapsed": elapsed,
+        "p50": statistics.median(lags_ms),
+        "p99": lags_ms[min(len(lags_ms) - 1, int(len(lags_ms) * 0.99))],
+        "max": lags_ms[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=16, help="Concurrent uploads")
+    parser.add_argument("--latency", type=float, default=0.5, help="Simulated upload and transcription seconds")
+    parser.add_argument("--probe-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    form_id = seed()
+
+    def upload_and_transcribe(temp_file_path: str, s3_key: str) -> str:
+        time.sleep(args.latency)
+        return "Pulse is 72."
+
+    with patch.object(TranscriptionService, "_upload_and_transcribe", side_effect=upload_and_transcribe):
+        print(f"{'session':>8} {'uploads':>8} {'elapsed (s)':>12} {'lag p50 (ms)':>13} {'p99 (ms)':>9} {'max (ms)':>9}")
+        for name, path in (
+            ("sync", f"/benchmark/sync-session/{form_id}"),
+            ("async", f"/api/transcriptions/{form_id}"),
+        ):
+            result = asyncio.run(run(path, args.uploads, args.probe_ms / 1000))
+            print(
+                f"{name:>8} {args.uploads:>8} {result['elapsed']:>12.2f} {result['p50']:>13.1f} "
+                f"{result['p99']:>9.1f} {result['max']:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Measures the real-time factor (processing time / audio duration) of the local Whisper backend on the CPU, with and
+without int8 dynamic quantization and for several batch sizes. A real-time factor below 1 means the recordings are
+transcribed faster than they play.
+
+Recordings given with `--audio` are used as is; otherwise a synthetic consultation is generated with ffmpeg, which
+gives meaningless text but representative timings.
+
+    python -m benchmarks.local_whisper_rtf [--audio consultation.wav ...] [--model openai/whisper-small]
+        [--batch-sizes 1 4 8] [--threads 0] [--files 4] [--minutes 2]
+"""
+
+import os
+import time
+import argparse
+import tempfile
+from app.utils.audio import AudioUtils
+from app.utils.transcribers import WHISPER_MODEL, LocalWhisperTranscriber
+from benchmarks.transcription_chunking import generate_consultation
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--audio", nargs="+", help="Recordings to transcribe instead of synthetic audio")
+    parser.add_argument("--model", default=WHISPER_MODEL)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--threads", type=int, default=0, help="torch threads, 0 for the default")
+    parser.add_argument("--files", type=int, default=4, help="Number of synthetic recordings per batch")
+    parser.add_argument("--minutes", type=float, default=2, help="Length of the synthetic recordings")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = args.audio
+        if not paths:
+            source_path = os.path.join(directory, "consultation.wav")
+            generate_consultation(source_path, args.minutes)
+            paths = [source_path] * args.files
+        audio_seconds = sum(AudioUtils.duration(path) or 0.0 for path in paths)
+        if not audio_seconds:
+            parser.error("Could not read the duration of the recordings, is ffmpeg installed?")
+
+        print(f"{len(paths)} recordings, {audio_seconds:.1f}s of audio, model '{args.model}'")
+        print(f"{'quantized':>10} {'batch':>6} {'load (s)':>9} {'wall (s)':>9} {'RTF':>7}")
+        for quantize in (False, True):
+            transcriber = LocalWhisperTranscriber(model_name=args.model, quantize=quantize, threads=args.threads)
+            transcriber.load()
+            transcriber.transcribe(paths[0])  # warm-up
+            for batch_size in args.batch_sizes:
+                transcriber.batch_size = batch_size
+                start = time.perf_counter()
+                transcriber.transcribe_batch(paths)
+                wall = time.perf_counter() - start
+                print(
+                    f"{str(quantize):>10} {batch_size:>6} {transcriber.load_seconds:>9.1f} {wall:>9.1f} "
+                    f"{wall / audio_seconds:>7.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Compares the wall-clock time of single-shot and chunked transcription for 5, 15 and 30 minute consultations.
+
+Synthetic consultations (tone bursts standing in for speech, separated by pauses) are generated with ffmpeg and
+normalized the way uploads are. By default the transcription API is simulated with a latency proportional to the
+audio length; pass `--live` to call the configured OpenAI API instead.
+
+    python -m benchmarks.transcription_chunking [--live] [--minutes 5 15 30] [--seconds-per-audio-minute 2.5]
+"""
+
+import os
+import time
+import argparse
+import tempfile
+import subprocess
+from unittest.mock import patch
+from app.services.transcriptions import TranscriptionService
+from app.utils.audio import AudioUtils, FFMPEG_BINARY
+
+
+def generate_consultation(path: str, minutes: int):
+    """Alternate 20 seconds of tone with 3 seconds of silence for the given number of minutes."""
+    pattern = "if(lt(mod(t,23),20),sin(2*PI*440*t)*0.5,0)"
+    subprocess.run(
+        [
+            FFMPEG_BINARY,
+            "-nostdin",
+            "-loglevel",
+            "error",
+            "-y",
+            "-f",
+            "lavfi",
+            "-i",
+            f"aevalsrc={pattern}:s=48000:c=stereo:d={minutes * 60}",
+            path,
+        ],
+        check=True,
+    )
+
+
+def simulated_transcription(seconds_per_audio_minute: float, overhead: float):
+    def transcribe_audio(file_path: str) -> str:
+        duration = AudioUtils.duration(file_path) or 0.0
+        time.sleep(overhead + duration / 60 * seconds_per_audio_minute)
+        return f"transcript of {os.path.basename(file_path)}"
+
+    return transcribe_audio
+
+
+def measure(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=int, nargs="+", default=[5, 15, 30])
+    parser.add_argument("--live", action="store_true", help="Call the transcription API instead of simulating it")
+    parser.add_argument("--seconds-per-audio-minute", type=float, default=2.5, help="Simulated API latency")
+    parser.add_argument("--overhead", type=float, default=1.0, help="Simulated per-request latency in seconds")
+    parser.add_argument("--chunk-seconds", type=float, default=300)
+    args = parser.parse_args()
+
+    patches = [patch("app.services.transcriptions.CHUNK_SECONDS", args.chunk_seconds)]
+    if not args.live:
+        patches.append(
+            patch(
+                "app.utils.openai.OpenAIUtils.transcribe_audio",
+                side_effect=simulated_transcription(args.seconds_per_audio_minute, args.overhead),
+            )
+        )
+    for active in patches:
+        active.start()
+
+    print(f"{'minutes':>8} {'size (MB)':>10} {'single (s)':>11} {'chunked (s)':>12} {'speed-up':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for minutes in args.minutes:
+            source_path = os.path.join(directory, f"consultation-{minutes}.wav")
+            generate_consultation(source_path, minutes)
+            speech = AudioUtils.detect_speech(source_path)
+            normalized_path = AudioUtils.normalize(source_path, speech=speech)
+            if normalized_path is None:
+                normalized_path, speech = source_path, None
+
+            single = measure(TranscriptionService._transcribe_with_retry, normalized_path)
+            chunked = measure(TranscriptionService._transcribe_in_chunks, normalized_path, speech)
+            size = os.path.getsize(source_path) / (1024 * 1024)
+            print(f"{minutes:>8} {size:>10.1f} {single:>11.2f} {chunked:>12.2f} {single / chunked:>8.2f}x")
+
+    for active in patches:
+        active.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Measures the per-request cost of validating and serializing list responses with a `TypeAdapter` built on every
+call, as the services used to, against the shared adapters of `app.schemas.adapters`.
+
+Rows are transient ORM instances, validated with `from_attributes` just like the results of `db.query(...).all()`.
+
+    python -m benchmarks.type_adapters [--rows 1 100 1000 5000] [--repeat 20]
+"""
+
+import time
+import argparse
+from datetime import datetime
+from typing import List
+from pydantic import TypeAdapter
+from app.models import departments, forms, providers, transcriptions  # noqa: F401 (registers the mapped classes)
+from app.models.fields import Fields
+from app.models.users import Users
+from app.schemas.adapters import type_adapter
+from app.schemas.fields import Field
+from app.schemas.users import User
+
+
+def field_rows(count: int) -> List[Fields]:
+    return [
+        Fields(
+            id=index,
+            name=f"Field {index}",
+            query_selector=f"#field-{index}",
+            description=f"Description of field {index}",
+            field_type="number",
+            minimum=0.0,
+            maximum=100.0,
+            form_id=index % 50,
+        )
+        for index in range(count)
+    ]
+
+
+def user_rows(count: int) -> List[Users]:
+    now = datetime.now()
+    return [
+        Users(
+            id=index,
+            user_name=f"user{index}",
+            email=f"user{index}@example.com",
+            is_admin=False,
+            created_at=now,
+            updated_at=now,
+        )
+        for index in range(count)
+    ]
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1, 100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'schema':>7} {'rows':>6} {'fresh (ms)':>11} {'shared (ms)':>12} {'overhead (ms)':>14} {'json (ms)':>10}")
+    for schema, make_rows in ((Field, field_rows), (User, user_rows)):
+        for count in args.rows:
+            rows = make_rows(count)
+            shared = type_adapter(List[schema])
+
+            fresh_seconds = best_of(args.repeat, lambda: TypeAdapter(List[schema]).validate_python(rows))
+            shared_seconds = best_of(args.repeat, lambda: shared.validate_python(rows))
+            validated = shared.validate_python(rows)
+            json_seconds = best_of(args.repeat, lambda: shared.dump_json(validated))
+            print(
+                f"{schema.__name__:>7} {count:>6} {fresh_seconds * 1000:>11.3f} {shared_seconds * 1000:>12.3f} "
+                f"{(fresh_seconds - shared_seconds) * 1000:>14.3f} {json_seconds * 1000:>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
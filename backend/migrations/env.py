@@ -0,0 +1,33 @@
+from logging.config import fileConfig
+from alembic import context
+from app.config.database import Base, db_engine, SQL_ALCHEMY_DATABASE_URL
+from app.models import departments, fields, forms, providers, transcriptions, users  # noqa: F401 (registers the tables)
+
+if context.config.config_file_name is not None:
+    fileConfig(context.config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline():
+    """Emit the migration SQL for `DATABASE_URL` without connecting to it, e.g. `alembic upgrade head --sql`."""
+    context.configure(url=SQL_ALCHEMY_DATABASE_URL, target_metadata=target_metadata, literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    with db_engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,83 @@
+"""Initial schema, as created by `create_tables` before the migrations were introduced.
+
+Tables that already exist are left alone, so databases created by the application can be upgraded as they are.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def timestamps():
+    return [
+        sa.Column("created_at", sa.TIMESTAMP(timezone=False), nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=False), nullable=False, server_default=sa.func.now()),
+    ]
+
+
+def create_table(name, *columns):
+    if sa.inspect(op.get_bind()).has_table(name):
+        return
+    op.create_table(name, sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True), *columns)
+    op.create_index(f"ix_{name}_id", name, ["id"])
+
+
+def upgrade():
+    create_table("departments", sa.Column("name", sa.String(255), nullable=False), *timestamps())
+    create_table(
+        "forms",
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("prompt", sa.String(255), nullable=True),
+        *timestamps(),
+    )
+    create_table(
+        "users",
+        sa.Column("user_name", sa.String(255), nullable=False, unique=True),
+        sa.Column("email", sa.String(255), nullable=False, unique=True),
+        sa.Column("password", sa.String(255), nullable=False),
+        *timestamps(),
+        sa.Column("is_admin", sa.Boolean(), nullable=True),
+    )
+    create_table(
+        "fields",
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("query_selector", sa.String(255), nullable=True),
+        sa.Column("description", sa.String(255), nullable=True),
+        sa.Column("field_type", sa.String(255), nullable=False),
+        sa.Column("minimum", sa.Float(), nullable=True),
+        sa.Column("maximum", sa.Float(), nullable=True),
+        sa.Column("enum_options", sa.String(255), nullable=True),
+        sa.Column("form_id", sa.Integer(), sa.ForeignKey("forms.id", ondelete="CASCADE"), nullable=False),
+        *timestamps(),
+    )
+    create_table(
+        "providers",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("specialty", sa.String(255), nullable=True),
+        sa.Column("department_id", sa.Integer(), sa.ForeignKey("departments.id"), nullable=False),
+        *timestamps(),
+    )
+    create_table(
+        "transcriptions",
+        sa.Column("upload_uuid", sa.String(255), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("form_id", sa.Integer(), sa.ForeignKey("forms.id"), nullable=False),
+        sa.Column("transcription_text", sa.Text(), nullable=True),
+        sa.Column("context", sa.JSON(), nullable=False),
+        sa.Column("status", sa.String(255), nullable=False),
+        *timestamps(),
+    )
+
+
+def downgrade():
+    for name in ("transcriptions", "providers", "fields", "users", "forms", "departments"):
+        op.drop_table(name)
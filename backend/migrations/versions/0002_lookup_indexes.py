@@ -0,0 +1,41 @@
+"""Indexes for the transcription and provider lookups.
+
+- transcriptions (user_id): the cascade from users.
+- transcriptions (form_id): the cascade from forms.
+- providers (user_id): `ProvidersService.get_provider_by_user_id` and the cascade from users.
+- providers (department_id, id): the keyset pages of `get_all_providers` filtered by department, and the
+  cascade from departments.
+
+Indexes that already exist, e.g. because `create_tables` created the tables, are skipped.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_transcriptions_user_id", "transcriptions", ["user_id"]),
+    ("ix_transcriptions_form_id", "transcriptions", ["form_id"]),
+    ("ix_providers_user_id", "providers", ["user_id"]),
+    ("ix_providers_department_id_id", "providers", ["department_id", "id"]),
+]
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        if name not in {index["name"] for index in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,18 @@
+from typing import List
+from types import SimpleNamespace
+from app.schemas.adapters import field_list_adapter, type_adapter
+from app.schemas.fields import Field
+
+
+def test_type_adapter_is_shared():
+    assert type_adapter(List[Field]) is field_list_adapter
+    assert type_adapter(Field) is type_adapter(Field)
+
+
+def test_shared_adapter_validates_attributes():
+    row = SimpleNamespace(id=1, name="Pulse", field_type="number", form_id=2)
+
+    fields = field_list_adapter.validate_python([row])
+
+    assert fields == [Field(id=1, name="Pulse", field_type="number", form_id=2)]
+    assert field_list_adapter.dump_python(fields)[0]["name"] == "Pulse"
@@ -0,0 +1,168 @@
+import os
+import subprocess
+import pytest
+from unittest.mock import patch
+from app.utils.audio import AudioUtils, TimestampMap
+
+
+@pytest.fixture
+def audio_file(tmp_path):
+    file_path = tmp_path / "audio.wav"
+    file_path.write_bytes(b"\x00" * 1000)
+    return str(file_path)
+
+
+def write_output(size):
+    def run(command, **kwargs):
+        with open(command[-1], "wb") as output:
+            output.write(b"\x01" * size)
+
+    return run
+
+
+def test_normalize_downmixes_resamples_and_encodes(audio_file):
+    with patch("subprocess.run", side_effect=write_output(100)) as mock_run:
+        normalized_path = AudioUtils.normalize(audio_file, codec="opus")
+
+    command = mock_run.call_args.args[0]
+    assert command[command.index("-ac") + 1] == "1"
+    assert command[command.index("-ar") + 1] == "16000"
+    assert command[command.index("-c:a") + 1] == "libopus"
+    assert normalized_path == audio_file.replace(".wav", ".normalized.ogg")
+    assert os.path.getsize(normalized_path) == 100
+    with open(audio_file, "rb") as original:
+        assert original.read() == b"\x00" * 1000
+
+
+def test_normalize_flac(audio_file):
+    with patch("subprocess.run", side_effect=write_output(500)) as mock_run:
+        normalized_path = AudioUtils.normalize(audio_file, codec="flac")
+
+    assert normalized_path.endswith(".normalized.flac")
+    assert "flac" in mock_run.call_args.args[0]
+
+
+def test_normalize_disabled(audio_file):
+    with patch("subprocess.run") as mock_run:
+        assert AudioUtils.normalize(audio_file, codec="none") is None
+    mock_run.assert_not_called()
+
+
+def test_normalize_unsupported_codec(audio_file):
+    with pytest.raises(ValueError):
+        AudioUtils.normalize(audio_file, codec="aac")
+
+
+def test_normalize_without_ffmpeg(audio_file):
+    with patch("subprocess.run", side_effect=FileNotFoundError):
+        assert AudioUtils.normalize(audio_file, codec="opus") is None
+
+
+def test_normalize_failure_removes_output(audio_file):
+    def fail(command, **kwargs):
+        write_output(10)(command)
+        raise subprocess.CalledProcessError(1, command, stderr=b"Invalid data found when processing input")
+
+    with patch("subprocess.run", side_effect=fail):
+        assert AudioUtils.normalize(audio_file, codec="opus") is None
+    assert not os.path.exists(audio_file.replace(".wav", ".normalized.ogg"))
+
+
+def test_normalize_keeps_original_when_not_smaller(audio_file):
+    with patch("subprocess.run", side_effect=write_output(2000)):
+        assert AudioUtils.normalize(audio_file, codec="opus") is None
+    assert not os.path.exists(audio_file.replace(".wav", ".normalized.ogg"))
+
+
+def test_speech_segments_are_padded_and_merged():
+    silences = [(0.0, 2.0), (5.0, 5.3), (8.0, 12.0)]
+
+    assert AudioUtils.speech_segments(silences, 15.0, padding=0.25) == [(1.75, 8.25), (11.75, 15.0)]
+    assert AudioUtils.speech_segments([], 10.0, padding=0.25) == [(0.0, 10.0)]
+    assert AudioUtils.speech_segments([(0.0, 10.0)], 10.0, padding=0.25) == []
+
+
+def test_timestamp_map():
+    speech = TimestampMap([(1.75, 8.25), (11.75, 15.0)], 15.0)
+
+    assert speech.kept_seconds == 9.75
+    assert speech.to_original(0) == 1.75
+    assert speech.to_original(7.0) == 12.25
+    assert speech.to_original(100) == 15.0
+    assert speech.to_list()[1] == {"start": 6.5, "original_start": 11.75, "duration": 3.25}
+
+
+def test_detect_speech(audio_file):
+    stderr = (
+        b"Input #0, wav, from 'audio.wav':\n  Duration: 00:00:15.00, bitrate: 1536 kb/s\n"
+        b"[silencedetect @ 0x1] silence_start: 0\n[silencedetect @ 0x1] silence_end: 2 | silence_duration: 2\n"
+        b"[silencedetect @ 0x1] silence_start: 8\n"
+    )
+    with patch("subprocess.run", return_value=subprocess.CompletedProcess([], 0, b"", stderr)) as mock_run:
+        speech = AudioUtils.detect_speech(audio_file)
+
+    assert any(arg.startswith("silencedetect=") for arg in mock_run.call_args.args[0])
+    assert speech.duration == 15.0
+    assert speech.segments == [(1.75, 8.25)]
+
+
+def test_detect_speech_without_speech(audio_file):
+    stderr = b"  Duration: 00:00:10.00, bitrate: 1536 kb/s\nsilence_start: 0\nsilence_end: 10 | silence_duration: 10\n"
+    with patch("subprocess.run", return_value=subprocess.CompletedProcess([], 0, b"", stderr)):
+        assert AudioUtils.detect_speech(audio_file) is None
+
+
+def test_normalize_keeps_speech_segments(audio_file):
+    speech = TimestampMap([(1.75, 8.25), (11.75, 15.0)], 15.0)
+    with patch("subprocess.run", side_effect=write_output(100)) as mock_run:
+        AudioUtils.normalize(audio_file, codec="flac", speech=speech)
+
+    command = mock_run.call_args.args[0]
+    assert command[command.index("-af") + 1] == (
+        "aselect='between(t,1.750,8.250)+between(t,11.750,15.000)',asetpts=N/SR/TB"
+    )
+
+
+def test_normalize_keeps_trimmed_copy_when_not_smaller(audio_file):
+    speech = TimestampMap([(1.75, 8.25)], 15.0)
+    with patch("subprocess.run", side_effect=write_output(2000)):
+        assert AudioUtils.normalize(audio_file, codec="opus", speech=speech).endswith(".normalized.ogg")
+
+
+def test_normalize_trims_without_codec(audio_file):
+    speech = TimestampMap([(1.75, 8.25)], 15.0)
+    with patch("subprocess.run", side_effect=write_output(100)) as mock_run:
+        normalized_path = AudioUtils.normalize(audio_file, codec="none", speech=speech)
+
+    command = mock_run.call_args.args[0]
+    assert normalized_path.endswith(".normalized.wav")
+    assert command[command.index("-c:a") + 1] == "pcm_s16le"
+    assert "-af" in command
+
+
+def test_chunk_boundaries_prefer_cut_points():
+    cut_points = [100.0, 450.0, 590.0, 900.0, 1250.0]
+
+    assert AudioUtils.chunk_boundaries(1500.0, cut_points, 600, 2) == [(0.0, 590.0), (588.0, 900.0), (898.0, 1500.0)]
+    assert AudioUtils.chunk_boundaries(1300.0, [], 600, 2) == [(0.0, 600.0), (598.0, 1200.0), (1198.0, 1300.0)]
+    assert AudioUtils.chunk_boundaries(500.0, [], 600, 2) == [(0.0, 500.0)]
+
+
+def test_extract_chunk(audio_file):
+    normalized_path = audio_file.replace(".wav", ".normalized.ogg")
+    with patch("subprocess.run", side_effect=write_output(10)) as mock_run:
+        chunk_path = AudioUtils.extract_chunk(normalized_path, 588.0, 900.0, 1)
+
+    command = mock_run.call_args.args[0]
+    assert chunk_path == audio_file.replace(".wav", ".normalized.chunk1.ogg")
+    assert command[command.index("-ss") + 1] == "588.000"
+    assert command[command.index("-t") + 1] == "312.000"
+    assert "libopus" in command
+
+
+def test_duration(audio_file):
+    stderr = b"  Duration: 00:15:00.50, bitrate: 24 kb/s\n"
+    with patch("subprocess.run", return_value=subprocess.CompletedProcess([], 0, b"", stderr)):
+        assert AudioUtils.duration(audio_file) == 900.5
+    with patch("subprocess.run", side_effect=FileNotFoundError):
+        assert AudioUtils.duration(audio_file) is None
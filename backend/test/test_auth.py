@@ -6,6 +6,8 @@ from app.config.database import get_db
 from app.schemas.users import UserCreate
 from app.services.users import UsersService
 from app.models.users import Users
+from app.core.principal_cache import principal_cache
+from app.utils.passwords import password_hasher
 from app.services.auth import (
     JWT_SECRET_KEY,
     ALGORITHM,
@@ -15,6 +17,7 @@ from app.services.auth import (
     JWT_REFRESH_SECRET_KEY,
 )
 from jose import jwt
+from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from fastapi import HTTPException
 
@@ -44,6 +47,7 @@ def test_db():
     finally:
         db.query(Users).delete()
         db.commit()
+        principal_cache.clear()
         db.close()
 
 
@@ -65,6 +69,9 @@ def test_sign_up(test_db: Session):
     assert "access_token" in tokens
     assert "refresh_token" in tokens
 
+    response = client.post("/api/auth/signup", json=user_data)
+    assert response.status_code == 409
+
 
 @pytest.fixture
 def default_user(test_db: Session):
@@ -91,6 +98,19 @@ def test_login(test_db: Session, default_user):
     assert "refresh_token" in tokens
 
 
+def test_login_rehashes_passwords_with_another_cost(test_db: Session, default_user):
+    user = test_db.query(Users).filter(Users.user_name == default_user.user_name).first()
+    user.password = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=4).hash(default_user.password)
+    test_db.commit()
+
+    login_data = {"username": default_user.user_name, "password": default_user.password}
+    assert client.post("/api/auth/login", data=login_data).status_code == 200
+
+    test_db.refresh(user)
+    assert user.password.startswith(f"$2b${password_hasher.rounds:02d}$")
+    assert client.post("/api/auth/login", data=login_data).status_code == 200
+
+
 def test_login_invalid_credentials(test_db: Session, default_user):
     login_data = {"username": default_user.user_name, "password": "wrongpassword"}
     response = client.post("/api/auth/login", data=login_data)
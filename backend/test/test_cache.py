@@ -0,0 +1,98 @@
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+from app.core.cache import InMemoryCache, RedisCache, create_cache
+from app.core.emr_cache import EMRCache, parse_ttls
+
+
+def test_in_memory_cache_get_and_set():
+    cache = InMemoryCache()
+    cache.set("key", {"value": 1}, ttl=60)
+    assert cache.get("key") == {"value": 1}
+    assert cache.get("missing") is None
+
+
+def test_in_memory_cache_expiry():
+    cache = InMemoryCache()
+    cache.set("key", "value", ttl=0.05)
+    time.sleep(0.1)
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_in_memory_cache_evicts_least_recently_used_entry():
+    cache = InMemoryCache(max_entries=2)
+    cache.set("first", 1, ttl=60)
+    cache.set("second", 2, ttl=60)
+    cache.get("first")
+    cache.set("third", 3, ttl=60)
+    assert cache.get("second") is None
+    assert cache.get("first") == 1
+    assert cache.get("third") == 3
+    assert cache.evictions == 1
+
+
+def test_in_memory_cache_memory_bound():
+    cache = InMemoryCache(max_bytes=20)
+    cache.set("first", "x" * 10, ttl=60)
+    cache.set("second", "y" * 10, ttl=60)
+    assert cache.get("first") is None
+    assert cache.get("second") == "y" * 10
+    assert cache.size_bytes <= 20
+
+
+def test_in_memory_cache_delete_matching():
+    cache = InMemoryCache()
+    cache.set("emr:Patient/123", 1, ttl=60)
+    cache.set("emr:Condition?patient=123", 2, ttl=60)
+    cache.set("emr:Patient/456", 3, ttl=60)
+    cache.delete_matching("123")
+    assert len(cache) == 1
+    assert cache.get("emr:Patient/456") == 3
+
+
+def test_redis_cache_delete_matching_escapes_glob_characters():
+    cache = RedisCache.__new__(RedisCache)
+    cache.prefix = "bahmni[1]:"
+    cache.client = MagicMock()
+    cache.client.scan_iter.return_value = [b"bahmni[1]:emr:Patient/12*"]
+    cache.delete_matching("12*?[a-z]\\")
+    cache.client.scan_iter.assert_called_once_with(match="bahmni\\[1\\]:*12\\*\\?\\[a-z\\]\\\\*")
+    cache.client.delete.assert_called_once_with(b"bahmni[1]:emr:Patient/12*")
+
+
+def test_create_cache():
+    assert isinstance(create_cache("memory", "", None, 10, 100), InMemoryCache)
+    assert create_cache("none", "", None, 10, 100) is None
+    with pytest.raises(ValueError):
+        create_cache("redis", "", None, 10, 100)
+    with pytest.raises(ValueError):
+        create_cache("memcached", "", None, 10, 100)
+
+
+def test_parse_ttls():
+    assert parse_ttls("Patient=300, Observation=60") == {"Patient": 300.0, "Observation": 60.0}
+
+
+def test_emr_cache_ttl_per_resource_type():
+    cache = EMRCache(InMemoryCache(), ttls={"Patient": 300, "Observation": 0}, default_ttl=60)
+    cache.store("Patient/123", {"id": "123"}, etag='W/"1"')
+    cache.store("Observation?subject:Patient=123", {"entry": []})
+    assert cache.is_fresh(cache.lookup("Patient/123"))
+    assert cache.lookup("Observation?subject:Patient=123") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "revalidations": 0}
+
+
+def test_emr_cache_revalidates_stale_entry():
+    cache = EMRCache(InMemoryCache(), ttls={"Patient": 300}, stale_ttl=600)
+    with patch("app.core.emr_cache.time.time", return_value=time.time() - 400):
+        cache.store("Patient/123", {"id": "123"}, etag='W/"1"')
+
+    entry = cache.lookup("Patient/123")
+    assert not cache.is_fresh(entry)
+    assert cache.conditional_headers(entry) == {"If-None-Match": 'W/"1"'}
+
+    data = cache.resolve("Patient/123", entry, MagicMock(status_code=304))
+    assert data == {"id": "123"}
+    assert cache.is_fresh(cache.lookup("Patient/123"))
+    assert cache.stats() == {"hits": 1, "misses": 1, "revalidations": 1}
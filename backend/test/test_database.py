@@ -0,0 +1,108 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.config.database import (
+    MeteredAsyncQueuePool,
+    MeteredQueuePool,
+    PoolMetrics,
+    async_database_url,
+    async_pool_metrics,
+    engine_options,
+    pool_metrics,
+    pool_sizing,
+)
+
+
+def test_engine_options():
+    assert engine_options("sqlite://") == {}
+    assert engine_options("sqlite:///:memory:") == {}
+
+    options = engine_options("postgresql+psycopg2://user:password@db/bahmni")
+    assert options["poolclass"] is MeteredQueuePool
+    assert options["pool_pre_ping"] is True
+    assert {"pool_size", "max_overflow", "pool_timeout", "pool_recycle"} <= set(options)
+    assert "connect_args" not in options
+
+    with patch("app.config.database.DB_STATEMENT_TIMEOUT_MS", 5000):
+        assert engine_options("postgresql://db/bahmni")["connect_args"] == {"options": "-c statement_timeout=5000"}
+        assert engine_options("mysql+pymysql://db/bahmni")["connect_args"] == {
+            "init_command": "SET SESSION max_execution_time=5000"
+        }
+
+
+def test_async_engine_options_and_url():
+    assert engine_options("postgresql+psycopg://db/bahmni", asynchronous=True)["poolclass"] is MeteredAsyncQueuePool
+    assert (
+        async_database_url("postgresql://user:secret@db:5432/bahmni")
+        == "postgresql+psycopg://user:secret@db:5432/bahmni"
+    )
+    assert async_database_url("postgresql+psycopg2://db/bahmni") == "postgresql+psycopg://db/bahmni"
+    assert async_database_url("sqlite:///./bahmni.db") == "sqlite+aiosqlite:///./bahmni.db"
+    with pytest.raises(ValueError):
+        async_database_url("mysql+pymysql://db/bahmni")
+
+
+def test_pool_sizing():
+    assert pool_sizing(workers=4, max_connections=100, pool_size=5, max_overflow=10, pools=1) == {
+        "workers": 4,
+        "pools": 1,
+        "max_connections": 100,
+        "peak_connections": 60,
+        "fits": True,
+        "suggested_pool_size": 16,
+        "suggested_max_overflow": 9,
+    }
+    sizing = pool_sizing(workers=4, max_connections=100, pool_size=5, max_overflow=10)
+    assert (sizing["pools"], sizing["peak_connections"], sizing["fits"]) == (2, 120, False)
+    assert (sizing["suggested_pool_size"], sizing["suggested_max_overflow"]) == (8, 4)
+    sizing = pool_sizing(workers=8, max_connections=100, pool_size=10, max_overflow=10)
+    assert not sizing["fits"]
+    assert 8 * 2 * (sizing["suggested_pool_size"] + sizing["suggested_max_overflow"]) <= 100
+
+
+def test_pool_metrics(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=MeteredQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.1
+    )
+    metrics = PoolMetrics()
+    metrics.attach(engine)
+    timeouts = pool_metrics.timeouts
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+        assert metrics.stats()["checked_out"] == 1
+
+    stats = metrics.stats()
+    assert (stats["checkouts"], stats["checkins"], stats["connects"]) == (1, 1, 1)
+    assert stats["checked_out"] == 0 and stats["size"] == 1
+    assert pool_metrics.timeouts == timeouts + 1
+    assert pool_metrics.max_wait_seconds >= 0.1
+    engine.dispose()
+
+
+def test_async_pool_metrics(tmp_path):
+    async def run():
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+            poolclass=MeteredAsyncQueuePool,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=0.1,
+        )
+        try:
+            async with engine.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+                with pytest.raises(PoolTimeoutError):
+                    await engine.connect().start()
+        finally:
+            await engine.dispose()
+
+    timeouts = async_pool_metrics.timeouts
+    asyncio.run(run())
+    assert async_pool_metrics.timeouts == timeouts + 1
+    assert async_pool_metrics.max_wait_seconds >= 0.1
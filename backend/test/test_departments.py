@@ -10,6 +10,7 @@ from app.config.database import get_db
 from typing import List
 from app.services.auth import create_access_token
 from app.models.users import Users
+from app.core.principal_cache import principal_cache
 
 
 def override_get_db():
@@ -41,6 +42,7 @@ def test_db():
         db.query(Departments).delete()
         db.query(Users).delete()
         db.commit()
+        principal_cache.clear()
         db.close()
 
 
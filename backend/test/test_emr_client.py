@@ -1,15 +1,51 @@
+import asyncio
+from collections import Counter
+import httpx
 import pytest
 from fastapi import HTTPException
-from app.core.emr_client import EMRClient
-import requests
+from app.core.cache import InMemoryCache
+from app.core.emr_cache import EMRCache
+from app.core.emr_client import AsyncEMRClient
 
+BASE_URL = AsyncEMRClient().base_url
 
-@pytest.fixture
-def emr_client():
-    return EMRClient()
 
+def run_async_client(handler, call, cache=None):
+    async def run():
+        client = AsyncEMRClient(transport=httpx.MockTransport(handler), cache=cache)
+        try:
+            return await call(client)
+        finally:
+            await client.aclose()
 
-def test_get_patient_data_success(requests_mock, emr_client):
+    return asyncio.run(run())
+
+
+def serve(responses):
+    """
+    A handler answering the requests whose path and query include those of a key with its value: a JSON body, a
+    status code, or a callable building the response. The requests of every key are counted.
+    """
+    calls = Counter()
+
+    def handler(request):
+        for url, response in responses.items():
+            expected = httpx.URL(url)
+            if expected.path == request.url.path and all(
+                request.url.params.get(name) == value for name, value in expected.params.items()
+            ):
+                calls[url] += 1
+                if callable(response):
+                    return response(request)
+                if isinstance(response, int):
+                    return httpx.Response(response, text="Resource not found")
+                return httpx.Response(200, json=response)
+        return httpx.Response(404, text="Resource not found")
+
+    return handler, calls
+
+
+def test_get_patient_data_success():
     patient_id = "123"
     mock_response = {
         "id": patient_id,
@@ -21,177 +57,256 @@ def test_get_patient_data_success(requests_mock, emr_client):
         "deceasedBoolean": False,
         "address": [],
     }
-    requests_mock.get(f"{emr_client.base_url}/Patient/{patient_id}", json=mock_response)
 
-    patient = emr_client.get_patient_data(patient_id)
+    def handler(request):
+        assert request.headers["Authorization"].startswith("Basic ")
+        return httpx.Response(200, json=mock_response)
+
+    handler, _ = serve({f"{BASE_URL}/Patient/{patient_id}": handler})
+    patient = run_async_client(handler, lambda client: client.get_patient_data(patient_id))
     assert patient.patient_id == patient_id
     assert patient.name.given == ["John"]
     assert patient.name.family == "Doe"
 
 
-def test_get_patient_data_not_found(requests_mock, emr_client):
-    patient_id = "123"
-    requests_mock.get(f"{emr_client.base_url}/Patient/{patient_id}", status_code=404, text="Resource not found")
+@pytest.mark.parametrize(
+    "method, endpoint",
+    [
+        ("get_patient_data", "Patient/123"),
+        ("get_observations", "Observation?subject:Patient=123"),
+        ("get_conditions", "Condition?patient=123"),
+        ("get_allergy_details", "AllergyIntolerance?patient=123"),
+    ],
+)
+def test_get_resource_not_found(method, endpoint):
+    handler, calls = serve({f"{BASE_URL}/{endpoint}": 404})
 
     with pytest.raises(HTTPException) as exc_info:
-        emr_client.get_patient_data(patient_id)
+        run_async_client(handler, lambda client: getattr(client, method)("123"))
     assert exc_info.value.status_code == 404
     assert "Resource not found" in exc_info.value.detail
+    assert calls[f"{BASE_URL}/{endpoint}"] == 1
+
+
+@pytest.mark.parametrize(
+    "method, endpoint, ids",
+    [
+        ("get_observations", "Observation?subject:Patient=123", ["obs1", "obs2"]),
+        ("get_conditions", "Condition?patient=123", ["cond1", "cond2"]),
+        ("get_allergy_details", "AllergyIntolerance?patient=123", ["allergy1", "allergy2"]),
+    ],
+)
+def test_get_resources_success(method, endpoint, ids):
+    bundle = {"entry": [{"resource": {"id": id, "code": {"text": id}}} for id in ids]}
+    handler, _ = serve({f"{BASE_URL}/{endpoint}": bundle})
+
+    resources = run_async_client(handler, lambda client: getattr(client, method)("123"))
+    assert [resource.id for resource in resources] == ids
+
+
+@pytest.mark.parametrize(
+    "method, endpoint, detail",
+    [
+        ("get_patient_data", "Patient/123", "Patient with ID 123 not found"),
+        ("get_observations", "Observation?subject:Patient=123", "Observations for patient with ID 123 not found"),
+        ("get_conditions", "Condition?patient=123", "Conditions for patient with ID 123 not found"),
+        ("get_allergy_details", "AllergyIntolerance?patient=123", "Allergy details for patient with ID 123 not found"),
+    ],
+)
+def test_get_resource_empty_response(method, endpoint, detail):
+    handler, _ = serve({f"{BASE_URL}/{endpoint}": {}})
 
+    with pytest.raises(HTTPException) as exc_info:
+        run_async_client(handler, lambda client: getattr(client, method)("123"))
+    assert exc_info.value.status_code == 404
+    assert detail in exc_info.value.detail
 
-def test_get_observations_success(requests_mock, emr_client):
-    patient_id = "123"
-    mock_response = {
-        "entry": [
-            {"resource": {"id": "obs1", "status": "final", "code": {"text": "Blood Pressure"}}},
-            {"resource": {"id": "obs2", "status": "final", "code": {"text": "Heart Rate"}}},
-        ]
-    }
-    requests_mock.get(f"{emr_client.base_url}/Observation?subject:Patient={patient_id}", json=mock_response)
 
-    observations = emr_client.get_observations(patient_id)
-    assert len(observations) == 2
-    assert observations[0].id == "obs1"
-    assert observations[1].id == "obs2"
+def test_fetch_http_error():
+    def handler(request):
+        return httpx.Response(500, text="Server Error")
 
+    with pytest.raises(HTTPException) as exc_info:
+        run_async_client(handler, lambda client: client._fetch("Patient/123"))
+    assert exc_info.value.status_code == 500
+    assert "HTTP error occurred" in exc_info.value.detail
 
-def test_get_observations_not_found(requests_mock, emr_client):
-    patient_id = "123"
-    requests_mock.get(
-        f"{emr_client.base_url}/Observation?subject:Patient={patient_id}", status_code=404, text="Resource not found"
-    )
+
+def test_fetch_authentication_error():
+    def handler(request):
+        return httpx.Response(401)
 
     with pytest.raises(HTTPException) as exc_info:
-        emr_client.get_observations(patient_id)
-    assert exc_info.value.status_code == 404
-    assert "Resource not found" in exc_info.value.detail
+        run_async_client(handler, lambda client: client._fetch("Patient/123"))
+    assert exc_info.value.status_code == 401
 
 
-def test_get_conditions_success(requests_mock, emr_client):
-    patient_id = "123"
-    mock_response = {
-        "entry": [
-            {"resource": {"id": "cond1", "code": {"text": "Diabetes"}}},
-            {"resource": {"id": "cond2", "code": {"text": "Hypertension"}}},
-        ]
-    }
-    requests_mock.get(f"{emr_client.base_url}/Condition?patient={patient_id}", json=mock_response)
+def test_fetch_timeout():
+    def handler(request):
+        raise httpx.ReadTimeout("Read timed out", request=request)
 
-    conditions = emr_client.get_conditions(patient_id)
-    assert len(conditions) == 2
-    assert conditions[0].id == "cond1"
-    assert conditions[1].id == "cond2"
+    with pytest.raises(HTTPException) as exc_info:
+        run_async_client(handler, lambda client: client._fetch("Patient/123"))
+    assert exc_info.value.status_code == 504
 
 
-def test_get_conditions_not_found(requests_mock, emr_client):
-    patient_id = "123"
-    requests_mock.get(
-        f"{emr_client.base_url}/Condition?patient={patient_id}", status_code=404, text="Resource not found"
-    )
+def test_fetch_request_error():
+    def handler(request):
+        raise httpx.ConnectError("Connection refused", request=request)
 
     with pytest.raises(HTTPException) as exc_info:
-        emr_client.get_conditions(patient_id)
-    assert exc_info.value.status_code == 404
-    assert "Resource not found" in exc_info.value.detail
+        run_async_client(handler, lambda client: client._fetch("Patient/123"))
+    assert exc_info.value.status_code == 500
+    assert "Error occurred while fetching data: Connection refused" in exc_info.value.detail
+
+
+def test_iter_observations_follows_next_links():
+    next_url = f"{BASE_URL}/Observation?subject:Patient=123&_count=2&_page=2"
+    handler, calls = serve(
+        {
+            next_url: {"link": [], "entry": [{"resource": {"id": "obs3", "code": {"text": "Heart Rate"}}}]},
+            f"{BASE_URL}/Observation?subject:Patient=123&_count=2&_sort=-date": {
+                "link": [{"relation": "self", "url": "ignored"}, {"relation": "next", "url": next_url}],
+                "entry": [
+                    {"resource": {"id": "obs1", "code": {"text": "Heart Rate"}}},
+                    {"resource": {"id": "obs2", "code": {"text": "Heart Rate"}}},
+                ],
+            },
+        }
+    )
 
+    async def collect(client):
+        return [observation.id async for observation in client.iter_observations("123", count=2, sort="-date")]
 
-def test_get_allergy_details_success(requests_mock, emr_client):
-    patient_id = "123"
-    mock_response = {
-        "entry": [
-            {"resource": {"id": "allergy1", "code": {"text": "Peanut"}}},
-            {"resource": {"id": "allergy2", "code": {"text": "Shellfish"}}},
-        ]
-    }
-    requests_mock.get(f"{emr_client.base_url}/AllergyIntolerance?patient={patient_id}", json=mock_response)
+    assert run_async_client(handler, collect) == ["obs1", "obs2", "obs3"]
+    assert list(calls.values()) == [1, 1]
 
-    allergies = emr_client.get_allergy_details(patient_id)
-    assert len(allergies) == 2
-    assert allergies[0].id == "allergy1"
-    assert allergies[1].id == "allergy2"
 
-
-def test_get_allergy_details_not_found(requests_mock, emr_client):
-    patient_id = "123"
-    requests_mock.get(
-        f"{emr_client.base_url}/AllergyIntolerance?patient={patient_id}", status_code=404, text="Resource not found"
+def test_iter_observations_stops_early():
+    next_url = f"{BASE_URL}/Observation?subject:Patient=123&_page=2"
+    handler, calls = serve(
+        {
+            next_url: {"entry": []},
+            f"{BASE_URL}/Observation?subject:Patient=123&_lastUpdated=gt2024-01-01": {
+                "link": [{"relation": "next", "url": next_url}],
+                "entry": [{"resource": {"id": "obs1", "code": {"text": "Heart Rate"}}}],
+            },
+        }
     )
 
-    with pytest.raises(HTTPException) as exc_info:
-        emr_client.get_allergy_details(patient_id)
-    assert exc_info.value.status_code == 404
-    assert "Resource not found" in exc_info.value.detail
+    async def first(client):
+        observations = client.iter_observations("123", last_updated="gt2024-01-01")
+        try:
+            return (await observations.__anext__()).id
+        finally:
+            await observations.aclose()
 
+    assert run_async_client(handler, first) == "obs1"
+    assert calls[next_url] == 0
 
-def test_fetch_http_error(requests_mock, emr_client):
-    endpoint = "Patient/123"
-    requests_mock.get(
-        f"{emr_client.base_url}/{endpoint}", status_code=500, text="HTTP error occurred: 500 Server Error"
-    )
 
-    with pytest.raises(HTTPException) as exc_info:
-        emr_client._fetch(endpoint)
-    assert exc_info.value.status_code == 500
-    assert "HTTP error occurred: 500 Server Error" in exc_info.value.detail
+def test_iter_observations_empty_bundle():
+    handler, _ = serve({f"{BASE_URL}/Observation?subject:Patient=123": {}})
 
+    async def collect(client):
+        return [observation async for observation in client.iter_observations("123")]
 
-def test_fetch_authentication_error(requests_mock, emr_client):
-    endpoint = "Patient/123"
-    requests_mock.get(
-        f"{emr_client.base_url}/{endpoint}", status_code=401, text="Failed to authenticate with EMR service"
-    )
+    assert run_async_client(handler, collect) == []
 
-    with pytest.raises(HTTPException) as exc_info:
-        emr_client._fetch(endpoint)
-    assert exc_info.value.status_code == 401
-    assert "Failed to authenticate with EMR service" in exc_info.value.detail
 
+def test_iter_observations_follows_absolute_next_links():
+    def handler(request):
+        if "_page=2" in str(request.url):
+            return httpx.Response(200, json={"entry": [{"resource": {"id": "obs2", "code": {"text": "Pulse"}}}]})
+        return httpx.Response(
+            200,
+            json={
+                "link": [{"relation": "next", "url": f"{request.url}&_page=2"}],
+                "entry": [{"resource": {"id": "obs1", "code": {"text": "Pulse"}}}],
+            },
+        )
 
-def test_fetch_request_exception(requests_mock, emr_client):
-    endpoint = "Patient/123"
-    requests_mock.get(f"{emr_client.base_url}/{endpoint}", exc=requests.exceptions.RequestException("Request failed"))
+    async def collect(client):
+        return [observation.id async for observation in client.iter_observations("123", count=1)]
 
-    with pytest.raises(HTTPException) as exc_info:
-        emr_client._fetch(endpoint)
-    assert exc_info.value.status_code == 500
-    assert "Error occurred while fetching data: Request failed" in exc_info.value.detail
+    assert run_async_client(handler, collect) == ["obs1", "obs2"]
 
 
-def test_get_patient_data_not_found_exception(requests_mock, emr_client):
-    patient_id = "123"
-    requests_mock.get(f"{emr_client.base_url}/Patient/{patient_id}", json={})
+def test_get_observations_stops_at_the_limit_and_is_cached(monkeypatch):
+    monkeypatch.setattr("app.core.emr_client.EMR_OBSERVATION_LIMIT", 3)
+    monkeypatch.setattr("app.core.emr_client.EMR_OBSERVATION_PAGE_SIZE", 2)
 
-    with pytest.raises(HTTPException) as exc_info:
-        emr_client.get_patient_data(patient_id)
-    assert exc_info.value.status_code == 404
-    assert f"Patient with ID {patient_id} not found" in exc_info.value.detail
+    def page(number, ids):
+        next_url = f"{BASE_URL}/Observation?subject:Patient=123&_page={number + 1}"
+        entry = [{"resource": {"id": id, "code": {"text": "Pulse"}}} for id in ids]
+        return {"link": [{"relation": "next", "url": next_url}], "entry": entry}
 
+    first_page = f"{BASE_URL}/Observation?subject:Patient=123&_count=2&_sort=-date"
+    third_page = f"{BASE_URL}/Observation?subject:Patient=123&_page=3"
+    handler, calls = serve(
+        {
+            f"{BASE_URL}/Observation?subject:Patient=123&_page=2": page(2, ["o3", "o4"]),
+            third_page: {},
+            first_page: page(1, ["o1", "o2"]),
+        }
+    )
+    cache = EMRCache(InMemoryCache())
 
-def test_get_observations_not_found_exception(requests_mock, emr_client):
-    patient_id = "123"
-    requests_mock.get(f"{emr_client.base_url}/Observation?subject:Patient={patient_id}", json={})
+    async def get_twice(client):
+        return [[observation.id for observation in await client.get_observations("123")] for _ in range(2)]
 
-    with pytest.raises(HTTPException) as exc_info:
-        emr_client.get_observations(patient_id)
-    assert exc_info.value.status_code == 404
-    assert f"Observations for patient with ID {patient_id} not found" in exc_info.value.detail
+    assert run_async_client(handler, get_twice, cache=cache) == [["o1", "o2", "o3"]] * 2
+    assert calls[third_page] == 0
+    assert calls[first_page] == 1
+    assert cache.stats()["hits"] == 1
 
 
-def test_get_conditions_not_found_exception(requests_mock, emr_client):
-    patient_id = "123"
-    requests_mock.get(f"{emr_client.base_url}/Condition?patient={patient_id}", json={})
+def test_get_observations_requests_one_page_of_the_limit(monkeypatch):
+    monkeypatch.setattr("app.core.emr_client.EMR_OBSERVATION_LIMIT", 1)
+    requested = []
 
-    with pytest.raises(HTTPException) as exc_info:
-        emr_client.get_conditions(patient_id)
-    assert exc_info.value.status_code == 404
-    assert f"Conditions for patient with ID {patient_id} not found" in exc_info.value.detail
+    def handler(request):
+        requested.append(str(request.url))
+        return httpx.Response(
+            200,
+            json={
+                "link": [{"relation": "next", "url": f"{request.url}&_page=2"}],
+                "entry": [{"resource": {"id": "obs1", "code": {"text": "Pulse"}}}],
+            },
+        )
 
+    observations = run_async_client(handler, lambda client: client.get_observations("123"))
+    assert [observation.id for observation in observations] == ["obs1"]
+    assert len(requested) == 1
+    assert "_count=1" in requested[0] and "_sort=-date" in requested[0]
 
-def test_get_allergy_details_not_found_exception(requests_mock, emr_client):
-    patient_id = "123"
-    requests_mock.get(f"{emr_client.base_url}/AllergyIntolerance?patient={patient_id}", json={})
 
-    with pytest.raises(HTTPException) as exc_info:
-        emr_client.get_allergy_details(patient_id)
-    assert exc_info.value.status_code == 404
-    assert f"Allergy details for patient with ID {patient_id} not found" in exc_info.value.detail
+def test_fetch_serves_repeated_requests_from_cache():
+    handler, calls = serve({f"{BASE_URL}/Condition?patient=123": {"entry": []}})
+    cache = EMRCache(InMemoryCache())
+
+    async def fetch_twice(client):
+        await client._fetch("Condition?patient=123")
+        await client._fetch("Condition?patient=123")
+
+    run_async_client(handler, fetch_twice, cache=cache)
+    assert calls[f"{BASE_URL}/Condition?patient=123"] == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_fetch_revalidates_with_etag():
+    def handler(request):
+        if request.headers.get("If-None-Match") == 'W/"1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"id": "123"}, headers={"ETag": 'W/"1"'})
+
+    cache = EMRCache(InMemoryCache(), ttls={"Patient": 0.01})
+
+    async def fetch_twice(client):
+        first = await client._fetch("Patient/123")
+        await asyncio.sleep(0.02)
+        return first, await client._fetch("Patient/123")
+
+    first, second = run_async_client(handler, fetch_twice, cache=cache)
+    assert first == second == {"id": "123"}
+    assert cache.stats()["revalidations"] == 1
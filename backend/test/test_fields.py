@@ -1,16 +1,20 @@
 import pytest
+from sqlalchemy import event
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 from app.main import app
-from app.config.database import get_db
-from app.schemas.forms import FormCreate
-from app.schemas.fields import FieldCreate
+from app.core.form_schema_cache import form_schema_cache
+from app.config.database import get_db, db_engine
+from app.schemas.forms import FormCreate, FormUpdate
+from app.schemas.fields import FieldCreate, FieldUpdate
 from app.models.fields import Fields
 from app.models.forms import Forms
 from app.services.fields import FieldsService
 from app.services.forms import FormsService
 from app.models.users import Users
 from app.services.auth import create_access_token
+from app.core.principal_cache import principal_cache
+from fastapi import HTTPException
 
 client = TestClient(app)
 
@@ -40,6 +44,8 @@ def test_db():
         db.query(Forms).delete()
         db.query(Users).delete()
         db.commit()
+        principal_cache.clear()
+        form_schema_cache.clear()
         db.close()
 
 
@@ -133,3 +139,93 @@ def test_delete_field_not_found(test_db: Session, auth_headers, create_form):
     response = client.delete("/api/fields/999", headers=auth_headers)
     assert response.status_code == 404
     assert response.json()["detail"] == "Field with id 999 not found"
+
+
+@pytest.fixture
+def count_queries():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db_engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(db_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_get_fields_by_form_id_is_cached(test_db: Session, create_form, count_queries):
+    FieldsService.create_field(test_db, FieldCreate(name="Pulse", form_id=create_form.id))
+    count_queries.clear()
+
+    assert [field.name for field in FieldsService.get_fields_by_form_id(test_db, create_form.id)] == ["Pulse"]
+    assert len(count_queries) == 1
+    count_queries.clear()
+
+    schema = FieldsService.get_form_schema(test_db, create_form.id)
+    assert [field.name for field in FieldsService.get_fields_by_form_id(test_db, create_form.id)] == ["Pulse"]
+    assert [field.name for field in schema.fields] == ["Pulse"]
+    assert count_queries == []
+
+
+def test_form_schema_cache_is_invalidated(test_db: Session, create_form):
+    field = FieldsService.create_field(test_db, FieldCreate(name="Pulse", form_id=create_form.id))
+    assert len(FieldsService.get_fields_by_form_id(test_db, create_form.id)) == 1
+
+    FieldsService.create_field(test_db, FieldCreate(name="Weight", form_id=create_form.id))
+    assert len(FieldsService.get_fields_by_form_id(test_db, create_form.id)) == 2
+
+    FieldsService.update_field(test_db, field.id, FieldUpdate(name="Heart rate"))
+    assert FieldsService.get_fields_by_form_id(test_db, create_form.id)[0].name == "Heart rate"
+
+    FieldsService.delete_field(test_db, field.id)
+    assert [field.name for field in FieldsService.get_fields_by_form_id(test_db, create_form.id)] == ["Weight"]
+
+    FormsService.update_form(test_db, create_form.id, FormUpdate(name="Vitals"))
+    assert create_form.id not in form_schema_cache._entries
+
+    FieldsService.get_fields_by_form_id(test_db, create_form.id)
+    FormsService.delete_form(test_db, create_form.id)
+    with pytest.raises(HTTPException) as exc_info:
+        FieldsService.get_fields_by_form_id(test_db, create_form.id)
+    assert exc_info.value.status_code == 404
+
+
+def test_get_all_fields_paginated(test_db: Session, auth_headers, create_form):
+    other_form = FormsService.create_form(test_db, FormCreate(name="Other Form"))
+    created = [
+        FieldsService.create_field(
+            test_db, FieldCreate(name=f"Field {index}", field_type="number" if index % 2 else "string", form_id=form_id)
+        )
+        for index, form_id in enumerate([create_form.id] * 5 + [other_form.id])
+    ]
+
+    response = client.get(f"/api/fields/?form_id={create_form.id}&limit=2", headers=auth_headers)
+    assert response.status_code == 200
+    assert [field["name"] for field in response.json()] == ["Field 0", "Field 1"]
+    assert response.headers["X-Next-Cursor"] == str(created[1].id)
+
+    names = []
+    cursor = None
+    while True:
+        after = f"&after_id={cursor}" if cursor else ""
+        response = client.get(f"/api/fields/?form_id={create_form.id}&limit=2{after}", headers=auth_headers)
+        names += [field["name"] for field in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert names == [f"Field {index}" for index in range(5)]
+
+    response = client.get("/api/fields/?field_type=number&fields=name,form_id", headers=auth_headers)
+    assert response.json() == [
+        {"id": created[index].id, "name": f"Field {index}", "form_id": create_form.id} for index in (1, 3)
+    ] + [{"id": created[5].id, "name": "Field 5", "form_id": other_form.id}]
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_get_all_fields_invalid_projection(test_db: Session, auth_headers):
+    response = client.get("/api/fields/?fields=name,secret", headers=auth_headers)
+    assert response.status_code == 400
+    assert "secret" in response.json()["detail"]
+
+    response = client.get("/api/fields/?limit=0", headers=auth_headers)
+    assert response.status_code == 422
@@ -0,0 +1,129 @@
+from datetime import date, timedelta
+from app.schemas.fields import Field
+from app.utils.form_extractor import ExtractionStats, FormExtractor
+
+
+def field(name, field_type="string", **kwargs):
+    return Field(id=1, form_id=1, name=name, field_type=field_type, **kwargs)
+
+
+TRANSCRIPT = (
+    "Patient has a temperature of 101.3 F, pulse 88 bpm, BP 130 over 85. She weighs 154 pounds. "
+    "Smoking status: former smoker. No cough. Sats 97%. Follow up on 12th March 2025. Complains of headache."
+)
+
+
+def test_extract_numeric_fields_with_units_and_ranges():
+    fields = [
+        field("Temperature (C)", "number", minimum=30, maximum=45),
+        field("Pulse", "integer", minimum=20, maximum=250),
+        field("Systolic Blood Pressure", "number", minimum=50, maximum=250),
+        field("Diastolic Blood Pressure", "number", minimum=30, maximum=150),
+        field("Weight", "number", description="Weight in kg", minimum=1, maximum=300),
+        field("SpO2", "number", minimum=50, maximum=100),
+    ]
+
+    extraction = FormExtractor.extract(TRANSCRIPT, fields)
+
+    assert extraction.values == {
+        "Temperature (C)": 38.5,
+        "Pulse": 88,
+        "Systolic Blood Pressure": 130,
+        "Diastolic Blood Pressure": 85,
+        "Weight": 69.85,
+        "SpO2": 97,
+    }
+    assert extraction.unresolved == []
+    assert set(extraction.provenance.values()) == {"local"}
+
+
+def test_extract_leaves_unitless_values_out_of_range_unresolved():
+    temperature = field("Temperature", "number", description="Body temperature (°C)", minimum=30, maximum=45)
+
+    assert FormExtractor.extract_field("temp is 98.6 today", temperature) is None
+    assert FormExtractor.extract_field("temp is 98.6 F today", temperature) == 37.0
+    assert FormExtractor.extract_field("temperature 37.2", temperature) == 37.2
+    assert FormExtractor.extract_field("temperature 250", temperature) is None
+
+
+def test_extract_leaves_durations_split_and_unbounded_numbers_unresolved():
+    pulse = field("Pulse", "integer", minimum=20, maximum=250)
+    saturation = field("Oxygen saturation", "number", minimum=50, maximum=100)
+
+    assert FormExtractor.extract_field("temperature was taken 2 hours ago", field("Temperature", "number")) is None
+    assert FormExtractor.extract_field("temperature 37.2", field("Temperature", "number")) is None
+    assert FormExtractor.extract_field("temperature 37.2 C", field("Temperature", "number")) == 37.2
+    assert FormExtractor.extract_field("hr 5 minutes later pulse 80", pulse) == 80
+    assert FormExtractor.extract_field("pulse 60 times a minute", pulse) is None
+    assert FormExtractor.extract_field("oxygen saturation 9 8 percent", saturation) is None
+    assert FormExtractor.extract_field("pulse is 80 and regular", pulse) == 80
+
+
+def test_extract_abbreviations_only_before_numbers():
+    pulse = field("Pulse", "integer", minimum=20, maximum=250)
+
+    assert FormExtractor.extract_field("HR 88, regular", pulse) == 88
+    assert FormExtractor.extract_field("hr: 72", pulse) == 72
+    assert FormExtractor.extract_field("fever for 1 hr, 2 doses given", pulse) is None
+    assert FormExtractor.extract_field("took it every hr for 36 hours", pulse) is None
+
+
+def test_extract_leaves_ambiguous_fields_unresolved():
+    fields = [
+        field("Pulse", "integer", minimum=20, maximum=250),
+        field("Chief complaint"),
+        field("Respiratory rate", "number", minimum=5, maximum=60),
+    ]
+
+    extraction = FormExtractor.extract("Pulse is 300. Complains of headache.", fields)
+
+    assert extraction.values == {}
+    assert extraction.unresolved == ["Pulse", "Chief complaint", "Respiratory rate"]
+
+
+def test_extract_enum_boolean_and_date_fields():
+    fields = [
+        field("Smoking status", "enum", enum_options="Current smoker, Former smoker, Never smoked"),
+        field("Cough", "boolean"),
+        field("Fever", "boolean"),
+        field("Follow up date", "date"),
+        field("Admission date", "date"),
+    ]
+    transcript = TRANSCRIPT + " Fever: yes. Admission date 2025-01-31."
+
+    extraction = FormExtractor.extract(transcript, fields)
+
+    assert extraction.values == {
+        "Smoking status": "Former smoker",
+        "Cough": False,
+        "Fever": True,
+        "Follow up date": "2025-03-12",
+        "Admission date": "2025-01-31",
+    }
+
+
+def test_extract_skips_negated_enum_options():
+    severity = field("Severity", "enum", enum_options="mild, moderate, severe")
+
+    assert FormExtractor.extract_field("Severity not severe, mild", severity) is None
+    assert FormExtractor.extract_field("Severity is mild and not severe", severity) == "mild"
+    assert FormExtractor.extract_field("Severity moderate", severity) == "moderate"
+
+
+def test_extract_dates():
+    follow_up = field("Follow up", "date")
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+
+    assert FormExtractor.extract_field("follow up on 03/04/2025", follow_up) == "2025-04-03"
+    assert FormExtractor.extract_field("follow up March 4, 2025", follow_up) == "2025-03-04"
+    assert FormExtractor.extract_field("follow up was yesterday", follow_up) == yesterday
+    assert FormExtractor.extract_field("follow up on 31/02/2025", follow_up) is None
+
+
+def test_extraction_stats():
+    stats = ExtractionStats()
+
+    stats.record({"Pulse": "local", "Notes": "llm"}, llm_calls=2, llm_calls_avoided=0)
+    stats.record({"Pulse": "local"}, llm_calls=1, llm_calls_avoided=1)
+
+    assert stats.stats() == {"fields": {"local": 2, "llm": 1}, "llm_calls": 3, "llm_calls_avoided": 1}
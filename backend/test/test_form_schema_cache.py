@@ -0,0 +1,49 @@
+from app.core.form_schema_cache import FormSchema, FormSchemaCache
+from app.schemas.fields import Field
+
+
+def schema(form_id, *names):
+    return FormSchema(form_id, [Field(id=index, name=name, form_id=form_id) for index, name in enumerate(names)])
+
+
+def test_get_loads_once():
+    cache = FormSchemaCache(ttl=60)
+    loads = []
+
+    def load():
+        loads.append(1)
+        return schema(1, "Pulse")
+
+    assert [field.name for field in cache.get(1, load).fields] == ["Pulse"]
+    assert cache.get(1, load) is cache.get(1, load)
+    assert len(loads) == 1
+    assert cache.stats() == {"hits": 2, "misses": 1, "entries": 1}
+
+
+def test_invalidation_during_load_is_not_overwritten():
+    cache = FormSchemaCache(ttl=60)
+
+    def stale_load():
+        cache.invalidate(1)
+        return schema(1, "Pulse")
+
+    cache.get(1, stale_load)
+    assert cache.get(1, lambda: schema(1, "Heart rate")).fields[0].name == "Heart rate"
+
+    def load_during_clear():
+        cache.clear()
+        return schema(2, "Weight")
+
+    cache.get(2, load_during_clear)
+    assert cache.stats()["entries"] == 0
+
+
+def test_expiry_and_bounds():
+    cache = FormSchemaCache(ttl=0)
+    cache.get(1, lambda: schema(1, "Pulse"))
+    assert cache.stats()["entries"] == 0
+
+    cache = FormSchemaCache(ttl=60, max_entries=2)
+    for form_id in (1, 2, 3):
+        cache.get(form_id, lambda: schema(form_id))
+    assert list(cache._entries) == [2, 3]
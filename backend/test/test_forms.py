@@ -2,12 +2,15 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 from app.main import app
+from app.core.form_schema_cache import form_schema_cache
 from app.config.database import get_db
 from app.models.forms import Forms
 from app.models.users import Users
 from app.schemas.forms import FormCreate
 from app.services.forms import FormsService
+from app.utils import pagination
 from app.services.auth import create_access_token
+from app.core.principal_cache import principal_cache
 
 client = TestClient(app)
 
@@ -36,6 +39,8 @@ def test_db():
         db.query(Forms).delete()
         db.query(Users).delete()
         db.commit()
+        principal_cache.clear()
+        form_schema_cache.clear()
         db.close()
 
 
@@ -113,3 +118,29 @@ def test_delete_form_not_found(auth_headers):
     response = client.delete("/api/forms/999", headers=auth_headers)
     assert response.status_code == 404
     assert response.json()["detail"] == "Form with id 999 not found"
+
+
+def test_get_all_forms_paginated(test_db: Session, auth_headers):
+    forms = [FormsService.create_form(test_db, FormCreate(name=f"Form {index}")) for index in range(3)]
+
+    response = client.get("/api/forms/?limit=2&fields=name", headers=auth_headers)
+    assert response.json() == [{"id": form.id, "name": form.name} for form in forms[:2]]
+    assert response.headers["X-Next-Cursor"] == str(forms[1].id)
+
+    response = client.get(f"/api/forms/?after_id={forms[1].id}", headers=auth_headers)
+    assert [form["name"] for form in response.json()] == ["Form 2"]
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_get_all_forms_unpaged_returns_every_form(test_db: Session, auth_headers, monkeypatch):
+    monkeypatch.setattr(pagination, "LIST_DEFAULT_LIMIT", 2)
+    forms = [FormsService.create_form(test_db, FormCreate(name=f"Form {index}")) for index in range(3)]
+
+    response = client.get("/api/forms/", headers=auth_headers)
+    assert [form["name"] for form in response.json()] == ["Form 0", "Form 1", "Form 2"]
+    assert "X-Next-Cursor" not in response.headers
+    assert len(FormsService.get_all_forms(test_db).items) == 3
+
+    response = client.get(f"/api/forms/?after_id={forms[0].id - 1}", headers=auth_headers)
+    assert [form["name"] for form in response.json()] == ["Form 0", "Form 1"]
+    assert response.headers["X-Next-Cursor"] == str(forms[1].id)
@@ -1,7 +1,11 @@
 import os
+import httpx
 import unittest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
 from unittest.mock import patch, MagicMock
 from fastapi import HTTPException
+from openai import RateLimitError
 from app.utils.openai import OpenAIUtils
 
 
@@ -46,10 +50,116 @@ class TestOpenAIUtils(unittest.TestCase):
         with self.assertRaises(HTTPException) as context:
             OpenAIUtils.prepare_context(transcription_text, form_structure)
         self.assertEqual(context.exception.status_code, 424)
-        self.assertIn(
-            "Failed to parse the AI's response: The AI response is not a valid dictionary.", context.exception.detail
+        self.assertEqual(
+            context.exception.detail, "Failed to parse the AI's response: The AI response is not a valid dictionary."
         )
 
+    @patch.object(OpenAIUtils, "_client", create=True)
+    def test_extract_form_data_success(self, mock_client):
+        mock_client.chat.completions.create.return_value = MagicMock(
+            choices=[
+                MagicMock(
+                    message=MagicMock(
+                        content='{"values": {"name": "John Doe"}, "confidence": {"name": "95%", "total": 90}}'
+                    )
+                )
+            ]
+        )
+        result = OpenAIUtils.extract_form_data("My name is John Doe.", {"name": "Full Name"})
+        self.assertEqual(result, ({"name": "John Doe"}, {"name": 95.0, "total": 90.0}))
+        kwargs = mock_client.chat.completions.create.call_args.kwargs
+        self.assertEqual(kwargs["response_format"], {"type": "json_object"})
+
+    @patch.object(OpenAIUtils, "_client", create=True)
+    def test_extract_form_data_unparseable_scores(self, mock_client):
+        mock_client.chat.completions.create.return_value = MagicMock(
+            choices=[
+                MagicMock(
+                    message=MagicMock(
+                        content='{"values": {"name": "John Doe", "age": null}, '
+                        '"confidence": {"name": "high", "age": null, "total": "80 %"}}'
+                    )
+                )
+            ]
+        )
+        result = OpenAIUtils.extract_form_data("My name is John Doe.", {"name": "Full Name", "age": "Age"})
+        self.assertEqual(result[1], {"name": 0.0, "age": 0.0, "total": 80.0})
+
+    @patch.object(OpenAIUtils, "_client", create=True)
+    def test_extract_form_data_missing_total(self, mock_client):
+        mock_client.chat.completions.create.return_value = MagicMock(
+            choices=[MagicMock(message=MagicMock(content='{"values": {}, "confidence": {"name": 95}}'))]
+        )
+        with self.assertRaises(HTTPException) as context:
+            OpenAIUtils.extract_form_data("My name is John Doe.", {"name": "Full Name"})
+        self.assertEqual(context.exception.status_code, 424)
+        self.assertEqual(
+            context.exception.detail,
+            "Failed to parse the AI's response: The AI response is missing the values or confidence.",
+        )
+
+    @patch("app.utils.openai.compact_patient_context", return_value={})
+    @patch.object(OpenAIUtils, "_client", create=True)
+    def test_stream_patient_context(self, mock_client, mock_compact):
+        mock_client.chat.completions.create.return_value = iter(
+            [
+                MagicMock(choices=[MagicMock(delta=MagicMock(content="Patient "))]),
+                MagicMock(choices=[MagicMock(delta=MagicMock(content=None))]),
+                MagicMock(choices=[MagicMock(delta=MagicMock(content="Summary"))]),
+            ]
+        )
+        chunks = list(OpenAIUtils.stream_patient_context(MagicMock(), MagicMock(), MagicMock()))
+        self.assertEqual(chunks, ["Patient ", "Summary"])
+        self.assertTrue(mock_client.chat.completions.create.call_args.kwargs["stream"])
+
+    @patch("app.utils.openai.compact_patient_context", return_value={})
+    @patch.object(OpenAIUtils, "_client", create=True)
+    def test_stream_patient_context_exception(self, mock_client, mock_compact):
+        mock_client.chat.completions.create.side_effect = Exception("API error")
+        with self.assertRaises(HTTPException) as context:
+            list(OpenAIUtils.stream_patient_context(MagicMock(), MagicMock(), MagicMock()))
+        self.assertEqual(context.exception.status_code, 424)
+        self.assertIn("Failed to stream the AI's response: API error", context.exception.detail)
+
+    @patch.object(OpenAIUtils, "_client", create=True)
+    @patch("builtins.open", new_callable=unittest.mock.mock_open, read_data="audio data")
+    @patch("os.path.exists", return_value=True)
+    def test_transcribe_audio_rate_limited(self, mock_exists, mock_open, mock_client):
+        response = httpx.Response(
+            429, headers={"retry-after": "3"}, request=httpx.Request("POST", "https://api.openai.com")
+        )
+        mock_client.audio.transcriptions.create.side_effect = RateLimitError(
+            "Rate limit reached", response=response, body=None
+        )
+        with self.assertRaises(HTTPException) as context:
+            OpenAIUtils.transcribe_audio("test_audio.mp3")
+        self.assertEqual(context.exception.status_code, 429)
+        self.assertEqual(context.exception.headers, {"Retry-After": "3"})
+
+    def test_retry_after_accepts_seconds_or_an_http_date(self):
+        retry_at = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+        self.assertEqual(OpenAIUtils._retry_after("3"), "3")
+        self.assertEqual(OpenAIUtils._retry_after("1.5"), "2")
+        self.assertIn(OpenAIUtils._retry_after(retry_at), {"29", "30"})
+        self.assertEqual(OpenAIUtils._retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), "0")
+        self.assertIsNone(OpenAIUtils._retry_after("soon"))
+        self.assertIsNone(OpenAIUtils._retry_after(None))
+
+    @patch.object(OpenAIUtils, "_client", create=True)
+    @patch("builtins.open", new_callable=unittest.mock.mock_open, read_data="audio data")
+    @patch("os.path.exists", return_value=True)
+    def test_transcribe_audio_rate_limited_without_a_readable_retry_after(self, mock_exists, mock_open, mock_client):
+        response = httpx.Response(
+            429, headers={"retry-after": "soon"}, request=httpx.Request("POST", "https://api.openai.com")
+        )
+        mock_client.audio.transcriptions.create.side_effect = RateLimitError(
+            "Rate limit reached", response=response, body=None
+        )
+        with self.assertRaises(HTTPException) as context:
+            OpenAIUtils.transcribe_audio("test_audio.mp3")
+        self.assertEqual(context.exception.status_code, 429)
+        self.assertIsNone(context.exception.headers)
+
     class TestOpenAIUtils(unittest.TestCase):
         @patch.object(OpenAIUtils, "_client", create=True)
         @patch("builtins.open", new_callable=unittest.mock.mock_open, read_data="audio data")
@@ -0,0 +1,51 @@
+import asyncio
+from unittest.mock import patch
+from passlib.context import CryptContext
+from app.core.workers import WorkerPool
+from app.utils.passwords import PasswordHasher
+
+
+def bcrypt_hash(password, rounds):
+    return CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=rounds).hash(password)
+
+
+def test_hash_and_verify_on_the_pool():
+    pool = WorkerPool(max_workers=1, thread_name_prefix="test-password-hash")
+    hasher = PasswordHasher(rounds=4, pool=pool)
+    with patch.object(pool, "submit", wraps=pool.submit) as submit:
+        hashed_password = hasher.hash("secret")
+        assert hashed_password.startswith("$2b$04$")
+        assert hasher.verify("secret", hashed_password)
+        assert not hasher.verify("wrong", hashed_password)
+    assert submit.call_count == 3
+    pool.shutdown()
+
+
+def test_hash_async_on_the_pool():
+    pool = WorkerPool(max_workers=1, thread_name_prefix="test-password-hash")
+    hasher = PasswordHasher(rounds=4, pool=pool)
+    with patch.object(pool, "submit", wraps=pool.submit) as submit:
+        hashed_password = asyncio.run(hasher.hash_async("secret"))
+    assert submit.call_count == 1
+    assert hasher.verify("secret", hashed_password)
+    pool.shutdown()
+
+
+def test_verify_and_update_rehashes_other_costs():
+    hasher = PasswordHasher(rounds=5)
+
+    assert hasher.verify_and_update("secret", bcrypt_hash("secret", 5)) == (True, None)
+    assert hasher.verify_and_update("wrong", bcrypt_hash("secret", 4)) == (False, None)
+
+    valid, hashed_password = hasher.verify_and_update("secret", bcrypt_hash("secret", 4))
+    assert valid and hashed_password.startswith("$2b$05$")
+
+    valid, hashed_password = asyncio.run(hasher.verify_and_update_async("secret", bcrypt_hash("secret", 6)))
+    assert valid and hashed_password.startswith("$2b$05$")
+
+
+def test_calibrate_picks_the_cost_for_the_target_time():
+    with patch("app.utils.passwords.time.perf_counter", side_effect=[0.0, 0.0256] * 9):
+        assert PasswordHasher.calibrate(target_ms=250) == 11
+        assert PasswordHasher.calibrate(target_ms=1) == 10
+        assert PasswordHasher.calibrate(target_ms=10**6, max_rounds=14) == 14
@@ -0,0 +1,140 @@
+import json
+from app.schemas.patients import (
+    AllergyIntoleranceResource,
+    ConditionResource,
+    ObservationResource,
+    Patient,
+    PatientContext,
+)
+from app.utils.patient_context import compact_patient_context, count_tokens
+
+
+def observation(value, date, code="8867-4", display="Heart rate"):
+    return ObservationResource(
+        id=f"obs-{date}",
+        status="final",
+        code={"coding": [{"system": "http://loinc.org", "code": code, "display": display}]},
+        subject={"reference": "Patient/123"},
+        encounter={"reference": "Encounter/456"},
+        effectiveDateTime=date,
+        valueQuantity={"value": value, "unit": "bpm"},
+        referenceRange=[{"low": {"value": 60, "unit": "bpm"}, "high": {"value": 100, "unit": "bpm"}}],
+    )
+
+
+def patient_context(**resources):
+    patient = Patient(
+        id="123",
+        identifier=[{"value": "GAN203006"}],
+        active=True,
+        name={"text": "John Doe"},
+        gender="male",
+        birthDate="1980-01-01",
+        deceasedBoolean=False,
+        address=[],
+    )
+    return PatientContext(patient=patient, **resources)
+
+
+def test_count_tokens():
+    assert count_tokens("") == 0
+    assert count_tokens("heart rate") > 0
+
+
+def test_observations_are_collapsed_into_trends():
+    context = patient_context(
+        observations=[
+            observation(80, "2024-01-01T00:00:00Z"),
+            observation(90, "2024-01-03T00:00:00Z"),
+            observation(70, "2024-01-02T00:00:00Z"),
+            observation(37.5, "2024-01-02T00:00:00Z", code="8310-5", display="Body temperature"),
+        ]
+    )
+
+    document = compact_patient_context(context)
+
+    heart_rate = document["observations"][0]
+    assert heart_rate["name"] == "Heart rate"
+    assert heart_rate["count"] == 3
+    assert heart_rate["latest"] == 90
+    assert heart_rate["latest_date"] == "2024-01-03T00:00:00Z"
+    assert (heart_rate["min"], heart_rate["max"]) == (70, 90)
+    assert heart_rate["slope_per_day"] == 5.0
+    assert heart_rate["reference_range"] == "60.0-100.0"
+    assert document["observations"][1]["count"] == 1
+    assert "slope_per_day" not in document["observations"][1]
+    assert document["codings"]["Heart rate"] == ["http://loinc.org|8867-4"]
+    assert "Patient/123" not in json.dumps(document)
+    assert "Encounter/456" not in json.dumps(document)
+
+
+def test_conditions_and_allergies_are_prioritized():
+    context = patient_context(
+        conditions=[
+            ConditionResource(code={"text": "Fracture"}, status={"code": "resolved"}, recordedDate="2020-01-01"),
+            ConditionResource(code={"text": "Diabetes"}, status={"code": "active"}, recordedDate="2019-01-01"),
+            ConditionResource(code={"text": "Diabetes"}, status={"code": "active"}, recordedDate="2019-01-01"),
+        ],
+        allergies=[
+            AllergyIntoleranceResource(code={"text": "Dust"}, criticality="low", reaction=[]),
+            AllergyIntoleranceResource(code={"text": "Penicillin"}, criticality="high", reaction=[]),
+        ],
+    )
+
+    document = compact_patient_context(context)
+
+    assert [condition["name"] for condition in document["conditions"]] == ["Diabetes", "Fracture"]
+    assert [allergy["substance"] for allergy in document["allergies"]] == ["Penicillin", "Dust"]
+    assert "omitted" not in document
+
+
+def test_token_budget_drops_lowest_priority_items():
+    context = patient_context(
+        observations=[
+            observation(80, f"2024-01-{day:02d}T00:00:00Z", code=str(day), display=f"Test {day}")
+            for day in range(1, 29)
+        ],
+        conditions=[
+            ConditionResource(code={"text": "Fracture"}, status={"code": "resolved"}),
+            ConditionResource(code={"text": "Diabetes"}, status={"code": "active"}),
+        ],
+        allergies=[
+            AllergyIntoleranceResource(code={"text": "Dust"}, criticality="low", reaction=[]),
+            AllergyIntoleranceResource(code={"text": "Penicillin"}, criticality="high", reaction=[]),
+        ],
+    )
+    unbounded = compact_patient_context(context, token_budget=100000)
+    budget = count_tokens(json.dumps(unbounded, separators=(",", ":"))) // 2
+
+    document = compact_patient_context(context, token_budget=budget)
+
+    assert count_tokens(json.dumps(document, separators=(",", ":"))) <= budget
+    assert 0 < document["omitted"]["observations"] < 28
+    assert document["observations"][0]["name"] == "Test 28"
+    assert len(document["observations"]) + document["omitted"]["observations"] == 28
+    assert [condition["name"] for condition in document["conditions"]] == ["Diabetes", "Fracture"]
+
+
+def test_token_budget_keeps_active_conditions_and_high_criticality_allergies():
+    context = patient_context(
+        observations=[observation(80, "2024-01-01T00:00:00Z")],
+        conditions=[
+            ConditionResource(code={"text": "Fracture"}, status={"code": "resolved"}),
+            ConditionResource(
+                code={"coding": [{"system": "http://snomed.info/sct", "code": "44054006", "display": "Diabetes"}]},
+                status={"code": "active"},
+            ),
+        ],
+        allergies=[
+            AllergyIntoleranceResource(code={"text": "Dust"}, criticality="low", reaction=[]),
+            AllergyIntoleranceResource(code={"text": "Penicillin"}, criticality="high", reaction=[]),
+        ],
+    )
+
+    document = compact_patient_context(context, token_budget=1)
+
+    assert document["observations"] == []
+    assert [condition["name"] for condition in document["conditions"]] == ["Diabetes"]
+    assert [allergy["substance"] for allergy in document["allergies"]] == ["Penicillin"]
+    assert "codings" not in document
+    assert document["omitted"] == {"observations": 1, "conditions": 1, "allergies": 1, "codings": 1}
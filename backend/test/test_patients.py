@@ -1,10 +1,14 @@
+import time
+import asyncio
 import pytest
 from fastapi.testclient import TestClient
 from fastapi import FastAPI, HTTPException
 from sqlalchemy.orm import Session
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 from app.api.routes.patients import router
-from app.core.emr_client import EMRClient
+from app.core.cache import InMemoryCache
+from app.core.emr_client import AsyncEMRClient
+from app.core.summary_cache import SummaryCache
 from app.schemas.patients import (
     Patient,
     Address,
@@ -23,6 +27,7 @@ from app.services.departments import DepartmentsService
 from app.services.providers import ProvidersService
 from app.services.patients import PatientService
 from app.services.auth import create_access_token
+from app.core.principal_cache import principal_cache
 
 
 app = FastAPI()
@@ -38,7 +43,7 @@ def db_session():
 
 @pytest.fixture
 def emr_client_mock():
-    return Mock(spec=EMRClient)
+    return AsyncMock(spec=AsyncEMRClient)
 
 
 @pytest.fixture
@@ -56,6 +61,15 @@ def patient_service(emr_client_mock):
     return PatientService(emr_client_mock)
 
 
+def get_patient_context(service, *args):
+    summary, _ = asyncio.run(service.get_patient_summary_async(*args))
+    return summary
+
+
+def get_patient_summary(service, *args):
+    return asyncio.run(service.get_patient_summary_async(*args))
+
+
 @pytest.fixture
 def user():
     return User(
@@ -80,6 +94,7 @@ def test_db():
         db.query(Users).delete()
         db.query(Departments).delete()
         db.commit()
+        principal_cache.clear()
         db.close()
 
 
@@ -152,7 +167,7 @@ def test_get_patient_context_success(patient_service, emr_client_mock, user, dep
     emr_client_mock.get_allergy_details.return_value = allergies
 
     with patch("app.utils.openai.OpenAIUtils.analyze_patient_context", return_value="Patient Diagnosis Summary"):
-        result = patient_service.get_patient_context("patient123", user, department)
+        result = get_patient_context(patient_service, "patient123", user, department)
         assert result == "Patient Diagnosis Summary"
 
 
@@ -160,7 +175,7 @@ def test_get_patient_context_patient_not_found(patient_service, emr_client_mock,
     emr_client_mock.get_patient_data.return_value = None
 
     with pytest.raises(HTTPException) as exc_info:
-        patient_service.get_patient_context("patient123", user, department)
+        get_patient_context(patient_service, "patient123", user, department)
     assert exc_info.value.status_code == 404
     assert exc_info.value.detail == "Patient not found"
 
@@ -169,7 +184,7 @@ def test_get_patient_context_internal_server_error(patient_service, emr_client_m
     emr_client_mock.get_patient_data.side_effect = Exception("Unexpected error")
 
     with pytest.raises(HTTPException) as exc_info:
-        patient_service.get_patient_context("patient123", user, department)
+        get_patient_context(patient_service, "patient123", user, department)
     assert exc_info.value.status_code == 500
     assert "Internal Server Error" in exc_info.value.detail
 
@@ -178,7 +193,7 @@ def test_user_without_department_access(patient_service, emr_client_mock, user,
     emr_client_mock.get_patient_data.return_value = None
 
     with pytest.raises(HTTPException) as exc_info:
-        patient_service.get_patient_context("patient123", user, department)
+        get_patient_context(patient_service, "patient123", user, department)
     assert exc_info.value.status_code == 404
     assert exc_info.value.detail == "Patient not found"
 
@@ -201,7 +216,7 @@ def test_patient_with_no_data(patient_service, emr_client_mock, user, department
     emr_client_mock.get_allergy_details.return_value = []
 
     with patch("app.utils.openai.OpenAIUtils.analyze_patient_context", return_value="No significant findings."):
-        result = patient_service.get_patient_context("patient123", user, department)
+        result = get_patient_context(patient_service, "patient123", user, department)
         assert result == "No significant findings."
 
 
@@ -227,7 +242,7 @@ def test_ai_analysis_failure(patient_service, emr_client_mock, user, department)
 
     with patch("app.utils.openai.OpenAIUtils.analyze_patient_context", side_effect=Exception("AI analysis failed")):
         with pytest.raises(HTTPException) as exc_info:
-            patient_service.get_patient_context("patient123", user, department)
+            get_patient_context(patient_service, "patient123", user, department)
         assert exc_info.value.status_code == 500
         assert "AI analysis failed" in exc_info.value.detail
 
@@ -332,11 +347,29 @@ def test_get_patient_context(db_session, patient_service, departments_service_mo
     ), patch(
         "app.api.routes.patients.ProvidersService.get_provider_by_user_id", return_value=providers_service_mock
     ), patch(
-        "app.api.routes.patients.patient_service.get_patient_context", return_value="Patient Summary"
+        "app.api.routes.patients.patient_service.get_patient_summary_async",
+        return_value=("Patient Summary", False),
     ):
         response = client.get("/patients/patient123", headers=auth_headers)
         assert response.status_code == 200
         assert response.json() == "Patient Summary"
+        assert response.headers["X-Summary-Cache"] == "MISS"
+
+
+def test_get_patient_context_uses_the_provider_of_the_user(admin_user, auth_headers):
+    with patch(
+        "app.api.routes.patients.ProvidersService.get_provider_by_user_id_async", new_callable=AsyncMock
+    ) as get_provider, patch(
+        "app.api.routes.patients.DepartmentsService.get_department_by_id_async", new_callable=AsyncMock
+    ) as get_department, patch(
+        "app.api.routes.patients.patient_service.get_patient_summary_async", return_value=("Patient Summary", True)
+    ):
+        get_provider.return_value = Mock(department_id=7)
+        response = client.get("/patients/patient123", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert get_provider.await_args.args[1] == admin_user.id
+    assert get_department.await_args.args[1] == 7
 
 
 def test_get_patient_context_not_found(db_session, patient_service, departments_service_mock, auth_headers):
@@ -345,7 +378,7 @@ def test_get_patient_context_not_found(db_session, patient_service, departments_
     ), patch(
         "app.api.routes.patients.ProvidersService.get_provider_by_user_id", return_value=providers_service_mock
     ), patch(
-        "app.api.routes.patients.patient_service.get_patient_context",
+        "app.api.routes.patients.patient_service.get_patient_summary_async",
         side_effect=HTTPException(status_code=404, detail="Patient not found"),
     ):
         response = client.get("/patients/patient123", headers=auth_headers)
@@ -361,9 +394,292 @@ def test_get_patient_context_internal_server_exception(
     ), patch(
         "app.api.routes.patients.ProvidersService.get_provider_by_user_id", return_value=providers_service_mock
     ), patch(
-        "app.api.routes.patients.patient_service.get_patient_context",
+        "app.api.routes.patients.patient_service.get_patient_summary_async",
         side_effect=HTTPException(status_code=500, detail="Internal Server Error"),
     ):
         response = client.get("/patients/patient123", headers=auth_headers)
         assert response.status_code == 500
         assert response.json() == {"detail": "Internal Server Error"}
+
+
+def test_get_patient_context_fetches_resources_concurrently(patient_service, emr_client_mock, user, department):
+    patient = Patient(
+        id="patient123",
+        identifier=[{"value": "12345"}],
+        active=True,
+        name={"text": "John Doe"},
+        gender="male",
+        birthDate="2000-01-01",
+        deceasedBoolean=False,
+        address=[],
+    )
+
+    def slow(value):
+        async def fetch(patient_id):
+            await asyncio.sleep(0.2)
+            return value
+
+        return fetch
+
+    emr_client_mock.get_patient_data.side_effect = slow(patient)
+    emr_client_mock.get_observations.side_effect = slow([])
+    emr_client_mock.get_conditions.side_effect = slow([])
+    emr_client_mock.get_allergy_details.side_effect = slow([])
+
+    with patch("app.utils.openai.OpenAIUtils.analyze_patient_context", return_value="Summary") as mock_analyze:
+        start = time.perf_counter()
+        result = get_patient_context(patient_service, "patient123", user, department)
+        elapsed = time.perf_counter() - start
+
+    assert result == "Summary"
+    assert elapsed < 0.6
+    assert mock_analyze.call_args.kwargs["patient_context"].patient == patient
+
+
+def test_get_patient_context_missing_resource_is_empty(patient_service, emr_client_mock, user, department):
+    patient = Patient(
+        id="patient123",
+        identifier=[{"value": "12345"}],
+        active=True,
+        name={"text": "John Doe"},
+        gender="male",
+        birthDate="2000-01-01",
+        deceasedBoolean=False,
+        address=[],
+    )
+    emr_client_mock.get_patient_data.return_value = patient
+    emr_client_mock.get_observations.side_effect = HTTPException(status_code=404, detail="Resource not found")
+    emr_client_mock.get_conditions.return_value = [ConditionResource(id="cond1", code={"text": "Diabetes"})]
+    emr_client_mock.get_allergy_details.return_value = []
+
+    with patch("app.utils.openai.OpenAIUtils.analyze_patient_context", return_value="Summary") as mock_analyze:
+        get_patient_context(patient_service, "patient123", user, department)
+
+    patient_context = mock_analyze.call_args.kwargs["patient_context"]
+    assert patient_context.observations == []
+    assert patient_context.conditions[0].id == "cond1"
+
+
+def test_get_patient_context_resource_failure(patient_service, emr_client_mock, user, department):
+    emr_client_mock.get_patient_data.return_value = Mock()
+    emr_client_mock.get_observations.return_value = []
+    emr_client_mock.get_conditions.side_effect = HTTPException(status_code=401, detail="Failed to authenticate")
+    emr_client_mock.get_allergy_details.return_value = []
+
+    with pytest.raises(HTTPException) as exc_info:
+        get_patient_context(patient_service, "patient123", user, department)
+    assert exc_info.value.status_code == 401
+
+
+@pytest.fixture
+def async_emr_client_mock():
+    return AsyncMock(spec=AsyncEMRClient)
+
+
+def test_get_patient_context_async_success(async_emr_client_mock, user, department):
+    patient = Patient(
+        id="patient123",
+        identifier=[{"value": "12345"}],
+        active=True,
+        name={"text": "John Doe"},
+        gender="male",
+        birthDate="2000-01-01",
+        deceasedBoolean=False,
+        address=[],
+    )
+    async_emr_client_mock.get_patient_data.return_value = patient
+    async_emr_client_mock.get_observations.side_effect = HTTPException(status_code=404, detail="Resource not found")
+    async_emr_client_mock.get_conditions.return_value = [ConditionResource(id="cond1", code={"text": "Diabetes"})]
+    async_emr_client_mock.get_allergy_details.return_value = []
+    service = PatientService(async_emr_client_mock)
+
+    with patch("app.utils.openai.OpenAIUtils.analyze_patient_context", return_value="Summary") as mock_analyze:
+        result = get_patient_context(service, "patient123", user, department)
+
+    assert result == "Summary"
+    patient_context = mock_analyze.call_args.kwargs["patient_context"]
+    assert patient_context.patient == patient
+    assert patient_context.observations == []
+    assert patient_context.conditions[0].id == "cond1"
+
+
+def test_get_patient_context_async_patient_error(async_emr_client_mock, user, department):
+    async_emr_client_mock.get_patient_data.side_effect = HTTPException(status_code=404, detail="Resource not found")
+    service = PatientService(async_emr_client_mock)
+
+    with pytest.raises(HTTPException) as exc_info:
+        get_patient_context(service, "patient123", user, department)
+    assert exc_info.value.status_code == 404
+
+
+def test_get_patient_context_async_timeout(async_emr_client_mock, user, department):
+    async def slow_patient(patient_id):
+        await asyncio.sleep(0.5)
+
+    async_emr_client_mock.get_patient_data.side_effect = slow_patient
+    service = PatientService(async_emr_client_mock)
+
+    with patch("app.services.patients.EMR_FETCH_TIMEOUT", 0.1):
+        with pytest.raises(HTTPException) as exc_info:
+            get_patient_context(service, "patient123", user, department)
+    assert exc_info.value.status_code == 504
+
+
+def test_get_patient_context_cache_hit_header(db_session, departments_service_mock, auth_headers):
+    with patch(
+        "app.api.routes.patients.DepartmentsService.get_department_by_id", return_value=departments_service_mock
+    ), patch(
+        "app.api.routes.patients.patient_service.get_patient_summary_async", return_value=("Patient Summary", True)
+    ):
+        response = client.get("/patients/patient123", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers["X-Summary-Cache"] == "HIT"
+
+
+def test_patient_summary_is_memoized(emr_client_mock, user, department):
+    patient = Patient(
+        id="patient123",
+        identifier=[{"value": "12345"}],
+        active=True,
+        name={"text": "John Doe"},
+        gender="male",
+        birthDate="2000-01-01",
+        deceasedBoolean=False,
+        address=[],
+    )
+    emr_client_mock.get_patient_data.return_value = patient
+    emr_client_mock.get_observations.return_value = []
+    emr_client_mock.get_conditions.return_value = [ConditionResource(id="cond1", code={"text": "Diabetes"})]
+    emr_client_mock.get_allergy_details.return_value = []
+    service = PatientService(emr_client_mock, summary_cache=SummaryCache(InMemoryCache()))
+
+    with patch("app.utils.openai.OpenAIUtils.analyze_patient_context", return_value="Summary") as mock_analyze:
+        assert get_patient_summary(service, "patient123", user, department) == ("Summary", False)
+        assert get_patient_summary(service, "patient123", user, department) == ("Summary", True)
+        assert mock_analyze.call_count == 1
+
+        other_department = Department(
+            id=2, name="Cardiology", created_at="2023-01-01T00:00:00Z", updated_at="2023-01-01T00:00:00Z"
+        )
+        assert get_patient_summary(service, "patient123", user, other_department) == ("Summary", False)
+        assert mock_analyze.call_count == 2
+
+        emr_client_mock.get_conditions.return_value = [ConditionResource(id="cond2", code={"text": "Asthma"})]
+        assert get_patient_summary(service, "patient123", user, department) == ("Summary", False)
+        assert mock_analyze.call_count == 3
+
+    assert service.summary_cache.stats() == {"hits": 1, "misses": 3}
+    assert len(service.summary_cache.backend) == 2
+
+
+def test_patient_summary_async_is_memoized(async_emr_client_mock, user, department):
+    patient = Patient(
+        id="patient123",
+        identifier=[{"value": "12345"}],
+        active=True,
+        name={"text": "John Doe"},
+        gender="male",
+        birthDate="2000-01-01",
+        deceasedBoolean=False,
+        address=[],
+    )
+    async_emr_client_mock.get_patient_data.return_value = patient
+    async_emr_client_mock.get_observations.return_value = []
+    async_emr_client_mock.get_conditions.return_value = []
+    async_emr_client_mock.get_allergy_details.return_value = []
+    service = PatientService(async_emr_client_mock, summary_cache=SummaryCache(InMemoryCache()))
+
+    with patch("app.utils.openai.OpenAIUtils.analyze_patient_context", return_value="Summary") as mock_analyze:
+        assert asyncio.run(service.get_patient_summary_async("patient123", user, department)) == ("Summary", False)
+        assert asyncio.run(service.get_patient_summary_async("patient123", user, department)) == ("Summary", True)
+        async_emr_client_mock.get_conditions.return_value = [ConditionResource(id="cond2", code={"text": "Asthma"})]
+        assert asyncio.run(service.get_patient_summary_async("patient123", user, department)) == ("Summary", False)
+    assert mock_analyze.call_count == 2
+
+
+def collect_events(service, patient_id, user, department):
+    async def collect():
+        return [event async for event in service.stream_patient_summary(patient_id, user, department)]
+
+    return asyncio.run(collect())
+
+
+def test_stream_patient_summary(async_emr_client_mock, user, department):
+    patient = Patient(
+        id="patient123",
+        identifier=[{"value": "12345"}],
+        active=True,
+        name={"text": "John Doe"},
+        gender="male",
+        birthDate="2000-01-01",
+        deceasedBoolean=False,
+        address=[],
+    )
+    async_emr_client_mock.get_patient_data.return_value = patient
+    async_emr_client_mock.get_observations.return_value = []
+    async_emr_client_mock.get_conditions.return_value = [ConditionResource(id="cond1", code={"text": "Diabetes"})]
+    async_emr_client_mock.get_allergy_details.return_value = []
+    service = PatientService(async_emr_client_mock, summary_cache=SummaryCache(InMemoryCache()))
+
+    with patch(
+        "app.utils.openai.OpenAIUtils.stream_patient_context", return_value=iter(["Patient ", "Summary"])
+    ) as mock_stream:
+        events = collect_events(service, "patient123", user, department)
+        cached_events = collect_events(service, "patient123", user, department)
+
+    assert events == [
+        ("progress", {"stage": "fetching_emr"}),
+        ("progress", {"stage": "emr_fetched", "observations": 0, "conditions": 1, "allergies": 0}),
+        ("progress", {"stage": "summarizing"}),
+        ("token", {"text": "Patient "}),
+        ("token", {"text": "Summary"}),
+        ("done", {"cached": False}),
+    ]
+    assert cached_events[-2:] == [("token", {"text": "Patient Summary"}), ("done", {"cached": True})]
+    assert mock_stream.call_count == 1
+
+
+def test_stream_patient_summary_patient_error(async_emr_client_mock, user, department):
+    async_emr_client_mock.get_patient_data.side_effect = HTTPException(status_code=404, detail="Resource not found")
+    service = PatientService(async_emr_client_mock)
+
+    with pytest.raises(HTTPException) as exc_info:
+        collect_events(service, "patient123", user, department)
+    assert exc_info.value.status_code == 404
+
+
+def test_stream_patient_context_route(db_session, departments_service_mock, auth_headers):
+    async def events(*args):
+        yield "progress", {"stage": "fetching_emr"}
+        yield "token", {"text": "Patient Summary"}
+        yield "done", {"cached": False}
+
+    with patch(
+        "app.api.routes.patients.DepartmentsService.get_department_by_id", return_value=departments_service_mock
+    ), patch("app.api.routes.patients.patient_service.stream_patient_summary", side_effect=events):
+        response = client.get("/patients/patient123/stream", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["Cache-Control"] == "no-cache"
+    assert response.text == (
+        'event: progress\ndata: {"stage": "fetching_emr"}\n\n'
+        'event: token\ndata: {"text": "Patient Summary"}\n\n'
+        'event: done\ndata: {"cached": false}\n\n'
+    )
+
+
+def test_stream_patient_context_route_error_event(db_session, departments_service_mock, auth_headers):
+    async def events(*args):
+        yield "progress", {"stage": "fetching_emr"}
+        raise HTTPException(status_code=504, detail="Timed out fetching patient patient123 from the EMR")
+
+    with patch(
+        "app.api.routes.patients.DepartmentsService.get_department_by_id", return_value=departments_service_mock
+    ), patch("app.api.routes.patients.patient_service.stream_patient_summary", side_effect=events):
+        response = client.get("/patients/patient123/stream", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.text.endswith(
+        'event: error\ndata: {"status_code": 504, "detail": "Timed out fetching patient patient123 from the EMR"}\n\n'
+    )
@@ -0,0 +1,76 @@
+import time
+from datetime import datetime
+from app.core.principal_cache import PrincipalCache
+from app.schemas.users import User
+
+
+def user(user_name, user_id=1):
+    now = datetime.now()
+    return User(
+        id=user_id,
+        user_name=user_name,
+        email=f"{user_name}@example.com",
+        is_admin=False,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def test_get_and_load():
+    cache = PrincipalCache(ttl=60)
+    assert cache.get("token") is None
+
+    loaded = cache.load("token", "alice", time.time() + 600, lambda: user("alice"))
+    assert cache.get("token") is loaded
+    assert cache.get("other") is None
+    assert cache.stats() == {"hits": 1, "misses": 2, "entries": 1}
+    assert "token" not in cache._entries
+
+
+def test_ttl_is_bounded_by_token_expiry():
+    cache = PrincipalCache(ttl=60)
+    cache.load("expired", "alice", time.time() - 1, lambda: user("alice"))
+    assert cache.stats()["entries"] == 0
+
+    cache.load("expiring", "alice", time.time() + 0.05, lambda: user("alice"))
+    assert cache.get("expiring") is not None
+    time.sleep(0.1)
+    assert cache.get("expiring") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_invalidate_drops_every_token_of_the_user():
+    cache = PrincipalCache(ttl=60)
+    for token in ("first", "second"):
+        cache.load(token, "alice", None, lambda: user("alice"))
+    cache.load("third", "bob", None, lambda: user("bob", 2))
+
+    cache.invalidate("alice")
+    assert cache.get("first") is None and cache.get("second") is None
+    assert cache.get("third").user_name == "bob"
+
+
+def test_invalidation_during_load_is_not_overwritten():
+    cache = PrincipalCache(ttl=60)
+
+    def stale_load():
+        cache.invalidate("alice")
+        return user("alice")
+
+    cache.load("token", "alice", None, stale_load)
+    assert cache.get("token") is None
+
+    def load_during_clear():
+        cache.clear()
+        return user("bob", 2)
+
+    cache.load("token", "bob", None, load_during_clear)
+    assert cache.stats()["entries"] == 0
+
+
+def test_bounds():
+    cache = PrincipalCache(ttl=60, max_entries=2)
+    for index, token in enumerate(("first", "second", "third")):
+        cache.load(token, token, None, lambda: user(token, index))
+    assert cache.get("first") is None
+    assert cache._tokens.keys() == {"second", "third"}
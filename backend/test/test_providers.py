@@ -6,6 +6,7 @@ from app.models.providers import Providers
 from app.models.users import Users
 from app.models.departments import Departments
 from app.services.auth import create_access_token
+from app.core.principal_cache import principal_cache
 
 client = TestClient(app)
 
@@ -22,6 +23,7 @@ def db_session():
         db.query(Users).delete()
         db.query(Departments).delete()
         db.commit()
+        principal_cache.clear()
         db.close()
 
 
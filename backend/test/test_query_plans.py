@@ -0,0 +1,86 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+from app.main import app  # noqa: F401 (creates the tables)
+from app.config.database import SessionLocal, db_engine
+from app.models.departments import Departments
+from app.models.forms import Forms
+from app.models.users import Users
+from app.services.providers import ProvidersService
+
+
+@pytest.fixture
+def db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.rollback()
+        db.close()
+
+
+@pytest.fixture
+def statements():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(db_engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(db_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def query_plan(db, statement, parameters) -> str:
+    """The plan the database picks for a statement, sequential scans disabled on PostgreSQL to mimic large tables."""
+    connection = db.connection()
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        return "\n".join(row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+    if dialect == "postgresql":
+        connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        return "\n".join(row[0] for row in connection.exec_driver_sql(f"EXPLAIN {statement}", parameters))
+    pytest.skip(f"Query plans are not checked on {dialect}")
+
+
+def assert_uses_index(db, statements, table, index):
+    matching = [(statement, parameters) for statement, parameters in statements if f"FROM {table}" in statement]
+    assert matching, f"No query on {table} was run"
+    for statement, parameters in matching:
+        plan = query_plan(db, statement, parameters)
+        assert index in plan, f"{statement} does not use {index}:\n{plan}"
+
+
+def test_provider_lookups_use_indexes(db, statements):
+    with pytest.raises(HTTPException):
+        ProvidersService.get_provider_by_user_id(db, 1)
+    assert_uses_index(db, statements, "providers", "ix_providers_user_id")
+
+    statements.clear()
+    ProvidersService.get_all_providers(db, after_id=10, limit=5, department_id=1)
+    assert_uses_index(db, statements, "providers", "ix_providers_department_id_id")
+
+
+def test_cascading_deletes_use_indexes(db, statements):
+    user = Users(user_name="explain", email="explain@example.com", password="explain")
+    form = Forms(name="Explain")
+    department = Departments(name="Explain")
+    db.add_all([user, form, department])
+    db.flush()
+    statements.clear()
+
+    db.delete(user)
+    db.flush()
+    assert_uses_index(db, statements, "transcriptions", "ix_transcriptions_user_id")
+    assert_uses_index(db, statements, "providers", "ix_providers_user_id")
+
+    statements.clear()
+    db.delete(form)
+    db.flush()
+    assert_uses_index(db, statements, "transcriptions", "ix_transcriptions_form_id")
+
+    statements.clear()
+    db.delete(department)
+    db.flush()
+    assert_uses_index(db, statements, "providers", "ix_providers_department_id_id")
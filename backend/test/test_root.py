@@ -26,3 +26,19 @@ def test_overridden_redoc():
     response = client.get("/redoc")
     assert response.status_code == 200
     assert b"<title>Bahmni - Copilot</title>" in response.content
+
+
+def test_database_pool_metrics():
+    response = client.get("/health/database")
+    assert response.status_code == 200
+    assert {"checkouts", "checkins", "timeouts", "wait_seconds", "size", "checked_out"} <= set(response.json())
+
+
+def test_cache_metrics():
+    response = client.get("/health/caches")
+    assert response.status_code == 200
+    metrics = response.json()
+    assert {"emr", "summaries", "form_schemas", "principals", "s3_uploads", "extraction"} == set(metrics)
+    assert {"hits", "misses", "revalidations"} <= set(metrics["emr"])
+    assert {"uploads", "bytes", "mb_per_second"} <= set(metrics["s3_uploads"])
+    assert {"fields", "llm_calls", "llm_calls_avoided"} <= set(metrics["extraction"])
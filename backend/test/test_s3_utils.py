@@ -1,10 +1,13 @@
 import os
 import unittest
-from unittest.mock import patch, MagicMock
+import io
+import time
+import threading
+from unittest.mock import ANY, patch, MagicMock
 from fastapi import HTTPException
 from boto3.exceptions import S3UploadFailedError
 from botocore.exceptions import NoCredentialsError, PartialCredentialsError, ClientError, EndpointConnectionError
-from app.utils.s3 import S3Utils
+from app.utils.s3 import S3Utils, TRANSFER_CONFIG
 
 
 class TestS3Utils(unittest.TestCase):
@@ -17,12 +20,14 @@ class TestS3Utils(unittest.TestCase):
             "S3_ACCESS_KEY_ID": "test_access_key",
             "S3_SECRET_ACCESS_KEY": "test_secret_key",
         }.get(key)
+        S3Utils.s3 = None
         S3Utils.initialize_s3()
         mock_boto_client.assert_called_once_with(
             "s3",
             endpoint_url="http://localhost:4566",
             aws_access_key_id="test_access_key",
             aws_secret_access_key="test_secret_key",
+            config=ANY,
         )
 
     @patch("os.path.exists", return_value=False)
@@ -41,7 +46,9 @@ class TestS3Utils(unittest.TestCase):
         S3Utils.s3 = None
 
         S3Utils.upload_file("test_file.txt", "test_object.txt")
-        mock_s3.upload_file.assert_called_once_with("test_file.txt", "test_bucket", "test_object.txt")
+        mock_s3.upload_file.assert_called_once_with(
+            "test_file.txt", "test_bucket", "test_object.txt", Config=TRANSFER_CONFIG, Callback=ANY
+        )
 
     @patch("boto3.client")
     @patch("os.getenv", return_value="test_bucket")
@@ -127,4 +134,57 @@ class TestS3Utils(unittest.TestCase):
         expected_object_name = os.path.basename(file_path)
 
         S3Utils.upload_file(file_path)
-        mock_s3.upload_file.assert_called_once_with(file_path, "test_bucket", expected_object_name)
+        mock_s3.upload_file.assert_called_once_with(
+            file_path, "test_bucket", expected_object_name, Config=TRANSFER_CONFIG, Callback=ANY
+        )
+
+    @patch("boto3.client")
+    @patch("os.getenv", return_value="test_bucket")
+    def test_upload_fileobj_reports_throughput(self, mock_getenv, mock_boto_client):
+        def upload_fileobj(fileobj, bucket_name, object_name, Config, Callback):
+            Callback(len(fileobj.read()))
+
+        mock_s3 = MagicMock()
+        mock_s3.upload_fileobj.side_effect = upload_fileobj
+        mock_boto_client.return_value = mock_s3
+        S3Utils.s3 = None
+        uploads = S3Utils.upload_stats()["uploads"]
+
+        metrics = S3Utils.upload_fileobj(io.BytesIO(b"fake audio content"), "test_object.wav")
+
+        self.assertEqual(metrics["bytes"], 18)
+        self.assertGreater(metrics["seconds"], 0)
+        self.assertEqual(S3Utils.upload_stats()["uploads"], uploads + 1)
+        self.assertIs(mock_s3.upload_fileobj.call_args.kwargs["Config"], TRANSFER_CONFIG)
+
+    @patch("boto3.client")
+    @patch("os.getenv", return_value="test_bucket")
+    @patch("os.path.exists", return_value=True)
+    def test_client_pool_is_bounded(self, mock_exists, mock_getenv, mock_boto_client):
+        active = []
+        peak = [0]
+        lock = threading.Lock()
+
+        def upload_file(*args, **kwargs):
+            with lock:
+                active.append(1)
+                peak[0] = max(peak[0], len(active))
+            time.sleep(0.05)
+            with lock:
+                active.pop()
+
+        mock_boto_client.side_effect = lambda *args, **kwargs: MagicMock(upload_file=MagicMock(side_effect=upload_file))
+        S3Utils.s3 = None
+
+        with patch("app.utils.s3.S3_CLIENT_POOL_SIZE", 2):
+            threads = [
+                threading.Thread(target=S3Utils.upload_file, args=("test_file.txt", f"object_{i}.txt"))
+                for i in range(6)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(mock_boto_client.call_count, 2)
+        self.assertEqual(peak[0], 2)
@@ -0,0 +1,81 @@
+import sys
+import pytest
+from unittest.mock import patch, MagicMock
+from fastapi import HTTPException, status
+from app.utils.transcribers import (
+    LocalWhisperTranscriber,
+    OpenAITranscriber,
+    create_transcriber,
+)
+
+
+@pytest.fixture
+def whisper_stack():
+    torch = MagicMock()
+    transformers = MagicMock()
+    asr = MagicMock(side_effect=lambda inputs, **kwargs: [{"text": f" text of {path} "} for path in inputs])
+    transformers.pipeline.return_value = asr
+    with patch.dict(sys.modules, {"torch": torch, "transformers": transformers}):
+        yield torch, transformers, asr
+
+
+def test_create_transcriber():
+    assert isinstance(create_transcriber("openai"), OpenAITranscriber)
+    assert isinstance(create_transcriber("LOCAL"), LocalWhisperTranscriber)
+    with pytest.raises(ValueError):
+        create_transcriber("vosk")
+
+
+def test_openai_transcriber():
+    transcriber = OpenAITranscriber()
+    with patch("app.utils.openai.OpenAIUtils.transcribe_audio", return_value="transcribed text") as mock_transcribe:
+        assert transcriber.transcribe_batch(["a.ogg", "b.ogg"]) == ["transcribed text", "transcribed text"]
+    assert not transcriber.batched
+    assert mock_transcribe.call_count == 2
+
+
+def test_local_transcriber_loads_quantized_model_once(whisper_stack):
+    torch, transformers, asr = whisper_stack
+    transcriber = LocalWhisperTranscriber(model_name="openai/whisper-tiny", batch_size=8, threads=2, language="en")
+
+    assert transcriber.transcribe("a.ogg") == "text of a.ogg"
+    assert transcriber.transcribe_batch(["b.ogg", "c.ogg"]) == ["text of b.ogg", "text of c.ogg"]
+
+    transformers.WhisperForConditionalGeneration.from_pretrained.assert_called_once_with("openai/whisper-tiny")
+    transformers.pipeline.assert_called_once()
+    torch.set_num_threads.assert_called_once_with(2)
+    quantized = torch.quantization.quantize_dynamic
+    quantized.assert_called_once()
+    assert quantized.call_args.kwargs["dtype"] is torch.qint8
+    assert transformers.pipeline.call_args.kwargs["model"] is quantized.return_value
+    asr.assert_called_with(["b.ogg", "c.ogg"], batch_size=8, generate_kwargs={"task": "transcribe", "language": "en"})
+    assert transcriber.load_seconds is not None
+
+
+def test_local_transcriber_without_quantization(whisper_stack):
+    torch, transformers, _ = whisper_stack
+    transcriber = LocalWhisperTranscriber(quantize=False, threads=0)
+
+    transcriber.transcribe("a.ogg")
+
+    torch.quantization.quantize_dynamic.assert_not_called()
+    torch.set_num_threads.assert_not_called()
+    model = transformers.WhisperForConditionalGeneration.from_pretrained.return_value
+    assert transformers.pipeline.call_args.kwargs["model"] is model
+
+
+def test_local_transcriber_without_dependencies():
+    with patch.dict(sys.modules, {"torch": None}):
+        with pytest.raises(HTTPException) as exc_info:
+            LocalWhisperTranscriber().transcribe("a.ogg")
+    assert exc_info.value.status_code == status.HTTP_424_FAILED_DEPENDENCY
+
+
+def test_local_transcriber_inference_failure(whisper_stack):
+    _, _, asr = whisper_stack
+    asr.side_effect = RuntimeError("Invalid audio")
+
+    with pytest.raises(HTTPException) as exc_info:
+        LocalWhisperTranscriber().transcribe("a.ogg")
+    assert exc_info.value.status_code == status.HTTP_424_FAILED_DEPENDENCY
+    assert "Invalid audio" in exc_info.value.detail
@@ -1,12 +1,20 @@
+import io
+import asyncio
+import os
+import time
+import threading
 import pytest
 from unittest.mock import patch, MagicMock
 from fastapi.testclient import TestClient
 from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import status, UploadFile
 from app.main import app
-from app.config.database import get_db
-from app.services.transcriptions import TranscriptionService
+from app.core.form_schema_cache import form_schema_cache
+from app.config.database import SessionLocal, get_db, get_async_sessionmaker
+from app.services.transcriptions import TranscriptionService, UploadStream
+from app.schemas.fields import Field
 from app.schemas.forms import FormCreate
 from app.services.fields import FieldsService, FieldCreate
 from app.services.forms import FormsService
@@ -15,6 +23,7 @@ from app.models.transcriptions import Transcriptions
 from app.models.fields import Fields
 from app.models.forms import Forms
 from app.services.auth import create_access_token
+from app.core.principal_cache import principal_cache
 
 client = TestClient(app)
 
@@ -34,7 +43,13 @@ app.dependency_overrides[get_db] = override_get_db
 
 @pytest.fixture
 def db_session():
-    return MagicMock(spec=Session)
+    db = MagicMock(spec=AsyncSession)
+    db.run_sync.side_effect = lambda fn, *args: fn(MagicMock(spec=Session), *args)
+    return db
+
+
+def create_transcription(db, **kwargs):
+    return asyncio.run(TranscriptionService.create_transcription_async(db=db, **kwargs))
 
 
 @pytest.fixture
@@ -42,8 +57,8 @@ def upload_file():
     file_content = b"fake audio content"
     file = MagicMock(spec=UploadFile)
     file.filename = "test.mp3"
-    file.file = MagicMock()
-    file.file.read.return_value = file_content
+    file.file = io.BytesIO(file_content)
+    file.size = len(file_content)
     return file
 
 
@@ -57,17 +72,29 @@ def mock_s3_utils():
 def mock_openai_utils():
     with patch("app.utils.openai.OpenAIUtils.transcribe_audio") as mock_transcribe, patch(
         "app.utils.openai.OpenAIUtils.validate_transcription"
-    ) as mock_validate, patch("app.utils.openai.OpenAIUtils.prepare_context") as mock_prepare:
+    ) as mock_validate, patch("app.utils.openai.OpenAIUtils.prepare_context") as mock_prepare, patch(
+        "app.services.transcriptions.EXTRACTION_MODE", "separate"
+    ):
         mock_transcribe.return_value = "transcribed text"
         mock_validate.return_value = {"field1": 90, "total": 85}
         mock_prepare.return_value = {"key": "value"}
         yield mock_transcribe, mock_validate, mock_prepare
 
 
+@pytest.fixture
+def mock_combined_extraction():
+    with patch("app.utils.openai.OpenAIUtils.transcribe_audio") as mock_transcribe, patch(
+        "app.utils.openai.OpenAIUtils.extract_form_data"
+    ) as mock_extract, patch("app.services.transcriptions.EXTRACTION_MODE", "combined"):
+        mock_transcribe.return_value = "transcribed text"
+        mock_extract.return_value = ({"key": "value"}, {"field1": 90, "total": 85})
+        yield mock_transcribe, mock_extract
+
+
 @pytest.fixture
 def mock_fields_service():
     with patch("app.services.fields.FieldsService.get_fields_by_form_id") as mock:
-        mock.return_value = [MagicMock(name="field1", description="desc1")]
+        mock.return_value = [Field(id=1, name="field1", description="desc1", form_id=1)]
         yield mock
 
 
@@ -84,6 +111,8 @@ def test_db():
         db.query(Forms).delete()
         db.query(Users).delete()
         db.commit()
+        principal_cache.clear()
+        form_schema_cache.clear()
         db.close()
 
 
@@ -124,7 +153,7 @@ def create_fields(test_db: Session, create_form):
 
 
 def test_create_transcription_service(db_session, upload_file, mock_s3_utils, mock_openai_utils, mock_fields_service):
-    transcription = TranscriptionService.create_transcription(db=db_session, user_id=1, form_id=1, file=upload_file)
+    transcription = create_transcription(db_session, user_id=1, form_id=1, file=upload_file)
 
     assert transcription.upload_uuid is not None
     assert transcription.user_id == 1
@@ -173,7 +202,7 @@ def test_create_transcription_low_confidence(
         mock_validate.return_value = {"field1": 20, "field2": 15, "total": 30}
 
         with pytest.raises(HTTPException) as exc_info:
-            TranscriptionService.create_transcription(db=db_session, user_id=1, form_id=1, file=upload_file)
+            create_transcription(db_session, user_id=1, form_id=1, file=upload_file)
 
         assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
         assert "Transcription confidence score is too low" in exc_info.value.detail
@@ -210,3 +239,510 @@ def test_create_transcription_s3_upload_failure(
         )
         assert response.status_code == status.HTTP_424_FAILED_DEPENDENCY
         assert "Failed to upload audio file: S3 upload failed" in response.json()["detail"]
+
+
+def test_create_transcription_job_endpoint(
+    upload_file, mock_s3_utils, mock_openai_utils, mock_fields_service, create_form, create_fields, auth_headers
+):
+    response = client.post(
+        f"/api/transcriptions/jobs/{create_form.id}",
+        files={"file": ("test.mp3", upload_file.file.read(), "audio/mpeg")},
+        headers=auth_headers,
+    )
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    data = response.json()
+    assert data["form_id"] == create_form.id
+    assert data["status"] in {"pending", "uploaded", "transcribed", "validated", "completed"}
+
+    response = client.get(f"/api/transcriptions/{data['id']}?wait=10", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["status"] == "completed"
+    assert data["transcription_text"] == "transcribed text"
+    assert data["context"] == {"key": "value"}
+
+
+def test_create_transcription_job_unsupported_file_type(
+    upload_file, mock_fields_service, create_form, create_fields, auth_headers
+):
+    response = client.post(
+        f"/api/transcriptions/jobs/{create_form.id}",
+        files={"file": ("test.txt", upload_file.file.read(), "audio/mpeg")},
+        headers=auth_headers,
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_process_transcription_job_low_confidence(
+    tmp_path, test_db, mock_s3_utils, mock_openai_utils, admin_user, create_form
+):
+    transcription = Transcriptions(upload_uuid="job-uuid", user_id=admin_user.id, form_id=create_form.id, context={})
+    test_db.add(transcription)
+    test_db.commit()
+    temp_file_path = tmp_path / "audio.mp3"
+    temp_file_path.write_bytes(b"fake audio content")
+
+    with patch("app.utils.openai.OpenAIUtils.validate_transcription") as mock_validate:
+        mock_validate.return_value = {"field1": 20, "total": 30}
+        TranscriptionService.process_transcription_job(
+            transcription.id, str(temp_file_path), [Field(id=1, name="field1", description="desc", form_id=1)]
+        )
+
+    test_db.refresh(transcription)
+    assert transcription.status == "failed"
+    assert transcription.transcription_text == "transcribed text"
+    assert transcription.context["stage"] == "transcribed"
+    assert "Transcription confidence score is too low" in transcription.context["error"]
+    assert not temp_file_path.exists()
+    mock_openai_utils[2].assert_not_called()
+
+
+@pytest.mark.parametrize("concurrent", [True, False])
+def test_process_transcription_job_reports_the_upload_and_transcription_stages(
+    concurrent, tmp_path, test_db, mock_s3_utils, admin_user, create_form
+):
+    transcription = Transcriptions(upload_uuid="job-uuid", user_id=admin_user.id, form_id=create_form.id, context={})
+    test_db.add(transcription)
+    test_db.commit()
+    temp_file_path = tmp_path / "audio.mp3"
+    temp_file_path.write_bytes(b"fake audio content")
+    statuses = []
+
+    def transcribe(*args, **kwargs):
+        with SessionLocal() as db:
+            statuses.append(db.get(Transcriptions, transcription.id).status)
+        raise HTTPException(status_code=status.HTTP_424_FAILED_DEPENDENCY, detail="Whisper failed")
+
+    with patch("app.services.transcriptions.CONCURRENT_UPLOAD", concurrent), patch(
+        "app.utils.openai.OpenAIUtils.transcribe_audio", side_effect=transcribe
+    ):
+        TranscriptionService.process_transcription_job(transcription.id, str(temp_file_path), [])
+
+    test_db.refresh(transcription)
+    assert transcription.status == "failed"
+    assert transcription.context == {"error": "Whisper failed", "stage": "uploaded"}
+    if not concurrent:
+        assert statuses == ["uploaded"]
+
+
+def test_process_transcription_job_upload_failure(tmp_path, test_db, admin_user, create_form):
+    transcription = Transcriptions(upload_uuid="job-uuid", user_id=admin_user.id, form_id=create_form.id, context={})
+    test_db.add(transcription)
+    test_db.commit()
+    temp_file_path = tmp_path / "audio.mp3"
+    temp_file_path.write_bytes(b"fake audio content")
+
+    with patch("app.utils.s3.S3Utils.upload_file", side_effect=ValueError("S3 upload failed")), patch(
+        "app.utils.openai.OpenAIUtils.transcribe_audio", return_value="transcribed text"
+    ):
+        TranscriptionService.process_transcription_job(transcription.id, str(temp_file_path), [])
+
+    test_db.refresh(transcription)
+    assert transcription.status == "failed"
+    assert transcription.context["stage"] == "pending"
+    assert "S3 upload failed" in transcription.context["error"]
+
+
+def test_get_transcription_async_reloads_the_record(test_db: Session, admin_user, create_form):
+    transcription = Transcriptions(
+        upload_uuid="upload", user_id=admin_user.id, form_id=create_form.id, status="pending", context={}
+    )
+    test_db.add(transcription)
+    test_db.commit()
+
+    async def poll():
+        async with get_async_sessionmaker()() as db:
+            pending = await TranscriptionService.get_transcription_async(db, transcription.id, admin_user.id)
+            assert pending.status == "pending"
+            transcription.status = "completed"
+            test_db.commit()
+            completed = await TranscriptionService.get_transcription_async(db, transcription.id, admin_user.id)
+            assert completed.status == "completed"
+            with pytest.raises(HTTPException) as exc_info:
+                await TranscriptionService.get_transcription_async(db, transcription.id, admin_user.id + 1)
+            assert exc_info.value.status_code == 404
+
+    asyncio.run(poll())
+
+
+def test_get_transcription_not_found(auth_headers):
+    response = client.get("/api/transcriptions/999", headers=auth_headers)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json()["detail"] == "Transcription with id 999 not found"
+
+
+def test_upload_and_transcribe_runs_concurrently(tmp_path):
+    temp_file_path = tmp_path / "audio.wav"
+    temp_file_path.write_bytes(b"fake audio content")
+
+    # Each call waits for the other to have started, which only returns if both run at the same time.
+    both_started = threading.Barrier(2, timeout=5)
+
+    def upload(*args, **kwargs):
+        both_started.wait()
+
+    def transcribe(*args, **kwargs):
+        both_started.wait()
+        return "transcribed text"
+
+    with patch("app.utils.s3.S3Utils.upload_file", side_effect=upload) as mock_upload, patch(
+        "app.utils.openai.OpenAIUtils.transcribe_audio", side_effect=transcribe
+    ):
+        result = TranscriptionService._upload_and_transcribe(str(temp_file_path), "key.wav")
+
+    assert result == "transcribed text"
+    mock_upload.assert_called_once_with(file_path=str(temp_file_path), object_name="key.wav")
+
+
+def test_upload_and_transcribe_reports_upload_failure(tmp_path):
+    temp_file_path = tmp_path / "audio.m4a"
+    temp_file_path.write_bytes(b"fake audio content")
+
+    with patch("app.utils.s3.S3Utils.upload_file", side_effect=ValueError("S3 upload failed")), patch(
+        "app.utils.openai.OpenAIUtils.transcribe_audio", return_value="transcribed text"
+    ):
+        with pytest.raises(HTTPException) as exc_info:
+            TranscriptionService._upload_and_transcribe(str(temp_file_path), "key.m4a")
+
+    assert exc_info.value.status_code == status.HTTP_424_FAILED_DEPENDENCY
+    assert "Failed to upload audio file: S3 upload failed" in exc_info.value.detail
+
+
+def test_upload_and_transcribe_reports_transcription_failure(tmp_path, mock_s3_utils):
+    temp_file_path = tmp_path / "audio.wav"
+    temp_file_path.write_bytes(b"fake audio content")
+
+    with patch(
+        "app.utils.openai.OpenAIUtils.transcribe_audio",
+        side_effect=HTTPException(status_code=status.HTTP_424_FAILED_DEPENDENCY, detail="Whisper failed"),
+    ):
+        with pytest.raises(HTTPException) as exc_info:
+            TranscriptionService._upload_and_transcribe(str(temp_file_path), "key.wav")
+
+    assert exc_info.value.detail == "Whisper failed"
+    mock_s3_utils.assert_called_once()
+
+
+def test_create_transcription_combined_extraction(db_session, upload_file, mock_s3_utils, mock_combined_extraction):
+    with patch("app.utils.openai.OpenAIUtils.validate_transcription") as mock_validate, patch(
+        "app.utils.openai.OpenAIUtils.prepare_context"
+    ) as mock_prepare, patch("app.services.fields.FieldsService.get_fields_by_form_id", return_value=[]):
+        transcription = create_transcription(db_session, user_id=1, form_id=1, file=upload_file)
+
+    assert transcription.status == "completed"
+    assert transcription.context == {"key": "value"}
+    mock_combined_extraction[1].assert_called_once_with(
+        transcription_text="transcribed text", form_structure=[], prefilled={}
+    )
+    mock_validate.assert_not_called()
+    mock_prepare.assert_not_called()
+
+
+def test_create_transcription_combined_extraction_low_confidence(
+    db_session, upload_file, mock_s3_utils, mock_combined_extraction, mock_fields_service
+):
+    mock_combined_extraction[1].return_value = ({"field1": "value"}, {"field1": 20, "field2": 15, "total": 30})
+
+    with pytest.raises(HTTPException) as exc_info:
+        create_transcription(db_session, user_id=1, form_id=1, file=upload_file)
+
+    assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
+    assert "field1" in exc_info.value.detail
+    assert "field2" in exc_info.value.detail
+    db_session.add.assert_not_called()
+
+
+def test_upload_stream_copies_chunks_to_sink():
+    sink = io.BytesIO()
+    stream = UploadStream(io.BytesIO(b"fake audio content"), sink=sink, max_bytes=100)
+
+    assert stream.read(4) == b"fake"
+    assert stream.read() == b" audio content"
+    assert sink.getvalue() == b"fake audio content"
+    assert stream.bytes_read == 18
+
+
+def test_upload_stream_enforces_max_size():
+    stream = UploadStream(io.BytesIO(b"fake audio content"), max_bytes=8)
+
+    assert stream.read(8) == b"fake aud"
+    with pytest.raises(HTTPException) as exc_info:
+        stream.read(8)
+    assert exc_info.value.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+
+
+def test_save_upload_is_chunked_and_bounded(upload_file):
+    upload_file.size = None
+    with patch("app.services.transcriptions.UPLOAD_CHUNK_BYTES", 4):
+        temp_file_path = TranscriptionService._save_upload(upload_file, "mp3")
+    try:
+        with open(temp_file_path, "rb") as temp_file:
+            assert temp_file.read() == b"fake audio content"
+    finally:
+        os.remove(temp_file_path)
+
+    upload_file.file.seek(0)
+    with patch("app.services.transcriptions.MAX_UPLOAD_BYTES", 8), patch("uuid.uuid4", return_value="too-large"):
+        with pytest.raises(HTTPException) as exc_info:
+            TranscriptionService._save_upload(upload_file, "mp3")
+    assert exc_info.value.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    assert not os.path.exists("/tmp/too-large.mp3")
+
+
+@pytest.mark.parametrize(
+    "save",
+    [
+        lambda file: TranscriptionService._save_upload(file, "mp3"),
+        lambda file: TranscriptionService._stream_upload(file, "mp3", "audio/key.mp3"),
+    ],
+    ids=["save", "stream"],
+)
+def test_save_upload_reports_the_original_error_when_the_file_was_never_created(upload_file, save):
+    with patch("app.services.transcriptions.open", side_effect=PermissionError("read-only"), create=True):
+        with pytest.raises(PermissionError, match="read-only"):
+            save(upload_file)
+
+
+def test_create_transcription_streams_upload_to_s3(db_session, upload_file, mock_openai_utils, mock_fields_service):
+    uploaded = {}
+
+    def upload_fileobj(fileobj, object_name):
+        uploaded[object_name] = b"".join(iter(lambda: fileobj.read(5), b""))
+
+    def transcribe(file_path):
+        with open(file_path, "rb") as audio_file:
+            assert audio_file.read() == b"fake audio content"
+        return "transcribed text"
+
+    mock_openai_utils[0].side_effect = transcribe
+    with patch("app.services.transcriptions.CONCURRENT_UPLOAD", False), patch(
+        "app.utils.s3.S3Utils.upload_fileobj", side_effect=upload_fileobj
+    ), patch("app.utils.s3.S3Utils.upload_file") as mock_upload_file:
+        transcription = create_transcription(db_session, user_id=1, form_id=1, file=upload_file)
+
+    assert uploaded == {f"{transcription.upload_uuid}.mp3": b"fake audio content"}
+    mock_upload_file.assert_not_called()
+    assert transcription.status == "completed"
+
+
+def test_create_transcription_too_large(
+    upload_file, mock_s3_utils, mock_openai_utils, mock_fields_service, create_form, auth_headers
+):
+    with patch("app.services.transcriptions.MAX_UPLOAD_BYTES", 8):
+        response = client.post(
+            f"/api/transcriptions/{create_form.id}",
+            files={"file": ("test.mp3", upload_file.file.read(), "audio/mpeg")},
+            headers=auth_headers,
+        )
+
+    assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    mock_s3_utils.assert_not_called()
+
+
+def test_transcribe_uses_normalized_copy(tmp_path):
+    temp_file_path = tmp_path / "audio.wav"
+    temp_file_path.write_bytes(b"fake audio content")
+    normalized_path = tmp_path / "audio.normalized.ogg"
+    normalized_path.write_bytes(b"small")
+
+    with patch("app.utils.audio.AudioUtils.normalize", return_value=str(normalized_path)), patch(
+        "app.utils.openai.OpenAIUtils.transcribe_audio", return_value="transcribed text"
+    ) as mock_transcribe:
+        assert TranscriptionService._transcribe(str(temp_file_path)) == "transcribed text"
+
+    mock_transcribe.assert_called_once_with(file_path=str(normalized_path))
+    assert not normalized_path.exists()
+    assert temp_file_path.read_bytes() == b"fake audio content"
+
+
+def test_stitch_transcripts_removes_overlap():
+    texts = [
+        "The patient reports chest pain since",
+        "pain, since Monday. No fever or cough",
+        "no nausea either.",
+    ]
+
+    assert TranscriptionService.stitch_transcripts(texts) == (
+        "The patient reports chest pain since Monday. No fever or cough no nausea either."
+    )
+
+
+def test_transcribe_with_retry_on_rate_limit():
+    rate_limited = HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="Rate limited")
+    with patch("app.services.transcriptions.RATE_LIMIT_BACKOFF", 0), patch(
+        "app.utils.openai.OpenAIUtils.transcribe_audio", side_effect=[rate_limited, "transcribed text"]
+    ) as mock_transcribe:
+        assert TranscriptionService._transcribe_with_retry("audio.ogg") == "transcribed text"
+    assert mock_transcribe.call_count == 2
+
+    with patch("app.services.transcriptions.RATE_LIMIT_RETRIES", 1), patch(
+        "app.services.transcriptions.RATE_LIMIT_BACKOFF", 0
+    ), patch("app.utils.openai.OpenAIUtils.transcribe_audio", side_effect=rate_limited) as mock_transcribe:
+        with pytest.raises(HTTPException) as exc_info:
+            TranscriptionService._transcribe_with_retry("audio.ogg")
+    assert exc_info.value.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert mock_transcribe.call_count == 2
+
+
+def test_transcribe_in_chunks(tmp_path):
+    audio_path = tmp_path / "audio.normalized.ogg"
+    audio_path.write_bytes(b"fake audio content")
+    texts = ["one two three four", "three four five six", "five six seven"]
+
+    def extract_chunk(file_path, start, end, index):
+        chunk_path = tmp_path / f"audio.normalized.chunk{index}.ogg"
+        chunk_path.write_bytes(str(index).encode())
+        return str(chunk_path)
+
+    def transcribe(file_path):
+        time.sleep(0.2)
+        with open(file_path) as chunk:
+            return texts[int(chunk.read())]
+
+    with patch("app.services.transcriptions.CHUNK_SECONDS", 600), patch(
+        "app.utils.audio.AudioUtils.duration", return_value=1500.0
+    ), patch("app.utils.audio.AudioUtils.extract_chunk", side_effect=extract_chunk) as mock_extract, patch(
+        "app.utils.openai.OpenAIUtils.transcribe_audio", side_effect=transcribe
+    ):
+        start = time.perf_counter()
+        result = TranscriptionService._transcribe_in_chunks(str(audio_path))
+        elapsed = time.perf_counter() - start
+
+    assert result == "one two three four five six seven"
+    assert [call.args[1:3] for call in mock_extract.call_args_list] == [(0.0, 600.0), (598.0, 1200.0), (1198.0, 1500.0)]
+    assert elapsed < 0.5
+    assert list(tmp_path.iterdir()) == [audio_path]
+
+
+def test_transcribe_in_chunks_short_recording(tmp_path):
+    with patch("app.services.transcriptions.CHUNK_SECONDS", 600), patch(
+        "app.utils.audio.AudioUtils.duration", return_value=300.0
+    ), patch("app.utils.audio.AudioUtils.extract_chunk") as mock_extract, patch(
+        "app.utils.openai.OpenAIUtils.transcribe_audio", return_value="transcribed text"
+    ) as mock_transcribe:
+        assert TranscriptionService._transcribe_in_chunks("audio.ogg") == "transcribed text"
+
+    mock_extract.assert_not_called()
+    mock_transcribe.assert_called_once_with(file_path="audio.ogg")
+
+
+def test_transcribe_in_chunks_batched_transcriber(tmp_path):
+    audio_path = tmp_path / "audio.normalized.ogg"
+    audio_path.write_bytes(b"fake audio content")
+    transcriber = MagicMock(batched=True)
+    transcriber.transcribe_batch.return_value = ["one two three", "two three four"]
+
+    def extract_chunk(file_path, start, end, index):
+        chunk_path = tmp_path / f"audio.normalized.chunk{index}.ogg"
+        chunk_path.write_bytes(b"chunk")
+        return str(chunk_path)
+
+    with patch("app.services.transcriptions.CHUNK_SECONDS", 600), patch(
+        "app.utils.audio.AudioUtils.duration", return_value=1000.0
+    ), patch("app.utils.audio.AudioUtils.extract_chunk", side_effect=extract_chunk), patch(
+        "app.services.transcriptions.get_transcriber", return_value=transcriber
+    ):
+        result = TranscriptionService._transcribe_in_chunks(str(audio_path))
+
+    assert result == "one two three four"
+    transcriber.transcribe_batch.assert_called_once_with(
+        [str(tmp_path / "audio.normalized.chunk0.ogg"), str(tmp_path / "audio.normalized.chunk1.ogg")]
+    )
+    transcriber.transcribe.assert_not_called()
+
+
+def test_extract_context_prefills_simple_fields_locally():
+    form_fields = [
+        Field(id=1, name="Pulse", field_type="integer", minimum=20, maximum=250, form_id=1),
+        Field(id=2, name="Chief complaint", description="Main complaint", form_id=1),
+    ]
+
+    with patch("app.utils.openai.OpenAIUtils.extract_form_data") as mock_extract, patch(
+        "app.services.transcriptions.EXTRACTION_MODE", "combined"
+    ), patch("app.services.transcriptions.LOCAL_EXTRACTION", True), patch(
+        "app.services.transcriptions.extraction_stats"
+    ) as mock_stats:
+        mock_extract.return_value = ({"Pulse": "72", "Chief complaint": "headache"}, {"total": 90})
+        context = TranscriptionService._extract_context("Pulse 72. Complains of headache.", form_fields)
+
+        mock_extract.assert_called_once_with(
+            transcription_text="Pulse 72. Complains of headache.",
+            form_structure=[{"Pulse": None}, {"Chief complaint": "Main complaint"}],
+            prefilled={"Pulse": 72},
+        )
+        assert context == {"Pulse": 72, "Chief complaint": "headache"}
+        mock_stats.record.assert_called_once_with({"Pulse": "local", "Chief complaint": "llm"}, 1, 0)
+
+        mock_stats.reset_mock()
+        mock_extract.return_value = ({"Pulse": 76}, {"total": 90})
+        context = TranscriptionService._extract_context("Pulse 72, I mean 76.", form_fields[:1])
+
+        assert context == {"Pulse": 76}
+        mock_stats.record.assert_called_once_with({"Pulse": "llm"}, 1, 0)
+
+
+def test_extract_context_skips_the_extraction_of_confirmed_local_values():
+    form_fields = [
+        Field(id=1, name="Pulse", field_type="integer", minimum=20, maximum=250, form_id=1),
+        Field(id=2, name="Temperature (C)", field_type="number", minimum=30, maximum=45, form_id=1),
+    ]
+    on_validated = MagicMock()
+
+    with patch("app.utils.openai.OpenAIUtils.validate_transcription") as mock_validate, patch(
+        "app.utils.openai.OpenAIUtils.prepare_context"
+    ) as mock_prepare, patch("app.services.transcriptions.EXTRACTION_MODE", "separate"), patch(
+        "app.services.transcriptions.LOCAL_EXTRACTION", True
+    ), patch(
+        "app.services.transcriptions.extraction_stats"
+    ) as mock_stats:
+        mock_validate.return_value = {"Pulse": 95, "Temperature (C)": 90, "total": 95}
+        text = "Pulse 72, temperature 38."
+        context = TranscriptionService._extract_context(text, form_fields, on_validated=on_validated)
+
+        mock_validate.assert_called_once_with(
+            transcription_text=text,
+            form_structure=[{"Pulse": None}, {"Temperature (C)": None}],
+            prefilled={"Pulse": 72, "Temperature (C)": 38.0},
+        )
+        mock_prepare.assert_not_called()
+        assert context == {"Pulse": 72, "Temperature (C)": 38.0}
+        on_validated.assert_called_once()
+        mock_stats.record.assert_called_once_with({"Pulse": "local", "Temperature (C)": "local"}, 1, 1)
+
+        mock_stats.reset_mock()
+        mock_validate.return_value = {"Pulse": 95, "Temperature (C)": 10, "total": 60}
+        mock_prepare.return_value = {"Temperature (C)": 37.5}
+        context = TranscriptionService._extract_context(text, form_fields)
+
+        mock_prepare.assert_called_once_with(transcription_text=text, form_structure=[{"Temperature (C)": None}])
+        assert context == {"Pulse": 72, "Temperature (C)": 37.5}
+        mock_stats.record.assert_called_once_with({"Pulse": "local", "Temperature (C)": "llm"}, 2, 0)
+
+
+def test_extract_context_checks_the_confidence_of_local_values():
+    form_fields = [Field(id=1, name="Pulse", field_type="integer", minimum=20, maximum=250, form_id=1)]
+
+    with patch("app.utils.openai.OpenAIUtils.validate_transcription") as mock_validate, patch(
+        "app.utils.openai.OpenAIUtils.prepare_context"
+    ) as mock_prepare, patch("app.services.transcriptions.EXTRACTION_MODE", "separate"), patch(
+        "app.services.transcriptions.LOCAL_EXTRACTION", True
+    ):
+        mock_validate.return_value = {"Pulse": 10, "total": 10}
+        with pytest.raises(HTTPException) as exc_info:
+            TranscriptionService._extract_context("Pulse 72.", form_fields)
+
+    assert exc_info.value.status_code == 400
+    assert "Pulse" in exc_info.value.detail
+    mock_prepare.assert_not_called()
+
+
+def test_extract_context_without_local_extraction():
+    form_fields = [Field(id=1, name="Pulse", field_type="integer", form_id=1)]
+
+    with patch("app.utils.openai.OpenAIUtils.extract_form_data") as mock_extract, patch(
+        "app.services.transcriptions.EXTRACTION_MODE", "combined"
+    ), patch("app.services.transcriptions.LOCAL_EXTRACTION", False):
+        mock_extract.return_value = ({"Pulse": "72"}, {"total": 90})
+        assert TranscriptionService._extract_context("Pulse 72.", form_fields) == {"Pulse": "72"}
+
+    mock_extract.assert_called_once_with(transcription_text="Pulse 72.", form_structure=[{"Pulse": None}], prefilled={})
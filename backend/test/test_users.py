@@ -1,12 +1,14 @@
 import pytest
+from sqlalchemy import event
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 from app.main import app
-from app.config.database import get_db
+from app.config.database import get_db, db_engine
 from app.schemas.users import UserCreate
 from app.models.users import Users
 from app.services.auth import create_access_token
 from app.services.users import UsersService
+from app.core.principal_cache import principal_cache
 
 client = TestClient(app)
 
@@ -34,6 +36,7 @@ def test_db():
     finally:
         db.query(Users).delete()
         db.commit()
+        principal_cache.clear()
         db.close()
 
 
@@ -67,6 +70,18 @@ def non_admin_user(test_db: Session):
     return user
 
 
+@pytest.fixture
+def count_queries():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db_engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(db_engine, "before_cursor_execute", before_cursor_execute)
+
+
 @pytest.fixture
 def auth_headers(admin_user):
     access_token = create_access_token(subject=admin_user.user_name)
@@ -207,3 +222,48 @@ def test_get_all_users(test_db: Session, auth_headers):
     response = client.get("/api/users/", headers=auth_headers)
     assert response.status_code == 200
     assert isinstance(response.json(), list)
+
+
+def test_get_all_users_filtered_and_projected(test_db: Session, auth_headers):
+    UsersService.create_user(
+        test_db, UserCreate(user_name="testuser", email="testuser@example.com", password="testpassword")
+    )
+
+    response = client.get("/api/users/?is_admin=false&fields=user_name", headers=auth_headers)
+    assert response.status_code == 200
+    assert [user["user_name"] for user in response.json()] == ["testuser"]
+    assert set(response.json()[0]) == {"id", "user_name"}
+
+    response = client.get("/api/users/?fields=password", headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_current_user_is_resolved_once_per_request_and_cached(test_db: Session, admin_user, count_queries):
+    headers = {"Authorization": f"Bearer {create_access_token(subject=admin_user.user_name)}"}
+
+    def principal_queries():
+        return [statement for statement in count_queries if "users.user_name = " in statement]
+
+    response = client.get(f"/api/users/{admin_user.id}", headers=headers)
+    assert response.status_code == 200
+    assert len(principal_queries()) == 1
+    count_queries.clear()
+
+    response = client.get(f"/api/users/{admin_user.id}", headers=headers)
+    assert response.status_code == 200
+    assert principal_queries() == []
+    assert principal_cache.stats()["hits"] >= 1
+
+
+def test_principal_cache_is_invalidated(test_db: Session, auth_headers, non_admin_user):
+    headers = {"Authorization": f"Bearer {create_access_token(subject=non_admin_user.user_name)}"}
+    assert client.get("/api/users/", headers=headers).status_code == 403
+
+    update_data = {"user_name": "renamed", "email": "renamed@example.com"}
+    assert client.put(f"/api/users/{non_admin_user.id}", json=update_data, headers=auth_headers).status_code == 200
+    assert client.get("/api/users/", headers=headers).status_code == 404
+
+    headers = {"Authorization": f"Bearer {create_access_token(subject='renamed')}"}
+    assert client.get("/api/users/", headers=headers).status_code == 403
+    assert client.delete(f"/api/users/{non_admin_user.id}", headers=auth_headers).status_code == 204
+    assert client.get("/api/users/", headers=headers).status_code == 404